@@ -1,6 +1,17 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.models.signals import post_migrate
+
+
+def ensure_vote_partitions(sender, using, **kwargs):
+    from employee.partitions import ensure_partitions
+
+    ensure_partitions(settings.VOTE_PARTITION_MONTHS_AHEAD, using=using)
 
 
 class EmployeeConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'employee'
+
+    def ready(self):
+        post_migrate.connect(ensure_vote_partitions, sender=self)
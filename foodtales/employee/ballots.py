@@ -0,0 +1,62 @@
+from django.db import transaction
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.settings import api_settings
+
+from employee.models import Ballot, DailyMenuScore
+from restaurant.models import Menu
+
+
+def validate_ballot(menu_ids, date=None):
+    """
+    Check that every menu of a ballot exists, is published and is for today
+    (or for ``date``, when replaying a queued ballot).
+
+    The three checks share one query; callers get a ``ValidationError`` with
+    the same messages the vote endpoints always returned. Whether the user
+    already voted is left to the insert in ``cast_ballot``.
+    """
+    today = date or timezone.now().date()
+    menus = list(
+        Menu.objects.filter(id__in=menu_ids).values_list(
+            "date", "is_published")
+    )
+    if len(menus) != len(set(menu_ids)):
+        raise serializers.ValidationError("One or more menu IDs are invalid.")
+    for date, is_published in menus:
+        if date != today:
+            raise serializers.ValidationError(
+                "Can only vote for today's menus.")
+        if not is_published:
+            raise serializers.ValidationError(
+                "Can only vote for published menus.")
+
+
+@transaction.atomic
+def cast_ballot(user_id, ranked_menu_ids, date=None, ballot_id=None):
+    """
+    Insert a validated ballot, given as ``(menu_id, rank)`` pairs, as a
+    single row and add it to the scores of today (or ``date``). Returns the
+    new ``Ballot``.
+
+    If the user already voted that day the claim is a no-op and nothing
+    else is written.
+    """
+    today = date or timezone.now().date()
+    ranked_menu_ids = sorted(ranked_menu_ids, key=lambda pair: pair[1])
+    ballot = Ballot.objects.claim(
+        user_id,
+        today,
+        [menu_id for menu_id, _ in ranked_menu_ids],
+        ballot_id=ballot_id,
+    )
+    if ballot is None:
+        raise serializers.ValidationError(
+            {
+                api_settings.NON_FIELD_ERRORS_KEY: [
+                    "You have already voted today."
+                ]
+            }
+        )
+    DailyMenuScore.objects.record(ranked_menu_ids, today)
+    return ballot
@@ -0,0 +1,122 @@
+from django.db import transaction
+
+from employee.models import (
+    Ballot,
+    DailyResult,
+    Vote,
+    VoteArchive,
+    ballot_vote_id,
+)
+
+CHOICES = ["first_menu", "second_menu", "third_menu"]
+
+CHUNK_SIZE = 5000
+
+
+def pending_dates(before):
+    """
+    Return the days before ``before`` that still hold raw votes or
+    ballots, oldest first.
+    """
+    dates = set(
+        Vote.objects.filter(vote_date__lt=before)
+        .values_list("vote_date", flat=True)
+        .distinct()
+    )
+    dates.update(
+        Ballot.objects.filter(date__lt=before)
+        .values_list("date", flat=True)
+        .distinct()
+    )
+    return sorted(dates)
+
+
+def archive_votes(date, chunk_size=CHUNK_SIZE):
+    """
+    Move the legacy ``Vote`` rows of ``date`` to the archive table, one
+    transaction per chunk of ``chunk_size`` rows. Returns the number of
+    votes moved.
+    """
+    votes = Vote.objects.filter(vote_date=date)
+    archived = 0
+    while True:
+        with transaction.atomic():
+            rows = list(
+                votes.values(
+                    "id", "user_id", "menu_id", "menu__restaurant_id",
+                    "rank", "created_at", "vote_date",
+                )[:chunk_size]
+            )
+            if not rows:
+                return archived
+            VoteArchive.objects.bulk_create(
+                [
+                    VoteArchive(
+                        restaurant_id=row.pop("menu__restaurant_id"), **row)
+                    for row in rows
+                ],
+                ignore_conflicts=True,
+            )
+            votes.filter(pk__in=[row["id"] for row in rows]).delete()
+        archived += len(rows)
+
+
+def archive_ballots(date, chunk_size=CHUNK_SIZE):
+    """
+    Move the ballots of ``date`` to the archive table as one vote per
+    ranked choice, one transaction per chunk of ``chunk_size`` ballots.
+    Returns the number of votes archived.
+
+    Ballots of users whose votes of that day are archived already, from
+    legacy ``Vote`` rows or an interrupted run, are dropped without being
+    archived again.
+    """
+    ballots = Ballot.objects.filter(date=date)
+    fields = ["id", "user_id", "created_at"]
+    for choice in CHOICES:
+        fields += [f"{choice}_id", f"{choice}__restaurant_id"]
+    archived = 0
+    while True:
+        with transaction.atomic():
+            rows = list(ballots.values(*fields)[:chunk_size])
+            if not rows:
+                return archived
+            done = set(
+                VoteArchive.objects.filter(
+                    vote_date=date,
+                    user_id__in=[row["user_id"] for row in rows],
+                ).values_list("user_id", flat=True)
+            )
+            votes = [
+                VoteArchive(
+                    id=ballot_vote_id(row["id"], rank),
+                    user_id=row["user_id"],
+                    menu_id=row[f"{choice}_id"],
+                    restaurant_id=row[f"{choice}__restaurant_id"],
+                    rank=rank,
+                    created_at=row["created_at"],
+                    vote_date=date,
+                )
+                for row in rows
+                if row["user_id"] not in done
+                for rank, choice in enumerate(CHOICES, start=1)
+                if row[f"{choice}_id"] is not None
+            ]
+            VoteArchive.objects.bulk_create(votes, ignore_conflicts=True)
+            Ballot.objects.filter(
+                pk__in=[row["id"] for row in rows]).delete()
+        archived += len(votes)
+
+
+def compact_day(date, chunk_size=CHUNK_SIZE):
+    """
+    Finalize ``date`` into its ``DailyResult``, then archive its legacy
+    votes and its ballots. Safe to re-run after an interruption: a day is
+    only finalized once, while its ballots are all still there.
+    """
+    result = DailyResult.objects.filter(date=date).first()
+    if result is None:
+        result = DailyResult.objects.finalize(date)
+    archived = archive_votes(date, chunk_size)
+    archived += archive_ballots(date, chunk_size)
+    return result, archived
@@ -0,0 +1,61 @@
+from datetime import timedelta
+
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+
+from employee.models import WINNER_ORDER, DailyMenuScore
+
+# Rolling windows ending on the requested day, in days
+PERIODS = {"week": 7, "month": 30, "quarter": 91}
+DEFAULT_LIMIT = 10
+MAX_LIMIT = 100
+
+
+def get_period(period, end):
+    """
+    Return the ``(start, end)`` dates of the rolling ``period`` ending on
+    ``end``.
+    """
+    return end - timedelta(days=PERIODS[period] - 1), end
+
+
+def outranked():
+    """
+    Whether another menu of the same day has a better score, comparing the
+    ``WINNER_ORDER`` fields in turn. Menus not outranked won their day.
+    """
+    fields = [field.lstrip("-") for field in WINNER_ORDER]
+    better = Q()
+    for n, field in enumerate(fields):
+        better |= Q(
+            **{f"{field}__gt": OuterRef(field)},
+            **{tied: OuterRef(tied) for tied in fields[:n]},
+        )
+    return Exists(
+        DailyMenuScore.objects.filter(better, date=OuterRef("date")))
+
+
+def get_leaderboard(start, end, limit=DEFAULT_LIMIT):
+    """
+    Rank restaurants by the days they won between ``start`` and ``end``
+    (inclusive), then by points.
+
+    Reads the daily score rollups only: one row per restaurant and day,
+    whatever the number of votes behind them. Winners are worked out here
+    rather than flagged when votes are recorded, which would lock the
+    winning row in every vote transaction.
+    """
+    return list(
+        DailyMenuScore.objects.filter(date__range=(start, end))
+        .values("restaurant")
+        .annotate(
+            restaurant_id=F("restaurant__restaurant_id"),
+            restaurant_name=F("restaurant__restaurant_name"),
+            wins=Count("id", filter=Q(points__gt=0) & ~outranked()),
+            points=Sum("points"),
+            first_votes=Sum("first_votes"),
+            second_votes=Sum("second_votes"),
+            third_votes=Sum("third_votes"),
+            days=Count("id"),
+        )
+        .order_by("-wins", "-points", "restaurant")[:limit]
+    )
@@ -0,0 +1,188 @@
+import asyncio
+import contextvars
+import json
+import logging
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import close_old_connections
+from django.utils import timezone
+
+from employee.models import SCORE_FIELDS, DailyMenuScore
+from employee.results_cache import current_version
+from foodtales.metrics import metrics
+
+logger = logging.getLogger("foodtales")
+
+
+def read_scores(date):
+    """
+    Return the running scores of the published menus of ``date``, keyed by
+    menu id.
+    """
+    rows = DailyMenuScore.objects.filter(
+        date=date, menu__is_published=True
+    ).values("menu", *SCORE_FIELDS)
+    return {row.pop("menu"): row for row in rows}
+
+
+def diff_scores(previous, scores):
+    """
+    Return the score increments of every menu that changed between two
+    reads of ``read_scores``.
+    """
+    deltas = {}
+    for menu_id, values in scores.items():
+        before = previous.get(menu_id, {})
+        increments = {
+            field: values[field] - before.get(field, 0)
+            for field in SCORE_FIELDS
+        }
+        if any(increments.values()):
+            deltas[menu_id] = increments
+    return deltas
+
+
+def merge_frames(older, newer):
+    """
+    Fold two frames into one carrying the increments of both, as long as
+    they are for the same day; a new day starts over.
+    """
+    if older["date"] != newer["date"]:
+        return newer
+    totals = {score["menu"]: dict(score) for score in older["scores"]}
+    for score in newer["scores"]:
+        merged = totals.setdefault(
+            score["menu"], dict.fromkeys(SCORE_FIELDS, 0))
+        for field in SCORE_FIELDS:
+            merged[field] += score[field]
+        merged["menu"] = score["menu"]
+    return {"date": newer["date"], "scores": list(totals.values())}
+
+
+class ScoresPoller:
+    """
+    Today's scores as last read by the poller of one event loop, and the
+    results version they were read at.
+    """
+
+    def __init__(self):
+        self.task = None
+        self.ready = asyncio.Event()
+        self.date = None
+        self.version = None
+        self.scores = {}
+
+
+class ResultsBroadcaster:
+    """
+    Fan-out of score changes to the live result subscribers of a process.
+
+    Votes are written by every web worker and by the vote queue worker, so
+    changes are not pushed here: one task per event loop reads the version
+    of today's results from the shared cache once per tick, and when it
+    moved, reads today's scores again. The increments since the previous
+    read go out as a single frame to every subscriber, however many votes
+    landed within the tick.
+
+    Each subscriber holds at most one frame: a client too slow to take it
+    before the next one gets both merged instead of a growing backlog.
+    """
+
+    def __init__(self, tick=None):
+        self.tick = tick
+        self._subscribers = set()
+        self._pollers = {}
+
+    async def subscribe(self):
+        """
+        Register a subscriber on the running event loop. Returns its queue
+        of frames and a snapshot of today's scores the frames apply to.
+        """
+        loop = asyncio.get_running_loop()
+        poller = self._pollers.get(loop)
+        if poller is None or poller.task.done():
+            # Not bound to the request starting it: the replica picked for
+            # that request must not serve the reads of the poller
+            poller = ScoresPoller()
+            poller.task = loop.create_task(
+                self._poll_forever(poller), context=contextvars.Context())
+            self._pollers[loop] = poller
+        await poller.ready.wait()
+        queue = asyncio.Queue(maxsize=1)
+        self._subscribers.add(queue)
+        scores = [
+            dict(values, menu=menu_id)
+            for menu_id, values in poller.scores.items()
+            if values["points"] > 0
+        ]
+        scores.sort(key=lambda score: -score["points"])
+        return queue, {"date": poller.date, "scores": scores}
+
+    def unsubscribe(self, queue):
+        self._subscribers.discard(queue)
+
+    def deliver(self, frame):
+        for queue in list(self._subscribers):
+            if queue.full():
+                metrics.incr("vote_stream.frames_merged")
+                queue.put_nowait(merge_frames(queue.get_nowait(), frame))
+            else:
+                queue.put_nowait(frame)
+
+    async def poll(self, poller):
+        """
+        Read today's scores again if the results version moved, returning
+        the frame of what changed since the previous read, if anything.
+        """
+        date = timezone.now().date()
+        # Read before the scores: a vote landing in between is seen twice
+        # at worst, and its second read is an empty diff
+        version = await sync_to_async(current_version)(date)
+        if date == poller.date and version == poller.version:
+            return None
+        scores = await sync_to_async(read_scores)(date)
+        previous = poller.scores if date == poller.date else {}
+        poller.date, poller.version, poller.scores = date, version, scores
+        deltas = diff_scores(previous, scores)
+        if not deltas:
+            return None
+        return {
+            "date": date,
+            "scores": [
+                dict(increments, menu=menu_id)
+                for menu_id, increments in deltas.items()
+            ],
+        }
+
+    async def _poll_forever(self, poller):
+        # Subscribers wait for the first read; should it fail they start
+        # from an empty snapshot and the next read sends the full scores
+        await self._poll_once(poller)
+        poller.ready.set()
+        while True:
+            await asyncio.sleep(self.tick or settings.VOTE_STREAM_TICK)
+            if not self._subscribers:
+                return
+            await self._poll_once(poller)
+
+    async def _poll_once(self, poller):
+        try:
+            frame = await self.poll(poller)
+        except Exception:
+            logger.exception("Live results poll failed")
+            metrics.incr("vote_stream.poll_errors")
+            await sync_to_async(close_old_connections)()
+            return
+        if frame is not None and poller.ready.is_set():
+            metrics.incr("vote_stream.frames")
+            self.deliver(frame)
+
+
+def format_event(event, data):
+    payload = json.dumps(data, cls=DjangoJSONEncoder)
+    return f"event: {event}\ndata: {payload}\n\n"
+
+
+broadcaster = ResultsBroadcaster()
@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Min
+
+from employee.models import Ballot, DailyMenuScore
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily score rollups for every day that has ballots. "
+        "Safe to re-run: days already in sync are left untouched."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start",
+            help="First day to rebuild (YYYY-MM-DD). Defaults to the first "
+                 "ballot.",
+        )
+        parser.add_argument(
+            "--end", help="Last day to rebuild (YYYY-MM-DD), inclusive.")
+
+    def handle(self, *args, **options):
+        try:
+            dates = {
+                name: date.fromisoformat(options[name])
+                for name in ("start", "end")
+                if options[name]
+            }
+        except ValueError:
+            raise CommandError(
+                "--start and --end must be formatted as YYYY-MM-DD.")
+        if "start" not in dates:
+            dates["start"] = Ballot.objects.aggregate(
+                first=Min("date"))["first"]
+            if dates["start"] is None:
+                self.stdout.write("No ballots to roll up.")
+                return
+
+        days = (
+            Ballot.objects.filter(date__gte=dates["start"])
+            .values_list("date", flat=True)
+            .distinct()
+            .order_by("date")
+        )
+        if "end" in dates:
+            days = days.filter(date__lte=dates["end"])
+
+        rebuilt = drifted = 0
+        for day in days.iterator():
+            drifted += len(DailyMenuScore.objects.reconcile(day))
+            rebuilt += 1
+        self.stdout.write(
+            f"Rolled up {rebuilt} days, fixed {drifted} menu scores.")
@@ -0,0 +1,96 @@
+import statistics
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, close_old_connections, connections
+from django.test import Client, override_settings
+from django.urls import reverse
+
+from foodtales.database import get_pool_metrics
+from user.tokens import ClaimsRefreshToken
+
+User = get_user_model()
+
+MODES = {
+    "new": {"CONN_MAX_AGE": 0, "pool": None},
+    "persistent": {"CONN_MAX_AGE": 60, "pool": None},
+    "pool": {"CONN_MAX_AGE": 0, "pool": {"min_size": 1, "max_size": 4}},
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Measure per-request latency of a view running one query when "
+        "every request opens its own database connection, with persistent "
+        "connections and with the psycopg connection pool (PostgreSQL "
+        "with psycopg 3 only). Creates a throwaway employee and removes it "
+        "afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--requests", type=int, default=500)
+        parser.add_argument(
+            "--modes", nargs="+", choices=list(MODES), default=list(MODES))
+
+    def handle(self, *args, **options):
+        connection = connections[DEFAULT_DB_ALIAS]
+        if "pool" in options["modes"] and connection.vendor != "postgresql":
+            raise CommandError("The pool mode needs a PostgreSQL database.")
+
+        employee = User.objects.create(
+            email=f"bench-{uuid.uuid4().hex[:8]}@example.com",
+            user_type="employee",
+            password="!",
+        )
+        token = ClaimsRefreshToken.for_user(employee).access_token
+        url = reverse("vote-status", args=[uuid.uuid4()])
+        client = Client(headers={"Authorization": f"Bearer {token}"})
+        saved = dict(connection.settings_dict)
+        saved_options = dict(connection.settings_dict["OPTIONS"])
+        try:
+            with override_settings(
+                ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"]
+            ):
+                for mode in options["modes"]:
+                    self.configure(connection, MODES[mode])
+                    latencies = []
+                    for _ in range(options["requests"]):
+                        started = time.perf_counter()
+                        client.get(url)
+                        # Done by the handler at the end of each request,
+                        # but skipped by the test client
+                        close_old_connections()
+                        latencies.append(time.perf_counter() - started)
+                    self.report(mode, latencies)
+                    if mode == "pool":
+                        for name, value in get_pool_metrics().items():
+                            self.stdout.write(f"  {name} = {value}")
+        finally:
+            connection.close()
+            if hasattr(connection, "close_pool"):
+                connection.close_pool()
+            connection.settings_dict.update(saved, OPTIONS=saved_options)
+            User.objects.filter(pk=employee.pk).delete()
+
+    def configure(self, connection, mode):
+        connection.close()
+        if hasattr(connection, "close_pool"):
+            connection.close_pool()
+        connection.settings_dict["CONN_MAX_AGE"] = mode["CONN_MAX_AGE"]
+        connection.settings_dict["CONN_HEALTH_CHECKS"] = True
+        options = connection.settings_dict["OPTIONS"]
+        options.pop("pool", None)
+        if mode["pool"] is not None:
+            options["pool"] = dict(mode["pool"])
+
+    def report(self, mode, latencies):
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        self.stdout.write(
+            f"{mode:10}: mean {statistics.mean(latencies) * 1000:7.3f} ms, "
+            f"p50 {statistics.median(latencies) * 1000:7.3f} ms, "
+            f"p95 {p95 * 1000:7.3f} ms"
+        )
@@ -0,0 +1,108 @@
+import os
+import tempfile
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from employee.ballots import cast_ballot, validate_ballot
+from employee.management.scratch import check_scratch_database
+from employee.models import Ballot, DailyMenuScore
+from employee.vote_queue import VoteQueue, drain
+from restaurant.models import Menu
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare ballot throughput of the synchronous write path with the "
+        "queued ingestion path. Creates throwaway users and menus in the "
+        "configured database, whose name must contain 'test' or 'bench', "
+        "and removes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--ballots", type=int, default=1000)
+        parser.add_argument("--batch-size", type=int, default=200)
+
+    def handle(self, *args, **options):
+        check_scratch_database()
+        count = options["ballots"]
+        tag = uuid.uuid4().hex[:8]
+        restaurants, employees, menus = self.create_fixtures(count, tag)
+        ranked = [(menu.id, rank) for rank, menu in enumerate(menus, 1)]
+        try:
+            started = time.perf_counter()
+            for employee in employees:
+                validate_ballot([menu_id for menu_id, _ in ranked])
+                cast_ballot(employee.pk, ranked)
+            sync_elapsed = time.perf_counter() - started
+            self.reset(menus)
+
+            with tempfile.TemporaryDirectory() as directory:
+                queue = VoteQueue(os.path.join(directory, "bench.sqlite3"))
+                today = timezone.now().date()
+                started = time.perf_counter()
+                for employee in employees:
+                    queue.enqueue(employee.pk, ranked, today)
+                enqueue_elapsed = time.perf_counter() - started
+
+                started = time.perf_counter()
+                while drain(queue, options["batch_size"]):
+                    pass
+                drain_elapsed = time.perf_counter() - started
+            written = Ballot.objects.filter(first_menu__in=menus).count()
+        finally:
+            User.objects.filter(
+                id__in=[user.id for user in restaurants + employees]
+            ).delete()
+
+        self.stdout.write(
+            f"sync   : {count / sync_elapsed:10.1f} ballots/s "
+            f"({sync_elapsed * 1000 / count:.2f} ms per request)"
+        )
+        self.stdout.write(
+            f"enqueue: {count / enqueue_elapsed:10.1f} ballots/s "
+            f"({enqueue_elapsed * 1000 / count:.2f} ms per request)"
+        )
+        self.stdout.write(
+            f"drain  : {count / drain_elapsed:10.1f} ballots/s "
+            f"({written}/{count} written, batch size "
+            f"{options['batch_size']})"
+        )
+
+    def create_fixtures(self, count, tag):
+        restaurants = User.objects.bulk_create(
+            [
+                User(
+                    email=f"bench-{tag}-r{i}@example.com",
+                    user_type="restaurant",
+                    restaurant_id=f"R-{tag}{i}",
+                    password="!",
+                )
+                for i in range(3)
+            ]
+        )
+        employees = User.objects.bulk_create(
+            [
+                User(
+                    email=f"bench-{tag}-e{i}@example.com",
+                    user_type="employee",
+                    employee_id=f"E-{tag}{i}",
+                    password="!",
+                )
+                for i in range(count)
+            ]
+        )
+        today = timezone.now().date()
+        menus = Menu.objects.bulk_create(
+            [Menu(restaurant=r, date=today) for r in restaurants]
+        )
+        return restaurants, employees, menus
+
+    def reset(self, menus):
+        Ballot.objects.filter(first_menu__in=menus).delete()
+        DailyMenuScore.objects.filter(menu__in=menus).delete()
@@ -0,0 +1,55 @@
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from employee.compaction import CHUNK_SIZE, compact_day, pending_dates
+
+
+class Command(BaseCommand):
+    help = (
+        "Finalize finished days into compact daily results and move their "
+        "raw votes to the archive table."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--before",
+            help="Compact the days before this date (YYYY-MM-DD). Defaults "
+                 "to today.",
+        )
+        parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only list the days that would be compacted.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            before = (
+                date.fromisoformat(options["before"])
+                if options["before"]
+                else timezone.now().date()
+            )
+        except ValueError:
+            raise CommandError("--before must be formatted as YYYY-MM-DD.")
+        if before > timezone.now().date():
+            raise CommandError("Only finished days can be compacted.")
+        if options["chunk_size"] < 1:
+            raise CommandError("--chunk-size must be at least 1.")
+
+        days = pending_dates(before)
+        for day in days:
+            if options["dry_run"]:
+                self.stdout.write(f"{day}: pending")
+                continue
+            result, archived = compact_day(day, options["chunk_size"])
+            self.stdout.write(
+                f"{day}: {len(result.scores)} menus, {result.ballots} "
+                f"ballots, {archived} votes archived"
+            )
+        if options["dry_run"]:
+            self.stdout.write(f"{len(days)} days pending.")
+        else:
+            self.stdout.write(f"Compacted {len(days)} days.")
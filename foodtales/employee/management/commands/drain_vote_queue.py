@@ -0,0 +1,70 @@
+import logging
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import OperationalError, close_old_connections
+
+from employee.vote_queue import drain, get_vote_queue
+
+logger = logging.getLogger("foodtales")
+
+
+class Command(BaseCommand):
+    help = "Write queued ballots in batched transactions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=200,
+            help="Ballots written per transaction.",
+        )
+        parser.add_argument(
+            "--poll-interval",
+            type=float,
+            default=0.5,
+            help="Seconds to sleep when the queue is empty.",
+        )
+        parser.add_argument(
+            "--once",
+            action="store_true",
+            help="Drain what is queued and exit instead of polling.",
+        )
+        parser.add_argument(
+            "--purge-after",
+            type=int,
+            default=24 * 60 * 60,
+            help="Forget processed ballots older than this many seconds.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        queue = get_vote_queue()
+        self.stdout.write(f"Draining vote queue at {queue.path}")
+        total = 0
+        try:
+            while True:
+                try:
+                    written = drain(queue, options["batch_size"])
+                except OperationalError as e:
+                    # The batch went back to the queue: retry it once the
+                    # database is reachable again
+                    if options["once"]:
+                        raise
+                    logger.error("Vote queue drain failed: %s", e)
+                    close_old_connections()
+                    time.sleep(options["poll_interval"])
+                    continue
+                total += written
+                if written:
+                    continue
+                queue.purge(options["purge_after"])
+                if options["once"]:
+                    break
+                time.sleep(options["poll_interval"])
+        except KeyboardInterrupt:
+            pass
+        self.stdout.write(
+            self.style.SUCCESS(f"Processed {total} queued ballot(s)."))
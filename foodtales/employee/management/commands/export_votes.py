@@ -0,0 +1,49 @@
+import sys
+from datetime import date
+
+from django.core.management.base import BaseCommand, CommandError
+
+from employee.vote_export import (
+    FORMATS,
+    get_export_querysets,
+    iter_export,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Stream the vote history as CSV or NDJSON to a file or stdout, "
+        "with constant memory use."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--start", help="First vote date (YYYY-MM-DD), inclusive.")
+        parser.add_argument(
+            "--end", help="Last vote date (YYYY-MM-DD), inclusive.")
+        parser.add_argument(
+            "--restaurant", help="Only export votes for this restaurant id.")
+        parser.add_argument("--format", choices=FORMATS, default="csv")
+        parser.add_argument(
+            "--output", help="File to write to. Defaults to stdout.")
+
+    def handle(self, *args, **options):
+        try:
+            dates = {
+                name: date.fromisoformat(options[name])
+                for name in ("start", "end")
+                if options[name]
+            }
+        except ValueError:
+            raise CommandError(
+                "--start and --end must be formatted as YYYY-MM-DD.")
+
+        querysets = get_export_querysets(
+            restaurant_id=options["restaurant"], **dates)
+        chunks = iter_export(querysets, options["format"])
+        if options["output"]:
+            with open(options["output"], "wb") as output:
+                output.writelines(chunks)
+        else:
+            sys.stdout.buffer.writelines(chunks)
+            sys.stdout.flush()
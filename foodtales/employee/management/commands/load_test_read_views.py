@@ -0,0 +1,195 @@
+import asyncio
+import statistics
+import threading
+import time
+import uuid
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connections
+from django.test import AsyncClient, Client, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from employee.management.scratch import check_scratch_database
+from employee.models import DailyMenuScore
+from restaurant.models import Menu, MenuItem
+from user.tokens import ClaimsRefreshToken
+
+User = get_user_model()
+
+ENDPOINTS = {
+    "menu": (
+        "all-restaurants-current-day-menu",
+        "all-restaurants-current-day-menu-async",
+    ),
+    "results": ("vote-results", "vote-results-async"),
+}
+DUMMY_CACHE = {
+    "default": {"BACKEND": "django.core.cache.backends.dummy.DummyCache"}
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare how many concurrent requests one process serves on a read "
+        "endpoint: the sync view on a threaded WSGI worker against its async "
+        "variant on an ASGI event loop. Requests go through the full "
+        "handler and middleware stack in process, against the configured "
+        "database, whose name must contain 'test' or 'bench'. Creates "
+        "throwaway users and menus and removes them afterwards."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--endpoint", choices=sorted(ENDPOINTS), default="results")
+        parser.add_argument("--requests", type=int, default=1000)
+        parser.add_argument(
+            "--threads",
+            type=int,
+            default=4,
+            help="Threads of the WSGI worker, as gunicorn --threads.",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=50,
+            help="Requests in flight on the ASGI event loop.",
+        )
+        parser.add_argument("--menus", type=int, default=10)
+        parser.add_argument(
+            "--cold",
+            action="store_true",
+            help="Disable the cache so every request queries the database.",
+        )
+
+    def handle(self, *args, **options):
+        # The fixtures are committed, other threads and the event loop must
+        # see them
+        check_scratch_database()
+        tag = uuid.uuid4().hex[:8]
+        restaurants, employee = self.create_fixtures(options["menus"], tag)
+        token = ClaimsRefreshToken.for_user(employee).access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        sync_name, async_name = ENDPOINTS[options["endpoint"]]
+        overrides = {"ALLOWED_HOSTS": [*settings.ALLOWED_HOSTS, "testserver"]}
+        if options["cold"]:
+            overrides["CACHES"] = DUMMY_CACHE
+        try:
+            with override_settings(**overrides):
+                wsgi = self.run_wsgi(
+                    reverse(sync_name), headers, options["requests"],
+                    options["threads"])
+                asgi = asyncio.run(self.run_asgi(
+                    reverse(async_name), headers, options["requests"],
+                    options["concurrency"]))
+        finally:
+            User.objects.filter(
+                id__in=[user.id for user in [*restaurants, employee]]
+            ).delete()
+
+        self.report(f"wsgi ({options['threads']} threads)", *wsgi)
+        self.report(f"asgi ({options['concurrency']} in flight)", *asgi)
+
+    def run_wsgi(self, url, headers, count, threads):
+        latencies = []
+        statuses = set()
+
+        def worker(share):
+            client = Client()
+            try:
+                for _ in range(share):
+                    started = time.perf_counter()
+                    response = client.get(url, headers=headers)
+                    latencies.append(time.perf_counter() - started)
+                    statuses.add(response.status_code)
+            finally:
+                connections.close_all()
+
+        shares = [
+            count // threads + (i < count % threads) for i in range(threads)]
+        workers = [
+            threading.Thread(target=worker, args=(share,))
+            for share in shares
+        ]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - started, latencies, statuses
+
+    async def run_asgi(self, url, headers, count, concurrency):
+        client = AsyncClient()
+        semaphore = asyncio.Semaphore(concurrency)
+        latencies = []
+        statuses = set()
+
+        async def request():
+            async with semaphore:
+                started = time.perf_counter()
+                response = await client.get(url, headers=headers)
+                latencies.append(time.perf_counter() - started)
+                statuses.add(response.status_code)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(request() for _ in range(count)))
+        return time.perf_counter() - started, latencies, statuses
+
+    def report(self, label, elapsed, latencies, statuses):
+        latencies.sort()
+        p95 = latencies[int(len(latencies) * 0.95) - 1]
+        self.stdout.write(
+            f"{label:24}: {len(latencies) / elapsed:8.1f} req/s, "
+            f"p50 {statistics.median(latencies) * 1000:7.2f} ms, "
+            f"p95 {p95 * 1000:7.2f} ms, "
+            f"status {sorted(statuses)}"
+        )
+
+    def create_fixtures(self, count, tag):
+        restaurants = User.objects.bulk_create(
+            [
+                User(
+                    email=f"load-{tag}-r{i}@example.com",
+                    user_type="restaurant",
+                    restaurant_id=f"R-{tag}{i}",
+                    password="!",
+                )
+                for i in range(count)
+            ]
+        )
+        employee = User.objects.create(
+            email=f"load-{tag}-e@example.com",
+            user_type="employee",
+            employee_id=f"E-{tag}",
+            password="!",
+        )
+        today = timezone.now().date()
+        menus = Menu.objects.bulk_create(
+            [
+                Menu(restaurant=restaurant, date=today, is_published=True)
+                for restaurant in restaurants
+            ]
+        )
+        MenuItem.objects.bulk_create(
+            [
+                MenuItem(
+                    menu=menu, name=f"Dish {n}", price="9.99",
+                    category="main_course",
+                )
+                for menu in menus
+                for n in range(5)
+            ]
+        )
+        DailyMenuScore.objects.bulk_create(
+            [
+                DailyMenuScore(
+                    menu=menu, restaurant=menu.restaurant, date=today,
+                    points=n, first_votes=n,
+                )
+                for n, menu in enumerate(menus, 1)
+            ],
+            ignore_conflicts=True,
+        )
+        return restaurants, employee
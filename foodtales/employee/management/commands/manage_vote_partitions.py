@@ -0,0 +1,61 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from employee.partitions import (
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    prune_partitions,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Create the upcoming monthly partitions of the vote table and "
+        "detach (or drop) the ones past the retention window. Meant to run "
+        "daily; does nothing unless the database is PostgreSQL."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--months-ahead",
+            type=int,
+            default=settings.VOTE_PARTITION_MONTHS_AHEAD,
+            help="Number of future months to create partitions for.",
+        )
+        parser.add_argument(
+            "--retention-months",
+            type=int,
+            default=settings.VOTE_PARTITION_RETENTION_MONTHS,
+            help="Detach partitions older than this many whole months. "
+                 "Partitions are kept when unset.",
+        )
+        parser.add_argument(
+            "--drop",
+            action="store_true",
+            help="Drop partitions past retention instead of detaching them.",
+        )
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        using = options["database"]
+        if not is_partitioned(using):
+            self.stdout.write("The vote table is not partitioned.")
+            return
+        if options["months_ahead"] < 0:
+            raise CommandError("--months-ahead must not be negative.")
+
+        for name in ensure_partitions(options["months_ahead"], using=using):
+            self.stdout.write(f"Created partition {name}.")
+        if options["retention_months"] is not None:
+            if options["retention_months"] < 1:
+                raise CommandError("--retention-months must be at least 1.")
+            pruned = prune_partitions(
+                options["retention_months"], drop=options["drop"],
+                using=using)
+            action = "Dropped" if options["drop"] else "Detached"
+            for name in pruned:
+                self.stdout.write(f"{action} partition {name}.")
+
+        for name, start, end in list_partitions(using):
+            self.stdout.write(f"{name}: {start or '-'} to {end}")
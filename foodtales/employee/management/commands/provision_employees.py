@@ -0,0 +1,44 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from employee.provisioning import DEFAULT_BATCH_SIZE, provision_employees
+
+
+class Command(BaseCommand):
+    help = (
+        "Create employee accounts from a CSV file with email, password and "
+        "optional employee_id columns, hashing passwords in parallel."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="CSV file to import.")
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+        parser.add_argument(
+            "--workers",
+            type=int,
+            help="Password hashing processes. Defaults to the number of "
+                 "CPUs; 0 hashes in this process.",
+        )
+
+    def handle(self, *args, **options):
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+        if options["workers"] is not None and options["workers"] < 0:
+            raise CommandError("--workers must not be negative.")
+
+        try:
+            with open(options["path"], "rb") as stream:
+                report = provision_employees(
+                    stream, options["batch_size"], options["workers"])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in report["errors"]:
+            self.stderr.write(
+                f"Line {error['line']} ({error['email']}): "
+                f"{' '.join(error['errors'])}"
+            )
+        self.stdout.write(
+            f"Created {report['created']} employees, "
+            f"{len(report['errors'])} rejected."
+        )
@@ -0,0 +1,60 @@
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+
+from employee.models import DailyMenuScore
+
+
+class Command(BaseCommand):
+    help = (
+        "Rebuild the daily menu score table from the ballots and report any "
+        "drift."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--date",
+            help="Day to reconcile (YYYY-MM-DD). Defaults to today.",
+        )
+        parser.add_argument(
+            "--days",
+            type=int,
+            default=1,
+            help="Number of days to reconcile, counting back from --date.",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Only report drifted menus, do not write anything.",
+        )
+
+    def handle(self, *args, **options):
+        try:
+            day = (
+                date.fromisoformat(options["date"])
+                if options["date"]
+                else timezone.now().date()
+            )
+        except ValueError:
+            raise CommandError("--date must be formatted as YYYY-MM-DD.")
+        if options["days"] < 1:
+            raise CommandError("--days must be at least 1.")
+
+        total = 0
+        for offset in range(options["days"]):
+            current = day - timedelta(days=offset)
+            drifted = DailyMenuScore.objects.reconcile(
+                current, dry_run=options["dry_run"]
+            )
+            total += len(drifted)
+            if drifted:
+                self.stdout.write(
+                    f"{current}: {len(drifted)} menu score(s) out of sync"
+                )
+
+        verb = "found" if options["dry_run"] else "fixed"
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Reconciliation done, {verb} {total} drift(s).")
+        )
@@ -0,0 +1,25 @@
+import os
+
+from django.core.management.base import CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+# Benchmarks commit their fixtures and may wipe rows around them: only run
+# them against a database named for it
+SCRATCH_DATABASE_MARKERS = ("test", "bench")
+
+
+def is_scratch_database(alias=DEFAULT_DB_ALIAS):
+    name = os.path.basename(str(connections[alias].settings_dict["NAME"]))
+    return any(marker in name.lower() for marker in SCRATCH_DATABASE_MARKERS)
+
+
+def check_scratch_database(alias=DEFAULT_DB_ALIAS):
+    """
+    Raise a ``CommandError`` unless ``alias`` is a scratch database.
+    """
+    if not is_scratch_database(alias):
+        raise CommandError(
+            "Refusing to write benchmark fixtures into database %r: point "
+            "DATABASE_URL at a database whose name contains 'test' or "
+            "'bench'." % connections[alias].settings_dict["NAME"]
+        )
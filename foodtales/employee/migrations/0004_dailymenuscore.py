@@ -0,0 +1,31 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:26
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0003_initial'),
+        ('restaurant', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyMenuScore',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('points', models.PositiveIntegerField(default=0)),
+                ('first_votes', models.PositiveIntegerField(default=0)),
+                ('second_votes', models.PositiveIntegerField(default=0)),
+                ('third_votes', models.PositiveIntegerField(default=0)),
+                ('menu', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_scores', to='restaurant.menu')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['date', '-points'], name='menu_score_date_points_idx')],
+                'constraints': [models.UniqueConstraint(fields=('menu', 'date'), name='unique_menu_score_per_day')],
+            },
+        ),
+    ]
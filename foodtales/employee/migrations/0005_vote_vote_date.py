@@ -0,0 +1,21 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:28
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0004_dailymenuscore'),
+    ]
+
+    operations = [
+        # Added without a default first: a callable default would stamp
+        # every existing row with the migration date. Filled by the next
+        # migration.
+        migrations.AddField(
+            model_name='vote',
+            name='vote_date',
+            field=models.DateField(null=True),
+        ),
+    ]
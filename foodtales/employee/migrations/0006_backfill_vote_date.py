@@ -0,0 +1,35 @@
+from django.db import migrations, transaction
+from django.db.models.functions import TruncDate
+
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def backfill_vote_date(apps, schema_editor):
+    # One transaction per chunk of primary keys, so a large Vote table is
+    # never locked by a single huge UPDATE
+    Vote = apps.get_model("employee", "Vote")
+    db = schema_editor.connection.alias
+    pending = Vote.objects.using(db).filter(vote_date__isnull=True)
+    while True:
+        with transaction.atomic(using=db):
+            chunk = list(
+                pending.values_list("pk", flat=True)[:BACKFILL_CHUNK_SIZE])
+            if not chunk:
+                break
+            Vote.objects.using(db).filter(pk__in=chunk).update(
+                vote_date=TruncDate("created_at"))
+
+
+class Migration(migrations.Migration):
+
+    # The column was added by the previous migration, whose lock is
+    # released before the backfill starts
+    atomic = False
+
+    dependencies = [
+        ('employee', '0005_vote_vote_date'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_vote_date, migrations.RunPython.noop),
+    ]
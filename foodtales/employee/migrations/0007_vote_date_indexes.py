@@ -0,0 +1,38 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:28
+
+import employee.models
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0006_backfill_vote_date'),
+        ('restaurant', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='vote',
+            name='unique_user_menu_per_day',
+        ),
+        migrations.AlterField(
+            model_name='vote',
+            name='vote_date',
+            field=models.DateField(default=employee.models.utc_today),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['user', 'vote_date'], name='vote_user_date_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='vote',
+            index=models.Index(fields=['vote_date', 'menu', 'rank'], name='vote_date_menu_rank_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='vote',
+            constraint=models.UniqueConstraint(fields=('user', 'menu', 'vote_date'), name='unique_user_menu_per_day'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.1 on 2026-10-18 08:29
+
+import django.db.models.deletion
+import django.utils.timezone
+import employee.models
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+BACKFILL_BATCH_SIZE = 1000
+
+
+def backfill_ballots(apps, schema_editor):
+    # Fold existing Vote rows into one ballot per user and day.
+    Vote = apps.get_model("employee", "Vote")
+    Ballot = apps.get_model("employee", "Ballot")
+    votes = Vote.objects.order_by("user_id", "vote_date", "rank").values_list(
+        "user_id", "vote_date", "menu_id", "created_at")
+
+    batch, current = [], None
+    for user_id, vote_date, menu_id, created_at in votes.iterator(
+        chunk_size=BACKFILL_BATCH_SIZE
+    ):
+        if current is None or (current.user_id, current.date) != (
+            user_id, vote_date
+        ):
+            current = Ballot(
+                user_id=user_id, date=vote_date, first_menu_id=menu_id,
+                created_at=created_at)
+            batch.append(current)
+        elif current.second_menu_id is None:
+            current.second_menu_id = menu_id
+        else:
+            current.third_menu_id = menu_id
+        if len(batch) > BACKFILL_BATCH_SIZE:
+            Ballot.objects.bulk_create(batch[:-1])
+            batch = batch[-1:]
+    Ballot.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0007_vote_date_indexes'),
+        ('restaurant', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Ballot',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('date', models.DateField(default=employee.models.utc_today)),
+                ('created_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('first_menu', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='first_choice_ballots', to='restaurant.menu')),
+                ('second_menu', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='second_choice_ballots', to='restaurant.menu')),
+                ('third_menu', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='third_choice_ballots', to='restaurant.menu')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='ballots', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('user', 'date'), name='unique_ballot_per_user_per_day')],
+            },
+        ),
+        migrations.RunPython(backfill_ballots, migrations.RunPython.noop),
+    ]
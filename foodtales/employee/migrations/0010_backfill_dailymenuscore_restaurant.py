@@ -0,0 +1,41 @@
+from django.db import migrations, transaction
+from django.db.models import OuterRef, Subquery
+
+BACKFILL_CHUNK_SIZE = 5000
+
+
+def backfill_restaurant(apps, schema_editor):
+    # One transaction per chunk of primary keys, so a large score table is
+    # never locked by a single huge UPDATE
+    DailyMenuScore = apps.get_model("employee", "DailyMenuScore")
+    Menu = apps.get_model("restaurant", "Menu")
+    db = schema_editor.connection.alias
+    pending = DailyMenuScore.objects.using(db).filter(
+        restaurant__isnull=True)
+    while True:
+        with transaction.atomic(using=db):
+            chunk = list(
+                pending.values_list("pk", flat=True)[:BACKFILL_CHUNK_SIZE])
+            if not chunk:
+                break
+            DailyMenuScore.objects.using(db).filter(pk__in=chunk).update(
+                restaurant_id=Subquery(
+                    Menu.objects.filter(pk=OuterRef("menu_id")).values(
+                        "restaurant_id")
+                )
+            )
+
+
+class Migration(migrations.Migration):
+
+    # The column was added by the previous migration, whose lock is
+    # released before the backfill starts
+    atomic = False
+
+    dependencies = [
+        ('employee', '0009_dailymenuscore_restaurant'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_restaurant, migrations.RunPython.noop),
+    ]
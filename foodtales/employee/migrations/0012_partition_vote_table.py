@@ -0,0 +1,147 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:40
+
+from datetime import date, datetime, timezone
+
+from django.db import migrations, transaction
+
+from employee.partitions import (
+    BOUND_CHECK,
+    attach_partition_sql,
+    check_partition_sql,
+)
+
+TABLE = "employee_vote"
+LEGACY = "employee_vote_legacy"
+PKEY_INDEX = "employee_vote_legacy_pkey"
+MONTHS_AHEAD = 3
+
+
+def add_months(day, months):
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_vote_table(apps, schema_editor):
+    """
+    Turn the vote table into a table range-partitioned by vote_date.
+
+    The existing table is attached as-is as the partition of everything
+    before next month, so history is not copied. Whatever needs a scan of
+    it runs first, while votes keep being read and written: validating a
+    CHECK constraint on those bounds, so the attach does not scan it under
+    an ACCESS EXCLUSIVE lock, and building the index of the new (id,
+    vote_date) primary key concurrently. Its other indexes are reused.
+    """
+    connection = schema_editor.connection
+    if connection.vendor != "postgresql":
+        return
+    qn = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = %s::regclass", [TABLE])
+        if cursor.fetchone()[0] == "p":
+            return
+
+    next_month = add_months(datetime.now(timezone.utc).date(), 1)
+    with connection.cursor() as cursor:
+        for sql, params in check_partition_sql(
+            connection, TABLE, None, next_month
+        ):
+            cursor.execute(sql, params)
+        cursor.execute(
+            f"CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS {qn(PKEY_INDEX)} "
+            f"ON {qn(TABLE)} (id, vote_date)"
+        )
+
+    with transaction.atomic(using=connection.alias), \
+            connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT conname, contype, pg_get_constraintdef(oid) "
+            "FROM pg_constraint WHERE conrelid = %s::regclass "
+            "AND conname <> %s",
+            [TABLE, BOUND_CHECK],
+        )
+        constraints = cursor.fetchall()
+        cursor.execute(
+            "SELECT indexrelid::regclass::text, pg_get_indexdef(indexrelid) "
+            "FROM pg_index WHERE indrelid = %s::regclass AND NOT EXISTS ("
+            "SELECT 1 FROM pg_constraint WHERE conrelid = indrelid "
+            "AND conindid = indexrelid) AND indexrelid <> %s::regclass",
+            [TABLE, PKEY_INDEX],
+        )
+        indexes = cursor.fetchall()
+
+        # Index names are schema-wide: free them for the partitioned table.
+        cursor.execute(f"ALTER TABLE {qn(TABLE)} RENAME TO {qn(LEGACY)}")
+        for name, kind, _ in constraints:
+            if kind == "p":
+                cursor.execute(
+                    f"ALTER TABLE {qn(LEGACY)} DROP CONSTRAINT {qn(name)}")
+            elif kind == "u":
+                cursor.execute(
+                    f"ALTER TABLE {qn(LEGACY)} RENAME CONSTRAINT {qn(name)} "
+                    f"TO {qn(name[:56] + '_legacy')}"
+                )
+        for name, _ in indexes:
+            cursor.execute(
+                f"ALTER INDEX {qn(name)} "
+                f"RENAME TO {qn(name[:56] + '_legacy')}"
+            )
+        # Only an index backing a constraint can serve the primary key of
+        # the partitioned table
+        cursor.execute(
+            f"ALTER TABLE {qn(LEGACY)} ADD CONSTRAINT {qn(PKEY_INDEX)} "
+            f"PRIMARY KEY USING INDEX {qn(PKEY_INDEX)}"
+        )
+
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE)} (LIKE {qn(LEGACY)} INCLUDING DEFAULTS) "
+            "PARTITION BY RANGE (vote_date)"
+        )
+        # Unique constraints of a partitioned table must hold the partition
+        # key; the ORM keeps treating id alone as the primary key.
+        cursor.execute(
+            f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(TABLE + '_pkey')} "
+            "PRIMARY KEY (id, vote_date)"
+        )
+        for name, kind, definition in constraints:
+            if kind != "p":
+                cursor.execute(
+                    f"ALTER TABLE {qn(TABLE)} ADD CONSTRAINT {qn(name)} "
+                    f"{definition}"
+                )
+        for _, definition in indexes:
+            cursor.execute(definition)
+
+        # Reuses the index built above for the primary key
+        for sql, params in attach_partition_sql(
+            connection, LEGACY, None, next_month
+        ):
+            cursor.execute(sql, params)
+        for months in range(MONTHS_AHEAD):
+            start = add_months(next_month, months)
+            cursor.execute(
+                f"CREATE TABLE {qn(f'{TABLE}_p{start:%Y%m}')} PARTITION OF "
+                f"{qn(TABLE)} FOR VALUES FROM (%s) TO (%s)",
+                [start, add_months(start, 1)],
+            )
+        cursor.execute(
+            f"CREATE TABLE {qn(TABLE + '_default')} PARTITION OF {qn(TABLE)} "
+            "DEFAULT"
+        )
+
+
+class Migration(migrations.Migration):
+    # Validation and the index build must not share the transaction, and
+    # the locks, of the table swap
+    atomic = False
+
+    dependencies = [
+        ('employee', '0011_alter_dailymenuscore_restaurant'),
+    ]
+
+    operations = [
+        # Not reversible in place; earlier migrations keep working against
+        # the partitioned table.
+        migrations.RunPython(partition_vote_table, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 5.1.1 on 2026-10-18 09:04
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('employee', '0012_partition_vote_table'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailyResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(unique=True)),
+                ('scores', models.JSONField(default=list)),
+                ('ballots', models.PositiveIntegerField(default=0)),
+                ('finalized_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='VoteArchive',
+            fields=[
+                ('id', models.UUIDField(editable=False, primary_key=True, serialize=False)),
+                ('user_id', models.BigIntegerField()),
+                ('menu_id', models.UUIDField()),
+                ('restaurant_id', models.BigIntegerField(null=True)),
+                ('rank', models.IntegerField(choices=[(1, '1st (3 points)'), (2, '2nd (2 points)'), (3, '3rd (1 point)')])),
+                ('created_at', models.DateTimeField()),
+                ('vote_date', models.DateField()),
+                ('archived_at', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['vote_date'], name='vote_archive_date_idx'), models.Index(fields=['user_id', 'vote_date'], name='vote_archive_user_date_idx')],
+            },
+        ),
+    ]
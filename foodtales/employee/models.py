@@ -1,17 +1,47 @@
 from datetime import datetime, timezone
+from functools import partial
 import uuid
 
-from django.db import models
+from django.db import connections, models, router, transaction
 from django.contrib.auth import get_user_model
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import UniqueConstraint
+from django.db.models import (
+    Case,
+    Count,
+    F,
+    UniqueConstraint,
+    Value,
+    When,
+)
+from django.utils.timezone import now as timezone_now
 
+from employee.results_cache import bump_version
 from restaurant.models import Menu
 
 User = get_user_model()
 
+# Score columns of DailyMenuScore; the index of a vote counter is its rank.
+SCORE_FIELDS = ["points", "first_votes", "second_votes", "third_votes"]
+# Best score first; menus tied on all of these share the win.
+WINNER_ORDER = ["-points", "-first_votes", "-second_votes"]
+
+
+def winner_key(row):
+    return tuple(row[field.lstrip("-")] for field in WINNER_ORDER)
+
+
+def utc_today():
+    return datetime.now(timezone.utc).date()
+
 
 class Vote(models.Model):
+    """
+    Per-rank vote rows written before ballots became the record of a vote.
+
+    Nothing writes them any more; rows left from before are still exported
+    and archived by the compaction, which skips the ballots they duplicate.
+    """
+
     RANK_CHOICES = [
         (1, "1st (3 points)"),
         (2, "2nd (2 points)"),
@@ -28,22 +58,428 @@ class Vote(models.Model):
         validators=[MinValueValidator(1), MaxValueValidator(3)]
     )
     created_at = models.DateTimeField(default=datetime.now)
+    vote_date = models.DateField(default=utc_today)
 
     class Meta:
         constraints = [
             UniqueConstraint(
-                fields=["user", "menu"],
-                condition=models.Q(
-                    created_at__date=models.F("created_at__date")),
+                fields=["user", "menu", "vote_date"],
                 name="unique_user_menu_per_day",
             )
         ]
+        indexes = [
+            models.Index(
+                fields=["user", "vote_date"], name="vote_user_date_idx"
+            ),
+            models.Index(
+                fields=["vote_date", "menu", "rank"],
+                name="vote_date_menu_rank_idx",
+            ),
+        ]
 
     @property
     def points(self):
         return 4 - self.rank
 
     def save(self, *args, **kwargs):
-        if self.menu.date != datetime.now(timezone.utc).date():
+        # Ballots validate menu dates in bulk before inserting, so only check
+        # here when the menu is already loaded instead of fetching it per row.
+        if (
+            Vote.menu.is_cached(self)
+            and self.menu.date != datetime.now(timezone.utc).date()
+        ):
             raise ValueError("Can only vote for today's menus.")
         super().save(*args, **kwargs)
+
+
+class BallotManager(models.Manager):
+    def claim(self, user_id, date, menu_ids, ballot_id=None):
+        """
+        Insert the ballot of ``user_id`` for ``date`` with ``menu_ids``
+        ordered from first to third choice.
+
+        Uses ``INSERT ... ON CONFLICT DO NOTHING`` on the ``(user, date)``
+        constraint, so a concurrent or repeated ballot is rejected by a
+        single index probe instead of a racy pre-check. Returns the new
+        ballot, or ``None`` when the user already voted that day.
+        """
+        menu_ids = list(menu_ids) + [None] * (3 - len(menu_ids))
+        ballot = self.model(
+            id=ballot_id or uuid.uuid4(),
+            user_id=user_id,
+            date=date,
+            first_menu_id=menu_ids[0],
+            second_menu_id=menu_ids[1],
+            third_menu_id=menu_ids[2],
+        )
+        connection = connections[router.db_for_write(self.model)]
+        qn = connection.ops.quote_name
+        fields = self.model._meta.concrete_fields
+        sql = "INSERT INTO {} ({}) VALUES ({}) ON CONFLICT ({}, {}) " \
+            "DO NOTHING".format(
+                qn(self.model._meta.db_table),
+                ", ".join(qn(field.column) for field in fields),
+                ", ".join(["%s"] * len(fields)),
+                qn(self.model._meta.get_field("user").column),
+                qn(self.model._meta.get_field("date").column),
+            )
+        params = [
+            field.get_db_prep_save(field.pre_save(ballot, True), connection)
+            for field in fields
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+            if cursor.rowcount != 1:
+                return None
+        ballot._state.adding = False
+        ballot._state.db = connection.alias
+        return ballot
+
+
+class Ballot(models.Model):
+    """
+    One row per employee per day holding the ranked menu choices. The
+    ``(user, date)`` constraint is what enforces a single vote per day.
+
+    The ballot is the record of a vote: scores are reconciled, exported
+    and archived from it, one row per voter where ``Vote`` took one per
+    ranked choice. ``ranked_choices`` expands it back into per-rank votes.
+    """
+
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="ballots")
+    date = models.DateField(default=utc_today)
+    first_menu = models.ForeignKey(
+        Menu, on_delete=models.CASCADE, related_name="first_choice_ballots")
+    second_menu = models.ForeignKey(
+        Menu,
+        on_delete=models.CASCADE,
+        related_name="second_choice_ballots",
+        null=True,
+        blank=True,
+    )
+    third_menu = models.ForeignKey(
+        Menu,
+        on_delete=models.CASCADE,
+        related_name="third_choice_ballots",
+        null=True,
+        blank=True,
+    )
+    created_at = models.DateTimeField(default=timezone_now)
+
+    objects = BallotManager()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["user", "date"], name="unique_ballot_per_user_per_day"
+            )
+        ]
+
+    @property
+    def ranked_menu_ids(self):
+        return [
+            menu_id
+            for menu_id in (
+                self.first_menu_id, self.second_menu_id, self.third_menu_id)
+            if menu_id is not None
+        ]
+
+    @property
+    def ranked_choices(self):
+        return [
+            (menu_id, rank)
+            for rank, menu_id in enumerate(self.ranked_menu_ids, start=1)
+        ]
+
+
+def ballot_vote_id(ballot_id, rank):
+    """
+    Stable id of the vote for the ``rank`` choice of a ballot, so a vote
+    keeps the same id in exports before and after it is archived.
+    """
+    return uuid.uuid5(ballot_id, str(rank))
+
+
+class DailyMenuScoreManager(models.Manager):
+    def record(self, ranked_menu_ids, date):
+        """
+        Add freshly cast choices, given as ``(menu_id, rank)`` pairs, to the
+        running scores of ``date``.
+
+        Must be called inside the transaction that inserted their ballot so
+        the score table never drifts from the ballots. The results version,
+        which live result streams poll, moves once it commits.
+        """
+        deltas = {}
+        for menu_id, rank in ranked_menu_ids:
+            increments = deltas.setdefault(
+                menu_id, dict.fromkeys(SCORE_FIELDS, 0))
+            increments["points"] += 4 - rank
+            increments[SCORE_FIELDS[rank]] += 1
+        if not deltas:
+            return
+
+        # Make sure every touched menu has a row, then bump all of them with
+        # a single UPDATE so concurrent ballots only ever increment.
+        self.create_missing(date, list(deltas))
+        self.filter(menu_id__in=deltas, date=date).update(
+            **{
+                field: F(field) + Case(
+                    *[
+                        When(menu_id=menu_id, then=Value(increments[field]))
+                        for menu_id, increments in deltas.items()
+                    ],
+                    default=Value(0),
+                )
+                for field in SCORE_FIELDS
+            }
+        )
+        transaction.on_commit(partial(bump_version, date))
+
+    def create_missing(self, date, menu_ids):
+        """
+        Insert empty score rows of ``date`` for the menus of ``menu_ids``
+        that have none yet, copying their restaurant from the menu table in
+        the same statement.
+        """
+        connection = connections[router.db_for_write(self.model)]
+        qn = connection.ops.quote_name
+        opts = self.model._meta
+        columns = ["menu", "restaurant", "date", *SCORE_FIELDS]
+        sql = "INSERT INTO {} ({}) SELECT {}, {}, %s, {} FROM {} " \
+            "WHERE {} IN ({}) ON CONFLICT ({}, {}) DO NOTHING".format(
+                qn(opts.db_table),
+                ", ".join(
+                    qn(opts.get_field(name).column) for name in columns),
+                qn(Menu._meta.pk.column),
+                qn(Menu._meta.get_field("restaurant").column),
+                ", ".join(["%s"] * len(SCORE_FIELDS)),
+                qn(Menu._meta.db_table),
+                qn(Menu._meta.pk.column),
+                ", ".join(["%s"] * len(menu_ids)),
+                qn(opts.get_field("menu").column),
+                qn(opts.get_field("date").column),
+            )
+        params = [
+            opts.get_field("date").get_db_prep_value(date, connection),
+            *[0] * len(SCORE_FIELDS),
+            *[
+                Menu._meta.pk.get_db_prep_value(menu_id, connection)
+                for menu_id in menu_ids
+            ],
+        ]
+        with connection.cursor() as cursor:
+            cursor.execute(sql, params)
+
+    def expected_for(self, date):
+        """
+        Aggregate the ballots of ``date`` into score values keyed by menu
+        id, the reference the running scores are checked against.
+
+        Finalized days no longer have ballots; their compact result is the
+        reference instead.
+        """
+        result = DailyResult.objects.filter(date=date).first()
+        if result is not None:
+            return result.expected_scores()
+        ballots = Ballot.objects.filter(date=date)
+        expected = {}
+        choices = ["first_menu", "second_menu", "third_menu"]
+        for rank, field in enumerate(choices, start=1):
+            rows = (
+                ballots.filter(**{f"{field}__isnull": False})
+                .values(field)
+                .annotate(total=Count("id"))
+                .values_list(field, "total")
+            )
+            for menu_id, total in rows:
+                values = expected.setdefault(
+                    menu_id, dict.fromkeys(SCORE_FIELDS, 0))
+                values[SCORE_FIELDS[rank]] = total
+                values["points"] += (4 - rank) * total
+        return expected
+
+    def reconcile(self, date, dry_run=False):
+        """
+        Compare the stored scores of ``date`` with the day's ballots and fix
+        every row that drifted. Returns the ids of the menus that were
+        out of sync.
+        """
+        expected = self.expected_for(date)
+        stored = {
+            score.menu_id: score for score in self.filter(date=date)
+        }
+
+        restaurants = dict(
+            Menu.objects.filter(
+                id__in=[menu_id for menu_id in expected
+                        if menu_id not in stored]
+            ).values_list("id", "restaurant_id")
+        )
+        to_create, to_update, drifted = [], [], []
+        for menu_id, values in expected.items():
+            score = stored.pop(menu_id, None)
+            if score is None:
+                to_create.append(
+                    self.model(
+                        menu_id=menu_id,
+                        restaurant_id=restaurants[menu_id],
+                        date=date,
+                        **values,
+                    )
+                )
+            elif any(getattr(score, f) != values[f] for f in SCORE_FIELDS):
+                for field in SCORE_FIELDS:
+                    setattr(score, field, values[field])
+                to_update.append(score)
+            else:
+                continue
+            drifted.append(menu_id)
+        # Whatever is left has no votes behind it any more.
+        drifted.extend(stored)
+
+        if not dry_run:
+            with transaction.atomic():
+                self.bulk_create(to_create)
+                self.bulk_update(to_update, SCORE_FIELDS)
+                self.filter(
+                    date=date, menu_id__in=list(stored)).delete()
+                if drifted:
+                    transaction.on_commit(partial(bump_version, date))
+        return drifted
+
+
+class DailyMenuScore(models.Model):
+    """
+    Per-menu, per-day voting totals, maintained incrementally by the vote
+    write path so results never have to re-aggregate ballots.
+
+    A restaurant has one menu a day, so these rows double as the daily
+    rollup per restaurant that leaderboards are computed from.
+    """
+
+    menu = models.ForeignKey(
+        Menu, on_delete=models.CASCADE, related_name="daily_scores")
+    # Copied from the menu so leaderboards group without joining menus
+    restaurant = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name="daily_scores")
+    date = models.DateField()
+    points = models.PositiveIntegerField(default=0)
+    first_votes = models.PositiveIntegerField(default=0)
+    second_votes = models.PositiveIntegerField(default=0)
+    third_votes = models.PositiveIntegerField(default=0)
+
+    objects = DailyMenuScoreManager()
+
+    class Meta:
+        constraints = [
+            UniqueConstraint(
+                fields=["menu", "date"], name="unique_menu_score_per_day"
+            )
+        ]
+        indexes = [
+            models.Index(
+                fields=["date", "-points"], name="menu_score_date_points_idx"
+            )
+        ]
+
+
+class DailyResultManager(models.Manager):
+    def build_scores(self, date):
+        """
+        Return the compact per-menu results of ``date`` from the daily
+        scores, best first.
+        """
+        rows = list(
+            DailyMenuScore.objects.filter(date=date, points__gt=0)
+            .order_by(*WINNER_ORDER, "menu")
+            .values(
+                "menu", "restaurant", "restaurant__restaurant_name",
+                *SCORE_FIELDS,
+            )
+        )
+        # Every menu tied with the best one on the winner fields wins
+        best = rows and winner_key(rows[0])
+        return [
+            {
+                "menu": str(row["menu"]),
+                "restaurant": row["restaurant"],
+                "restaurant_name": row["restaurant__restaurant_name"],
+                "points": row["points"],
+                "ranks": [row[field] for field in SCORE_FIELDS[1:]],
+                "is_winner": winner_key(row) == best,
+            }
+            for row in rows
+        ]
+
+    def finalize(self, date):
+        """
+        Reconcile the scores of ``date`` with its ballots and freeze them
+        into the day's ``DailyResult``.
+        """
+        with transaction.atomic():
+            DailyMenuScore.objects.reconcile(date)
+            result, _ = self.update_or_create(
+                date=date,
+                defaults={
+                    "scores": self.build_scores(date),
+                    "ballots": Ballot.objects.filter(date=date).count(),
+                },
+            )
+        return result
+
+
+class DailyResult(models.Model):
+    """
+    Immutable results of a finished day: per-menu points and rank
+    histogram, with the restaurant names of the time.
+
+    Holds plain ids rather than foreign keys, so it survives the deletion
+    of menus, restaurants and employees and never takes part in cascades.
+    """
+
+    date = models.DateField(unique=True)
+    scores = models.JSONField(default=list)
+    ballots = models.PositiveIntegerField(default=0)
+    finalized_at = models.DateTimeField(default=timezone_now)
+
+    objects = DailyResultManager()
+
+    def expected_scores(self):
+        return {
+            uuid.UUID(score["menu"]): {
+                "points": score["points"],
+                **dict(zip(SCORE_FIELDS[1:], score["ranks"])),
+            }
+            for score in self.scores
+        }
+
+
+class VoteArchive(models.Model):
+    """
+    Votes of finalized days, one row per ranked choice of their ballots,
+    kept for audit. Same columns as ``Vote`` plus the restaurant, but
+    without foreign keys so that deleting a user or a menu does not cascade
+    into years of history.
+    """
+
+    id = models.UUIDField(primary_key=True, editable=False)
+    user_id = models.BigIntegerField()
+    menu_id = models.UUIDField()
+    restaurant_id = models.BigIntegerField(null=True)
+    rank = models.IntegerField(choices=Vote.RANK_CHOICES)
+    created_at = models.DateTimeField()
+    vote_date = models.DateField()
+    archived_at = models.DateTimeField(default=timezone_now)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=["vote_date"], name="vote_archive_date_idx"),
+            models.Index(
+                fields=["user_id", "vote_date"],
+                name="vote_archive_user_date_idx",
+            ),
+        ]
@@ -0,0 +1,188 @@
+import re
+from datetime import date
+
+from django.db import connections, transaction
+
+from employee.models import Vote, utc_today
+
+TABLE = Vote._meta.db_table
+DEFAULT_PARTITION = f"{TABLE}_default"
+BOUND_RE = re.compile(r"FROM \((.+)\) TO \((.+)\)")
+# CHECK constraint proving that a table fits the bounds of its partition
+BOUND_CHECK = "vote_date_partition_bound"
+
+
+def add_months(day, months):
+    """
+    Return the first day of the month ``months`` after the month of ``day``.
+    """
+    month = day.month - 1 + months
+    return date(day.year + month // 12, month % 12 + 1, 1)
+
+
+def partition_name(start):
+    return f"{TABLE}_p{start:%Y%m}"
+
+
+def check_partition_sql(connection, name, start, end):
+    """
+    Return the statements adding, then validating, a CHECK constraint on
+    table ``name`` matching the partition bounds ``start``-``end`` (no
+    lower bound when ``start`` is ``None``), as ``(sql, params)`` pairs.
+
+    Adding the constraint ``NOT VALID`` locks the table for an instant and
+    validating it scans the table without blocking reads or writes, so on
+    a large table each should run in its own transaction.
+    """
+    qn = connection.ops.quote_name
+    condition, params = "vote_date IS NOT NULL AND vote_date < %s", [end]
+    if start is not None:
+        condition += " AND vote_date >= %s"
+        params.append(start)
+    return [
+        (
+            f"ALTER TABLE {qn(name)} ADD CONSTRAINT {qn(BOUND_CHECK)} "
+            f"CHECK ({condition}) NOT VALID",
+            params,
+        ),
+        (f"ALTER TABLE {qn(name)} VALIDATE CONSTRAINT {qn(BOUND_CHECK)}", []),
+    ]
+
+
+def attach_partition_sql(connection, name, start, end):
+    """
+    Return the statements attaching table ``name`` as the partition of
+    the vote table for ``start``-``end``, then dropping the constraint of
+    ``check_partition_sql``. That constraint must be valid by then: it is
+    what spares PostgreSQL a scan of the whole table while the attach
+    holds it under an ACCESS EXCLUSIVE lock.
+    """
+    qn = connection.ops.quote_name
+    lower, params = ("MINVALUE", []) if start is None else ("%s", [start])
+    return [
+        (
+            f"ALTER TABLE {qn(TABLE)} ATTACH PARTITION {qn(name)} "
+            f"FOR VALUES FROM ({lower}) TO (%s)",
+            [*params, end],
+        ),
+        (f"ALTER TABLE {qn(name)} DROP CONSTRAINT {qn(BOUND_CHECK)}", []),
+    ]
+
+
+def is_partitioned(using="default"):
+    """
+    Whether the vote table is a partitioned PostgreSQL table. Always false
+    on other databases, where the helpers below do nothing.
+    """
+    connection = connections[using]
+    if connection.vendor != "postgresql":
+        return False
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT relkind FROM pg_class WHERE oid = to_regclass(%s)",
+            [TABLE],
+        )
+        row = cursor.fetchone()
+    return row is not None and row[0] == "p"
+
+
+def parse_bound(value):
+    if value in ("MINVALUE", "MAXVALUE"):
+        return None
+    return date.fromisoformat(value.strip("'"))
+
+
+def list_partitions(using="default"):
+    """
+    Return ``(name, start, end)`` for every range partition of the vote
+    table, ``start`` being ``None`` for the partition holding all history
+    from before partitioning. The default partition is not listed.
+    """
+    if not is_partitioned(using):
+        return []
+    with connections[using].cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) "
+            "FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+            "WHERE i.inhparent = %s::regclass",
+            [TABLE],
+        )
+        rows = cursor.fetchall()
+    partitions = []
+    for name, bound in rows:
+        match = BOUND_RE.search(bound)
+        if match:
+            partitions.append(
+                (name, parse_bound(match[1]), parse_bound(match[2])))
+    return sorted(partitions, key=lambda p: (p[1] is not None, p[1]))
+
+
+def ensure_partitions(months_ahead, today=None, using="default"):
+    """
+    Create the monthly partitions of the current month and the next
+    ``months_ahead`` months that are not covered yet. Returns their names.
+
+    Votes that already landed in the default partition for one of those
+    months are moved into the new partition.
+    """
+    if not is_partitioned(using):
+        return []
+    today = today or utc_today()
+    covered = [(start, end) for _, start, end in list_partitions(using)]
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    created = []
+    for months in range(months_ahead + 1):
+        start = add_months(today, months)
+        if any(
+            (low is None or low <= start) and start < high
+            for low, high in covered
+        ):
+            continue
+        end = add_months(start, 1)
+        name = partition_name(start)
+        with transaction.atomic(using), connection.cursor() as cursor:
+            cursor.execute(
+                f"CREATE TABLE {qn(name)} "
+                f"(LIKE {qn(TABLE)} INCLUDING DEFAULTS)"
+            )
+            cursor.execute(
+                f"WITH moved AS (DELETE FROM {qn(DEFAULT_PARTITION)} "
+                "WHERE vote_date >= %s AND vote_date < %s RETURNING *) "
+                f"INSERT INTO {qn(name)} SELECT * FROM moved",
+                [start, end],
+            )
+            for sql, params in (
+                check_partition_sql(connection, name, start, end)
+                + attach_partition_sql(connection, name, start, end)
+            ):
+                cursor.execute(sql, params)
+        covered.append((start, end))
+        created.append(name)
+    return created
+
+
+def prune_partitions(retention_months, drop=False, today=None,
+                     using="default"):
+    """
+    Detach, and with ``drop`` delete, the partitions holding only votes
+    older than ``retention_months`` whole months. Returns their names.
+
+    Detached partitions stay in the database as plain tables for audit.
+    """
+    if not is_partitioned(using):
+        return []
+    cutoff = add_months(today or utc_today(), -retention_months)
+    connection = connections[using]
+    qn = connection.ops.quote_name
+    pruned = []
+    for name, _, end in list_partitions(using):
+        if end is None or end > cutoff:
+            continue
+        with transaction.atomic(using), connection.cursor() as cursor:
+            cursor.execute(
+                f"ALTER TABLE {qn(TABLE)} DETACH PARTITION {qn(name)}")
+            if drop:
+                cursor.execute(f"DROP TABLE {qn(name)}")
+        pruned.append(name)
+    return pruned
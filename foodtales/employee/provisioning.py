@@ -0,0 +1,193 @@
+import codecs
+import csv
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import nullcontext
+from itertools import islice
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.exceptions import ValidationError
+from django.core.validators import validate_email
+from django.db import IntegrityError, transaction
+
+User = get_user_model()
+
+DEFAULT_BATCH_SIZE = 500
+# Chunks handed to each pool worker at a time, to amortize pickling
+HASH_CHUNK_SIZE = 16
+
+
+def init_worker():
+    # Workers started with "spawn" do not inherit the configured apps
+    django.setup()
+
+
+def iter_rows(stream):
+    """
+    Yield ``(line_number, row)`` for every row of a binary CSV stream with
+    an ``email`` column and optional ``password`` and ``employee_id``
+    columns.
+    """
+    reader = csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+    for row in reader:
+        yield reader.line_num, row
+
+
+class EmployeeProvisioner:
+    """
+    Creates employee accounts in batches.
+
+    Per batch, one query finds the emails and employee ids already taken,
+    passwords are hashed across a process pool and the users are inserted
+    with a single ``bulk_create``. Rows that cannot be created are
+    reported by line number without stopping the others.
+    """
+
+    def __init__(self, batch_size=DEFAULT_BATCH_SIZE, workers=None):
+        self.batch_size = batch_size
+        self.workers = workers
+        self.seen_emails = set()
+        self.seen_ids = set()
+        self.created = 0
+        self.errors = []
+
+    def run(self, rows):
+        pool = (
+            ProcessPoolExecutor(self.workers, initializer=init_worker)
+            if self.workers != 0
+            else nullcontext()
+        )
+        with pool:
+            rows = iter(rows)
+            while batch := list(islice(rows, self.batch_size)):
+                self.provision_batch(batch, pool)
+        return {
+            "created": self.created,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+        }
+
+    def add_error(self, line_number, email, message):
+        self.errors.append(
+            {"line": line_number, "email": email, "errors": [message]})
+
+    def validate(self, batch):
+        valid = []
+        for line_number, row in batch:
+            email = User.objects.normalize_email(
+                (row.get("email") or "").strip())
+            employee_id = (row.get("employee_id") or "").strip() or None
+            try:
+                validate_email(email)
+            except ValidationError:
+                self.add_error(line_number, email, "Enter a valid email.")
+                continue
+            if email.lower() in self.seen_emails:
+                self.add_error(line_number, email, "Duplicate email in file.")
+                continue
+            if employee_id in self.seen_ids:
+                self.add_error(
+                    line_number, email, "Duplicate employee ID in file.")
+                continue
+            self.seen_emails.add(email.lower())
+            if employee_id:
+                self.seen_ids.add(employee_id)
+            valid.append(
+                (line_number, email, employee_id, row.get("password") or None)
+            )
+        return valid
+
+    def provision_batch(self, batch, pool):
+        valid = self.validate(batch)
+        taken_emails = {
+            email.lower()
+            for email in User.objects.filter(
+                email__in=[email for _, email, _, _ in valid]
+            ).values_list("email", flat=True)
+        }
+        taken_ids = set(
+            User.objects.filter(
+                employee_id__in=[eid for _, _, eid, _ in valid if eid]
+            ).values_list("employee_id", flat=True)
+        )
+        rows = []
+        for line_number, email, employee_id, password in valid:
+            if email.lower() in taken_emails:
+                self.add_error(
+                    line_number, email, "A user with this email exists.")
+            elif employee_id in taken_ids:
+                self.add_error(
+                    line_number, email, "This employee ID is already taken.")
+            else:
+                rows.append((line_number, email, employee_id, password))
+        if not rows:
+            return
+
+        generated = self.generate_ids(
+            sum(1 for _, _, employee_id, _ in rows if not employee_id))
+        passwords = [password for _, _, _, password in rows]
+        hashes = (
+            pool.map(make_password, passwords, chunksize=HASH_CHUNK_SIZE)
+            if self.workers != 0
+            else map(make_password, passwords)
+        )
+        users = [
+            (
+                line_number,
+                User(
+                    email=email,
+                    user_type="employee",
+                    employee_id=employee_id or next(generated),
+                    password=password_hash,
+                ),
+            )
+            for (line_number, email, employee_id, _), password_hash in zip(
+                rows, hashes)
+        ]
+        self.insert(users)
+
+    def generate_ids(self, count):
+        """
+        Return an iterator over ``count`` new employee ids, checking the
+        whole set for collisions with one query per round.
+        """
+        ids = set()
+        while len(ids) < count:
+            candidates = {
+                User.generate_unique_id("E")
+                for _ in range(count - len(ids))
+            } - self.seen_ids
+            candidates -= set(
+                User.objects.filter(employee_id__in=candidates).values_list(
+                    "employee_id", flat=True)
+            )
+            ids |= candidates
+        self.seen_ids |= ids
+        return iter(ids)
+
+    def insert(self, users):
+        try:
+            with transaction.atomic():
+                User.objects.bulk_create([user for _, user in users])
+            self.created += len(users)
+            return
+        except IntegrityError:
+            pass
+        # Someone registered one of these concurrently: find out which
+        for line_number, user in users:
+            try:
+                with transaction.atomic():
+                    user.save()
+                self.created += 1
+            except IntegrityError:
+                self.add_error(
+                    line_number, user.email,
+                    "A user with this email or employee ID exists.")
+
+
+def provision_employees(stream, batch_size=DEFAULT_BATCH_SIZE, workers=None):
+    """
+    Create the employees listed in the binary CSV ``stream`` and return the
+    provisioning report.
+    """
+    return EmployeeProvisioner(batch_size, workers).run(iter_rows(stream))
@@ -0,0 +1,135 @@
+import asyncio
+import time
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+from foodtales.metrics import metrics
+from foodtales.routers import read_from_primary
+from foodtales.utils import (
+    bump_cache_version,
+    cache_version_bumped_recently,
+    get_cache_version,
+)
+
+VERSION_KEY = "vote-results:{date}:version"
+RESULTS_KEY = "vote-results:{date}:{limit}:v{version}"
+LATEST_KEY = "vote-results:{date}:{limit}:latest"
+
+
+def current_version(date):
+    return get_cache_version(VERSION_KEY.format(date=date))
+
+
+def bump_version(date):
+    """
+    Invalidate every cached result of ``date``. Called once a vote write
+    has committed.
+    """
+    bump_cache_version(VERSION_KEY.format(date=date))
+
+
+def get_results(date, limit, compute):
+    """
+    Return the results of ``date`` for ``limit`` from the cache, calling
+    ``compute`` on a miss.
+
+    Only one worker recomputes a given version at a time; the others serve
+    the previous version while it runs, or wait for it when there is none.
+    """
+    version = current_version(date)
+    key = RESULTS_KEY.format(date=date, limit=limit, version=version)
+    results = cache.get(key)
+    if results is not None:
+        metrics.incr("vote_results.cache_hit")
+        return results
+    metrics.incr("vote_results.cache_miss")
+
+    lock_key = f"{key}:lock"
+    timeout = settings.VOTE_RESULTS_CACHE_TIMEOUT
+    if cache.add(lock_key, True, timeout=settings.VOTE_RESULTS_LOCK_TIMEOUT):
+        try:
+            with read_from_primary(cache_version_bumped_recently(
+                VERSION_KEY.format(date=date)
+            )):
+                results = compute()
+            metrics.incr("vote_results.recompute")
+            cache.set_many(
+                {
+                    key: results,
+                    LATEST_KEY.format(date=date, limit=limit): results,
+                },
+                timeout=timeout,
+            )
+        finally:
+            cache.delete(lock_key)
+        return results
+
+    results = cache.get(LATEST_KEY.format(date=date, limit=limit))
+    if results is not None:
+        metrics.incr("vote_results.stale_served")
+        return results
+
+    deadline = time.monotonic() + settings.VOTE_RESULTS_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        time.sleep(0.05)
+        results = cache.get(key)
+        if results is not None:
+            metrics.incr("vote_results.cache_hit")
+            return results
+    # The recomputing worker is stuck; do not keep the request waiting.
+    metrics.incr("vote_results.recompute")
+    return compute()
+
+
+async def aget_results(date, limit, compute):
+    """
+    Async counterpart of ``get_results``, where ``compute`` is a coroutine
+    function. Waiting for another worker's recompute yields to the event
+    loop instead of sleeping the thread.
+    """
+    version = await sync_to_async(current_version)(date)
+    key = RESULTS_KEY.format(date=date, limit=limit, version=version)
+    results = await cache.aget(key)
+    if results is not None:
+        metrics.incr("vote_results.cache_hit")
+        return results
+    metrics.incr("vote_results.cache_miss")
+
+    lock_key = f"{key}:lock"
+    timeout = settings.VOTE_RESULTS_CACHE_TIMEOUT
+    if await cache.aadd(
+        lock_key, True, timeout=settings.VOTE_RESULTS_LOCK_TIMEOUT
+    ):
+        try:
+            bumped = await sync_to_async(cache_version_bumped_recently)(
+                VERSION_KEY.format(date=date))
+            with read_from_primary(bumped):
+                results = await compute()
+            metrics.incr("vote_results.recompute")
+            await cache.aset_many(
+                {
+                    key: results,
+                    LATEST_KEY.format(date=date, limit=limit): results,
+                },
+                timeout=timeout,
+            )
+        finally:
+            await cache.adelete(lock_key)
+        return results
+
+    results = await cache.aget(LATEST_KEY.format(date=date, limit=limit))
+    if results is not None:
+        metrics.incr("vote_results.stale_served")
+        return results
+
+    deadline = time.monotonic() + settings.VOTE_RESULTS_LOCK_TIMEOUT
+    while time.monotonic() < deadline:
+        await asyncio.sleep(0.05)
+        results = await cache.aget(key)
+        if results is not None:
+            metrics.incr("vote_results.cache_hit")
+            return results
+    metrics.incr("vote_results.recompute")
+    return await compute()
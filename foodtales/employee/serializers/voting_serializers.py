@@ -1,37 +1,23 @@
 from rest_framework import serializers
-from restaurant.models import Menu
-from employee.models import Vote
-from django.utils import timezone
-from django.db import transaction
 
+from employee.ballots import cast_ballot, validate_ballot
 
-class OldVoteSerializer(serializers.ModelSerializer):
-    menu = serializers.UUIDField()
 
-    class Meta:
-        model = Vote
-        fields = ["menu"]
+class OldVoteSerializer(serializers.Serializer):
+    menu = serializers.UUIDField()
 
     def validate(self, data):
-        user = self.context["request"].user
-        today = timezone.now().date()
-
-        if Vote.objects.filter(user=user, created_at__date=today).exists():
-            raise serializers.ValidationError("You have already voted today.")
-
-        # Fetch the Menu instance using the provided UUID
-        try:
-            menu = Menu.objects.get(id=data["menu"])
-            data["menu"] = menu
-        except Menu.DoesNotExist:
-            raise serializers.ValidationError("Invalid menu ID.")
-
+        if not self.context.get("defer_menu_checks"):
+            validate_ballot([data["menu"]])
         return data
 
-    def create(self, validated_data):
+    def get_ranked_menu_ids(self):
         # Old version always creates a top rank vote
-        validated_data["rank"] = 1
-        return super().create(validated_data)
+        return [(self.validated_data["menu"], 1)]
+
+    def create(self, validated_data):
+        return cast_ballot(
+            validated_data["user"].pk, self.get_ranked_menu_ids())
 
 
 class VoteItem(serializers.Serializer):
@@ -43,8 +29,6 @@ class NewVoteSerializer(serializers.Serializer):
     votes = VoteItem(many=True, allow_empty=False)
 
     def validate_votes(self, value):
-        user = self.context["request"].user
-        today = timezone.now().date()
         if len(value) != 3:
             raise serializers.ValidationError(
                 "You must provide exactly 3 votes."
@@ -62,30 +46,16 @@ class NewVoteSerializer(serializers.Serializer):
                 "You must assign points 1, 2, and 3 to your votes."
             )
 
-        # Validate that all menu UUIDs exist
-        existing_menus = Menu.objects.filter(id__in=menu_ids)
-        if existing_menus.count() != 3:
-            raise serializers.ValidationError(
-                "One or more menu IDs are invalid.")
-        if Vote.objects.filter(user=user, created_at__date=today).exists():
-            raise serializers.ValidationError("You have already voted today.")
+        if not self.context.get("defer_menu_checks"):
+            validate_ballot(menu_ids)
         return value
 
-    @transaction.atomic
+    def get_ranked_menu_ids(self):
+        return [
+            (vote_data["menu"], 4 - vote_data["points"])
+            for vote_data in self.validated_data["votes"]
+        ]
+
     def create(self, validated_data):
-        user = self.context["request"].user
-        votes = []
-        print(f"Creating votes for user: {user}")
-        for vote_data in validated_data["votes"]:
-            print(f"Creating vote: {vote_data}")
-            try:
-                vote = Vote.objects.create(
-                    user=user,
-                    menu_id=vote_data["menu"],
-                    rank=4 - vote_data["points"],
-                )
-                votes.append(vote)
-                print(f"Vote created: {vote}")
-            except Exception as e:
-                print(f"Error creating vote: {e}")
-        return votes
+        return cast_ballot(
+            validated_data["user"].pk, self.get_ranked_menu_ids())
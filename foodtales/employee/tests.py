@@ -1,11 +1,66 @@
+import asyncio
+import json
+import os
+import tempfile
+import unittest
+from datetime import date, timedelta
+from io import BytesIO, StringIO
+from unittest import mock
+
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import CommandError, call_command
+from django.db import IntegrityError, OperationalError, connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase, override_settings
 from django.urls import reverse
 from rest_framework.test import APITestCase
 from rest_framework import status
 from django.contrib.auth import get_user_model
 from django.utils import timezone
+from rest_framework_simplejwt.tokens import RefreshToken
 
+from restaurant.menu_snapshot import invalidate as invalidate_menus
 from restaurant.models import Menu
-from employee.models import Vote
+from employee.leaderboard import get_leaderboard
+from employee.management.scratch import is_scratch_database
+from employee.live import ResultsBroadcaster
+from employee.ballots import cast_ballot
+from employee.models import (
+    Ballot,
+    DailyMenuScore,
+    DailyResult,
+    Vote,
+    VoteArchive,
+    ballot_vote_id,
+)
+from employee.partitions import (
+    add_months,
+    attach_partition_sql,
+    check_partition_sql,
+    ensure_partitions,
+    is_partitioned,
+    list_partitions,
+    prune_partitions,
+)
+from employee.provisioning import provision_employees
+from employee.results_cache import (
+    LATEST_KEY,
+    RESULTS_KEY,
+    VERSION_KEY,
+    bump_version,
+    current_version,
+)
+from employee.vote_queue import VoteQueue, drain, write_ballot
+from foodtales.metrics import metrics
+from foodtales.routers import (
+    PIN_KEY,
+    read_from_primary,
+    reset_read_alias,
+    set_read_alias,
+)
+from user.tokens import ClaimsRefreshToken
 
 User = get_user_model()
 
@@ -70,22 +125,126 @@ class VoteMenuTest(APITestCase):
         data = {"menu": str(self.menu1.id)}
         response = self.client.post(url, data, format="json", **headers)
         self.assertEqual(response.status_code, status.HTTP_201_CREATED)
-        self.assertEqual(Vote.objects.count(), 1)
+        self.assertEqual(Ballot.objects.count(), 1)
 
         # Attempt to submit second vote on the same day
         data = {"menu": str(self.menu2.id)}
         response = self.client.post(url, data, format="json", **headers)
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
-        self.assertEqual(Vote.objects.count(), 1)  # Vote count should remain 1
+        self.assertEqual(Ballot.objects.count(), 1)
 
         # Verify the vote details
-        vote = Vote.objects.first()
-        self.assertEqual(vote.rank, 1)
-        self.assertEqual(vote.menu, self.menu1)
+        ballot = Ballot.objects.get()
+        self.assertEqual(ballot.ranked_choices, [(self.menu1.id, 1)])
+        self.assertFalse(Vote.objects.exists())
+
+        # The daily score is maintained in the same transaction
+        score = DailyMenuScore.objects.get(menu=self.menu1)
+        self.assertEqual(score.points, 3)
+        self.assertEqual(score.first_votes, 1)
+
+    def test_submit_vote_v2(self):
+        self.client.force_authenticate(user=self.employee)
+        url = reverse("submit-vote")
+        data = {
+            "votes": [
+                {"menu": str(self.menu1.id), "points": 3},
+                {"menu": str(self.menu2.id), "points": 2},
+                {"menu": str(self.menu3.id), "points": 1},
+            ]
+        }
+        # Menu check, ballot claim and two score queries (rows,
+        # increments), wrapped in a savepoint.
+        with self.assertNumQueries(6):
+            response = self.client.post(
+                url, data, format="json", HTTP_X_APP_VERSION="2.0")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        ballot = Ballot.objects.get(user=self.employee)
+        self.assertEqual(
+            ballot.ranked_menu_ids, [self.menu1.id, self.menu2.id,
+                                     self.menu3.id])
+        self.assertFalse(Vote.objects.exists())
+
+        # A retried ballot is rejected by the (user, date) constraint
+        response = self.client.post(
+            url, data, format="json", HTTP_X_APP_VERSION="2.0")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ballot.objects.count(), 1)
+
+    def test_ballot_claim_is_idempotent(self):
+        today = timezone.now().date()
+        self.assertIsNotNone(
+            Ballot.objects.claim(self.employee.pk, today, [self.menu1.id]))
+        self.assertIsNone(
+            Ballot.objects.claim(self.employee.pk, today, [self.menu2.id]))
+        self.assertEqual(
+            Ballot.objects.get(user=self.employee).first_menu_id,
+            self.menu1.id)
+
+    def test_submit_vote_rejects_unpublished_menu(self):
+        Menu.objects.filter(id=self.menu1.id).update(is_published=False)
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.post(
+            reverse("submit-vote"), {"menu": str(self.menu1.id)},
+            format="json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Ballot.objects.count(), 0)
+
+    def test_submit_vote_queued(self):
+        self.client.force_authenticate(user=self.employee)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        queue_path = os.path.join(directory.name, "votes.sqlite3")
+
+        with override_settings(
+            VOTE_INGESTION_MODE="queue", VOTE_QUEUE_PATH=queue_path
+        ):
+            response = self.client.post(
+                reverse("submit-vote"), {"menu": str(self.menu1.id)},
+                format="json")
+            self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+            self.assertEqual(Ballot.objects.count(), 0)
+            status_url = reverse(
+                "vote-status", args=[response.data["data"]["ballot_id"]])
+            response = self.client.get(status_url)
+            self.assertEqual(response.data["data"]["status"], "pending")
+
+            # A second ballot is accepted into the queue but rejected by the
+            # worker.
+            self.client.post(
+                reverse("submit-vote"), {"menu": str(self.menu2.id)},
+                format="json")
+            call_command("drain_vote_queue", "--once", stdout=StringIO())
+
+            response = self.client.get(status_url)
+            self.assertEqual(response.data["data"]["status"], "accepted")
+            self.assertEqual(
+                Ballot.objects.get().first_menu_id, self.menu1.id)
+
+    def test_vote_status_direct_mode_leaves_queue_alone(self):
+        self.client.force_authenticate(user=self.employee)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        queue_path = os.path.join(directory.name, "votes.sqlite3")
+
+        with override_settings(
+            VOTE_INGESTION_MODE="sync", VOTE_QUEUE_PATH=queue_path
+        ):
+            response = self.client.post(
+                reverse("submit-vote"), {"menu": str(self.menu1.id)},
+                format="json")
+            self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+            ballot = Ballot.objects.get()
+            response = self.client.get(
+                reverse("vote-status", args=[ballot.id]))
+
+        self.assertEqual(response.data["data"]["status"], "accepted")
+        self.assertFalse(os.path.exists(queue_path))
 
 
 class GetCurrentDayVoteTest(APITestCase):
     def setUp(self):
+        cache.clear()
         self.employee = User.objects.create_user(
             email="employee@example.com",
             password="testpassword123",
@@ -109,19 +268,13 @@ class GetCurrentDayVoteTest(APITestCase):
             restaurant=self.restaurant2, date=timezone.now().date(),
             is_published=True
         )
-        current_time = timezone.now()
-        Vote.objects.create(
+        ballot = Ballot.objects.create(
             user=self.employee,
-            menu=self.menu1,
-            rank=1,
-            created_at=timezone.make_aware(current_time.replace(tzinfo=None)),
-        )
-        Vote.objects.create(
-            user=self.employee,
-            menu=self.menu2,
-            rank=2,
-            created_at=timezone.make_aware(current_time.replace(tzinfo=None)),
+            date=timezone.now().date(),
+            first_menu=self.menu1,
+            second_menu=self.menu2,
         )
+        DailyMenuScore.objects.record(ballot.ranked_choices, ballot.date)
 
     def test_get_vote_results(self):
         self.client.force_authenticate(user=self.employee)
@@ -133,3 +286,926 @@ class GetCurrentDayVoteTest(APITestCase):
             response.data["data"][0]["total_points"],
             response.data["data"][1]["total_points"],
         )
+
+    def test_vote_results_are_cached_until_a_vote_commits(self):
+        self.client.force_authenticate(user=self.employee)
+        url = reverse("vote-results")
+        self.client.get(url)
+        metrics.reset()
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data["data"][0]["total_points"], 3)
+        self.assertEqual(metrics.snapshot()["counters"], {
+            "vote_results.cache_hit": 1})
+
+        with self.captureOnCommitCallbacks(execute=True):
+            DailyMenuScore.objects.record(
+                [(self.menu2.id, 1)], timezone.now().date())
+        response = self.client.get(url)
+        self.assertEqual(response.data["data"][0]["total_points"], 5)
+        self.assertEqual(
+            metrics.snapshot()["counters"]["vote_results.recompute"], 1)
+
+    def test_vote_results_limit_is_clamped(self):
+        token = ClaimsRefreshToken.for_user(self.employee).access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        response = self.client.get(
+            reverse("vote-results"), {"limit": "-1"}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["data"]), 1)
+        response = async_to_sync(self.async_client.get)(
+            reverse("vote-results-async"), {"limit": "-1"}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.json()["data"]), 1)
+
+    def test_vote_results_see_versions_bumped_by_other_processes(self):
+        self.client.force_authenticate(user=self.employee)
+        url = reverse("vote-results")
+        today = timezone.now().date()
+        self.client.get(url)
+
+        # The cache client of another web worker or of the vote queue worker
+        other = caches.create_connection("default")
+        DailyMenuScore.objects.filter(menu=self.menu2).update(points=5)
+        other.incr(VERSION_KEY.format(date=today))
+
+        response = self.client.get(url)
+        self.assertEqual(response.data["data"][0]["total_points"], 5)
+
+    def test_vote_results_serve_previous_version_while_recomputing(self):
+        self.client.force_authenticate(user=self.employee)
+        url = reverse("vote-results")
+        today = timezone.now().date()
+        cache.set(LATEST_KEY.format(date=today, limit=3), ["previous"])
+        key = RESULTS_KEY.format(
+            date=today, limit=3, version=current_version(today))
+        cache.add(f"{key}:lock", True)
+
+        with self.assertNumQueries(0):
+            response = self.client.get(url)
+        self.assertEqual(response.data["data"], ["previous"])
+
+    def test_async_vote_results_match_sync_view(self):
+        token = ClaimsRefreshToken.for_user(self.employee).access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        expected = self.client.get(reverse("vote-results"), headers=headers)
+        cache.clear()
+
+        url = reverse("vote-results-async")
+        response = async_to_sync(self.async_client.get)(url, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.json(), expected.json())
+        self.assertEqual(len(response.json()["data"]), 2)
+
+        # Served from the results cache, as shared with the sync view
+        with self.assertNumQueries(0):
+            response = async_to_sync(self.async_client.get)(
+                url, headers=headers)
+        self.assertEqual(response.json(), expected.json())
+
+        response = async_to_sync(self.async_client.get)(
+            url, {"date": "2999-01-01"}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_rebuild_vote_scores_fixes_drift(self):
+        DailyMenuScore.objects.filter(menu=self.menu1).update(points=42)
+        DailyMenuScore.objects.filter(menu=self.menu2).delete()
+
+        call_command("rebuild_vote_scores", stdout=StringIO())
+
+        scores = {
+            score.menu_id: score for score in DailyMenuScore.objects.all()
+        }
+        self.assertEqual(scores[self.menu1.id].points, 3)
+        self.assertEqual(scores[self.menu2.id].points, 2)
+        self.assertEqual(scores[self.menu2.id].second_votes, 1)
+        self.assertEqual(
+            DailyMenuScore.objects.reconcile(timezone.now().date()), [])
+
+
+class LeaderboardTest(APITestCase):
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            email="employee@example.com",
+            password="testpassword123",
+            user_type="employee",
+        )
+        self.restaurants = [
+            User.objects.create_user(
+                email=f"restaurant{n}@example.com",
+                password="testpassword123",
+                user_type="restaurant",
+                restaurant_name=f"Restaurant {n}",
+            )
+            for n in range(3)
+        ]
+        self.today = timezone.now().date()
+        # Restaurant 1 wins two of the last three days, restaurant 0 one
+        # day, but restaurant 0 won every day two months ago.
+        days = {
+            0: [(1, 3), (0, 2)],
+            1: [(0, 3), (1, 1)],
+            2: [(1, 3), (2, 2)],
+            60: [(0, 3), (2, 1)],
+        }
+        for offset, choices in days.items():
+            day = self.today - timedelta(days=offset)
+            menus = [
+                Menu.objects.create(restaurant=restaurant, date=day)
+                for restaurant in self.restaurants
+            ]
+            DailyMenuScore.objects.record(
+                [
+                    (menus[restaurant].id, 4 - points)
+                    for restaurant, points in choices
+                ],
+                day,
+            )
+        self.client.force_authenticate(user=self.employee)
+        self.url = reverse("leaderboard")
+
+    def test_daily_winner_follows_the_scores(self):
+        def winners():
+            return {
+                row["restaurant"]
+                for row in get_leaderboard(self.today, self.today)
+                if row["wins"]
+            }
+
+        self.assertEqual(winners(), {self.restaurants[1].pk})
+
+        # Recording a vote only touches the voted menu's row
+        menu = Menu.objects.get(restaurant=self.restaurants[0],
+                                date=self.today)
+        with self.assertNumQueries(2):
+            DailyMenuScore.objects.record([(menu.id, 1)], self.today)
+        self.assertEqual(winners(), {self.restaurants[0].pk})
+
+        # A tie on every count shares the win
+        DailyMenuScore.objects.filter(date=self.today, menu=menu).update(
+            points=3, first_votes=1, second_votes=0)
+        self.assertEqual(
+            winners(), {restaurant.pk for restaurant in self.restaurants[:2]})
+
+    def test_weekly_leaderboard(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"period": "week"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        results = response.data["data"]["results"]
+        self.assertEqual(
+            [(row["restaurant_name"], row["wins"], row["points"])
+             for row in results],
+            [("Restaurant 1", 2, 7), ("Restaurant 0", 1, 5),
+             ("Restaurant 2", 0, 2)],
+        )
+
+    def test_leaderboard_date_range(self):
+        start = self.today - timedelta(days=90)
+        response = self.client.get(self.url, {
+            "start": start.isoformat(),
+            "end": (self.today - timedelta(days=30)).isoformat(),
+        })
+        results = response.data["data"]["results"]
+        self.assertEqual(len(results), 2)
+        self.assertEqual(results[0]["restaurant_name"], "Restaurant 0")
+        self.assertEqual(results[0]["wins"], 1)
+
+    def test_leaderboard_limit_is_clamped(self):
+        response = self.client.get(self.url, {"limit": "-1"})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(response.data["data"]["results"]), 1)
+
+    def test_leaderboard_invalid_period(self):
+        response = self.client.get(self.url, {"period": "decade"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_backfill_vote_rollups(self):
+        day = self.today - timedelta(days=1)
+        menus = dict(Menu.objects.filter(date=day).values_list(
+            "restaurant", "id"))
+        Ballot.objects.create(
+            user=self.employee, date=day,
+            first_menu_id=menus[self.restaurants[2].pk])
+
+        call_command("backfill_vote_rollups", stdout=StringIO())
+
+        (score,) = DailyMenuScore.objects.filter(date=day)
+        self.assertEqual(score.restaurant, self.restaurants[2])
+        self.assertEqual(score.points, 3)
+        (winner,) = get_leaderboard(day, day)
+        self.assertEqual(winner["restaurant"], self.restaurants[2].pk)
+        self.assertEqual(winner["wins"], 1)
+
+
+class VoteCompactionTest(APITestCase):
+    def setUp(self):
+        self.employees = [
+            User.objects.create_user(
+                email=f"employee{n}@example.com",
+                password="testpassword123",
+                user_type="employee",
+            )
+            for n in range(3)
+        ]
+        self.restaurants = [
+            User.objects.create_user(
+                email=f"restaurant{n}@example.com",
+                password="testpassword123",
+                user_type="restaurant",
+                restaurant_name=f"Restaurant {n}",
+            )
+            for n in range(2)
+        ]
+        self.day = timezone.now().date() - timedelta(days=3)
+        self.menus = [
+            Menu.objects.create(restaurant=restaurant, date=self.day)
+            for restaurant in self.restaurants
+        ]
+        for n, employee in enumerate(self.employees):
+            first, second = self.menus if n else self.menus[::-1]
+            cast_ballot(
+                employee.pk, [(first.id, 1), (second.id, 2)], date=self.day)
+
+    def test_compact_votes(self):
+        out = StringIO()
+        call_command("compact_votes", "--chunk-size", "4", stdout=out)
+
+        self.assertIn("6 votes archived", out.getvalue())
+        self.assertFalse(Vote.objects.exists())
+        self.assertFalse(Ballot.objects.exists())
+        self.assertEqual(VoteArchive.objects.filter(
+            restaurant_id=self.restaurants[1].pk).count(), 3)
+        result = DailyResult.objects.get(date=self.day)
+        self.assertEqual(result.ballots, 3)
+        self.assertEqual(result.scores[0], {
+            "menu": str(self.menus[0].id),
+            "restaurant": self.restaurants[0].pk,
+            "restaurant_name": "Restaurant 0",
+            "points": 8,
+            "ranks": [2, 1, 0],
+            "is_winner": True,
+        })
+        # Finalized days reconcile against their result, not ballots
+        self.assertEqual(DailyMenuScore.objects.reconcile(self.day), [])
+
+        call_command("compact_votes", stdout=out)
+        self.assertEqual(DailyResult.objects.get(date=self.day).ballots, 3)
+
+    def test_legacy_votes_are_archived_once(self):
+        ballot = Ballot.objects.get(user=self.employees[0])
+        expected = {
+            ballot_vote_id(other.id, rank)
+            for other in Ballot.objects.exclude(pk=ballot.pk)
+            for _, rank in other.ranked_choices
+        }
+        votes = Vote.objects.bulk_create(
+            Vote(user_id=ballot.user_id, menu_id=menu_id, rank=rank,
+                 vote_date=self.day)
+            for menu_id, rank in ballot.ranked_choices
+        )
+        call_command("compact_votes", stdout=StringIO())
+
+        self.assertFalse(Vote.objects.exists())
+        self.assertEqual(VoteArchive.objects.count(), 6)
+        self.assertEqual(
+            set(VoteArchive.objects.filter(
+                user_id=ballot.user_id).values_list("pk", flat=True)),
+            {vote.pk for vote in votes},
+        )
+        self.assertEqual(
+            set(VoteArchive.objects.exclude(
+                user_id=ballot.user_id).values_list("pk", flat=True)),
+            expected,
+        )
+
+    def test_historical_results_are_served_compact(self):
+        self.client.force_authenticate(user=self.employees[0])
+        url = reverse("vote-results")
+        live = self.client.get(url, {"date": self.day.isoformat()})
+        call_command("compact_votes", stdout=StringIO())
+
+        with self.assertNumQueries(1):
+            response = self.client.get(
+                url, {"date": self.day.isoformat(), "limit": 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"], live.data["data"][:1])
+
+        self.restaurants[1].delete()
+        response = self.client.get(url, {"date": self.day.isoformat()})
+        self.assertEqual(len(response.data["data"]), 2)
+
+        response = self.client.get(url, {"date": "not-a-date"})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_export_includes_archived_votes(self):
+        call_command("compact_votes", stdout=StringIO())
+        staff = User.objects.create_user(
+            email="hr@example.com", password="testpassword123",
+            user_type="employee", is_staff=True)
+        self.client.force_authenticate(user=staff)
+        response = self.client.get(reverse("vote-export"), {
+            "file_format": "ndjson",
+            "restaurant": self.restaurants[0].restaurant_id,
+        })
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(
+            {row["restaurant_id"] for row in rows},
+            {self.restaurants[0].restaurant_id},
+        )
+        self.assertEqual(
+            {row["employee_id"] for row in rows},
+            {employee.employee_id for employee in self.employees},
+        )
+
+
+class VoteExportTest(APITestCase):
+    def setUp(self):
+        # The async test authenticates from claims, whose cached user
+        # status must not come from an earlier test's user with the same id
+        cache.clear()
+        self.staff = User.objects.create_user(
+            email="hr@example.com",
+            password="testpassword123",
+            user_type="employee",
+            is_staff=True,
+        )
+        self.employee = User.objects.create_user(
+            email="employee@example.com",
+            password="testpassword123",
+            user_type="employee",
+        )
+        restaurants = [
+            User.objects.create_user(
+                email=f"restaurant{n}@example.com",
+                password="testpassword123",
+                user_type="restaurant",
+            )
+            for n in range(2)
+        ]
+        self.restaurant_id = restaurants[0].restaurant_id
+        for day in ("2024-01-01", "2024-01-02", "2024-01-03"):
+            menus = [
+                Menu.objects.create(restaurant=restaurant, date=day)
+                for restaurant in restaurants
+            ]
+            Ballot.objects.create(
+                user=self.employee, date=day, first_menu=menus[0],
+                second_menu=menus[1])
+        # The first day was voted before ballots were the record: its
+        # legacy votes are exported in place of the ballot
+        Vote.objects.bulk_create(
+            Vote(user=self.employee, menu=menu, rank=rank,
+                 vote_date="2024-01-01")
+            for rank, menu in enumerate(
+                Menu.objects.filter(date="2024-01-01").order_by(
+                    "restaurant"), start=1)
+        )
+        self.url = reverse("vote-export")
+
+    def test_export_csv_with_filters(self):
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.get(self.url, {
+            "start": "2024-01-02", "restaurant": self.restaurant_id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["Content-Type"], "text/csv")
+        lines = b"".join(response.streaming_content).decode().splitlines()
+        self.assertEqual(lines[0].split(",")[:3],
+                         ["vote_id", "vote_date", "created_at"])
+        self.assertEqual(
+            [line.split(",")[1] for line in lines[1:]],
+            ["2024-01-02", "2024-01-03"],
+        )
+        ballot = Ballot.objects.get(date="2024-01-02")
+        self.assertEqual(
+            lines[1].split(",")[0], str(ballot_vote_id(ballot.id, 1)))
+
+    def test_export_ndjson(self):
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.get(
+            self.url, {"end": "2024-01-01", "file_format": "ndjson"})
+        rows = [
+            json.loads(line)
+            for line in b"".join(response.streaming_content).splitlines()
+        ]
+        self.assertEqual(len(rows), 2)
+        self.assertEqual(
+            {row["employee_id"] for row in rows},
+            {self.employee.employee_id},
+        )
+        self.assertEqual(
+            {row["vote_id"] for row in rows},
+            {str(pk) for pk in Vote.objects.values_list("pk", flat=True)},
+        )
+
+    async def test_export_streams_asynchronously_over_asgi(self):
+        token = ClaimsRefreshToken.for_user(self.staff).access_token
+        with mock.patch("employee.vote_export.CHUNK_SIZE", 2):
+            response = await self.async_client.get(
+                self.url, {"start": "2024-01-02"},
+                headers={"Authorization": f"Bearer {token}"},
+            )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.is_async)
+        chunks = [chunk async for chunk in response.streaming_content]
+        lines = b"".join(chunks).decode().splitlines()
+        self.assertEqual(len(lines), 5)
+        self.assertEqual(
+            [line.split(",")[1] for line in lines[1:]],
+            ["2024-01-02", "2024-01-02", "2024-01-03", "2024-01-03"],
+        )
+
+    def test_export_requires_staff(self):
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_export_votes_command(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "votes.csv")
+            call_command("export_votes", "--start", "2024-01-03",
+                         "--output", path)
+            with open(path) as output:
+                self.assertEqual(len(output.read().splitlines()), 3)
+
+
+class LoadTestReadViewsTest(SimpleTestCase):
+    def test_refuses_databases_not_named_for_tests(self):
+        settings_dict = {"NAME": "/srv/foodtales/db.sqlite3"}
+        with mock.patch.dict(connection.settings_dict, settings_dict):
+            for command in ("load_test_read_views", "bench_vote_ingestion"):
+                with self.assertRaisesMessage(CommandError, "Refusing"):
+                    call_command(command, stdout=StringIO())
+        for name in ("foodtales_bench", "/tmp/test.sqlite3"):
+            with mock.patch.dict(connection.settings_dict, {"NAME": name}):
+                self.assertTrue(is_scratch_database())
+
+
+class VoteQueueDrainTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.queue = VoteQueue(os.path.join(directory.name, "votes.sqlite3"))
+        restaurant = User.objects.create_user(
+            email="restaurant@example.com",
+            password="testpassword123",
+            user_type="restaurant",
+        )
+        self.menu = Menu.objects.create(
+            restaurant=restaurant, date=timezone.now().date(),
+            is_published=True)
+        self.employees = [
+            User.objects.create_user(
+                email=f"employee{n}@example.com",
+                password="testpassword123",
+                user_type="employee",
+            )
+            for n in range(2)
+        ]
+        self.ballot_ids = [
+            self.queue.enqueue(
+                employee.pk, [(self.menu.id, 1)], self.menu.date)
+            for employee in self.employees
+        ]
+
+    def statuses(self):
+        return [
+            self.queue.status(ballot_id, employee.pk)[0]
+            for ballot_id, employee in zip(self.ballot_ids, self.employees)
+        ]
+
+    def test_transient_errors_hand_the_batch_back(self):
+        error = OperationalError("server closed the connection")
+        with mock.patch("employee.vote_queue.cast_ballot", side_effect=error):
+            with self.assertRaises(OperationalError):
+                drain(self.queue)
+        self.assertEqual(self.statuses(), ["pending", "pending"])
+        self.assertEqual(len(self.queue.claim(10)), 2)
+
+    def test_integrity_errors_reject_the_ballot(self):
+        def cast(user_id, *args, **kwargs):
+            if user_id == self.employees[0].pk:
+                raise IntegrityError("violates foreign key constraint")
+            return cast_ballot(user_id, *args, **kwargs)
+
+        with mock.patch("employee.vote_queue.cast_ballot", side_effect=cast):
+            self.assertEqual(drain(self.queue), 2)
+        self.assertEqual(self.statuses(), ["rejected", "accepted"])
+        self.assertEqual(
+            Ballot.objects.get().user_id, self.employees[1].pk)
+
+    def test_deferred_integrity_errors_are_retried_one_by_one(self):
+        # As a deferred constraint failing on commit: the error escapes
+        # the savepoint of the ballot and fails the whole batch
+        def write(ballot):
+            if ballot.user_id == self.employees[0].pk:
+                raise IntegrityError("violates foreign key constraint")
+            return write_ballot(ballot)
+
+        with mock.patch("employee.vote_queue.write_ballot", side_effect=write):
+            self.assertEqual(drain(self.queue), 2)
+        self.assertEqual(self.statuses(), ["rejected", "accepted"])
+        self.assertEqual(
+            Ballot.objects.get().user_id, self.employees[1].pk)
+
+
+class VotePartitionTest(TestCase):
+    def test_add_months(self):
+        self.assertEqual(add_months(date(2024, 11, 30), 1), date(2024, 12, 1))
+        self.assertEqual(add_months(date(2024, 12, 5), 1), date(2025, 1, 1))
+        self.assertEqual(add_months(date(2024, 1, 5), -1), date(2023, 12, 1))
+
+    @unittest.skipIf(connection.vendor == "postgresql", "SQLite only")
+    def test_command_is_a_noop_without_partitioning(self):
+        out = StringIO()
+        call_command("manage_vote_partitions", stdout=out)
+        self.assertEqual(
+            out.getvalue(), "The vote table is not partitioned.\n")
+
+    def test_partitions_are_attached_with_validated_bounds(self):
+        start, end = date(2024, 1, 1), date(2024, 2, 1)
+        statements = (
+            check_partition_sql(connection, "votes_p", start, end)
+            + attach_partition_sql(connection, "votes_p", start, end)
+        )
+        self.assertEqual(
+            [sql.split('"votes_p" ', 1)[-1] for sql, _ in statements], [
+                'ADD CONSTRAINT "vote_date_partition_bound" CHECK (vote_date '
+                "IS NOT NULL AND vote_date < %s AND vote_date >= %s) "
+                "NOT VALID",
+                'VALIDATE CONSTRAINT "vote_date_partition_bound"',
+                "FOR VALUES FROM (%s) TO (%s)",
+                'DROP CONSTRAINT "vote_date_partition_bound"',
+            ])
+        self.assertIn("ATTACH PARTITION", statements[2][0])
+        self.assertEqual(
+            [params for _, params in statements],
+            [[end, start], [], [start, end], []],
+        )
+        # The partition of history has no lower bound
+        (check, params), _ = check_partition_sql(
+            connection, "votes_p", None, end)
+        self.assertNotIn(">=", check)
+        self.assertEqual(params, [end])
+        (attach, params), _ = attach_partition_sql(
+            connection, "votes_p", None, end)
+        self.assertIn("FROM (MINVALUE) TO (%s)", attach)
+        self.assertEqual(params, [end])
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "PostgreSQL only")
+    def test_attaching_a_partition_skips_its_scan(self):
+        notices = []
+
+        def collect(notice):
+            notices.append(notice.message_primary)
+
+        connection.ensure_connection()
+        connection.connection.add_notice_handler(collect)
+        self.addCleanup(connection.connection.remove_notice_handler, collect)
+        with connection.cursor() as cursor:
+            cursor.execute("SET LOCAL client_min_messages = debug1")
+            created = ensure_partitions(
+                0, today=add_months(timezone.now().date(), 36))
+        self.assertIn(
+            f'partition constraint for table "{created[0]}" is implied by '
+            "existing constraints",
+            notices,
+        )
+
+    @unittest.skipUnless(connection.vendor == "postgresql", "PostgreSQL only")
+    def test_partitions_are_created_ahead_and_pruned(self):
+        self.assertTrue(is_partitioned())
+        employee = User.objects.create_user(
+            email="employee@example.com", password="testpassword123",
+            user_type="employee")
+        restaurant = User.objects.create_user(
+            email="restaurant@example.com", password="testpassword123",
+            user_type="restaurant")
+        day = add_months(timezone.now().date(), 24)
+        menu = Menu.objects.create(restaurant=restaurant, date=day)
+        # Far beyond the partitions created so far: lands in the default
+        vote, = Vote.objects.bulk_create(
+            [Vote(user=employee, menu=menu, rank=1, vote_date=day)])
+
+        created = ensure_partitions(1, today=day)
+        self.assertEqual(created, [
+            f"employee_vote_p{day:%Y%m}",
+            f"employee_vote_p{add_months(day, 1):%Y%m}",
+        ])
+        self.assertEqual(Vote.objects.get(pk=vote.pk).vote_date, day)
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT count(*) FROM {created[0]}")
+            self.assertEqual(cursor.fetchone()[0], 1)
+
+        pruned = prune_partitions(1, today=add_months(day, 2), drop=True)
+        self.assertIn(created[0], pruned)
+        self.assertNotIn(created[1], pruned)
+        self.assertFalse(Vote.objects.filter(pk=vote.pk).exists())
+        self.assertEqual(
+            [name for name, _, _ in list_partitions()][-1], created[1])
+
+
+class ResultsBroadcasterTest(TestCase):
+    def setUp(self):
+        restaurant = User.objects.create_user(
+            email="restaurant@example.com",
+            password="testpassword123",
+            user_type="restaurant",
+        )
+        self.today = timezone.now().date()
+        self.menu = Menu.objects.create(restaurant=restaurant, date=self.today)
+        self.score = DailyMenuScore.objects.create(
+            menu=self.menu, restaurant=restaurant, date=self.today,
+            points=3, first_votes=1)
+
+    async def stop(self, broadcaster, subscription):
+        broadcaster.unsubscribe(subscription)
+        poller = broadcaster._pollers[asyncio.get_running_loop()]
+        await asyncio.wait_for(poller.task, timeout=1)
+
+    async def test_votes_written_elsewhere_reach_subscribers(self):
+        broadcaster = ResultsBroadcaster(tick=0.05)
+        subscription, snapshot = await broadcaster.subscribe()
+        self.assertEqual(snapshot["scores"], [{
+            "menu": self.menu.id, "points": 3, "first_votes": 1,
+            "second_votes": 0, "third_votes": 0,
+        }])
+
+        # Another process records a burst of votes: only the scores table
+        # and the shared results version tell
+        def record_votes():
+            for _ in range(500):
+                DailyMenuScore.objects.filter(pk=self.score.pk).update(
+                    points=F("points") + 3, first_votes=F("first_votes") + 1)
+                bump_version(self.today)
+
+        await sync_to_async(record_votes)()
+        frame = await asyncio.wait_for(subscription.get(), timeout=1)
+        self.assertEqual(frame, {
+            "date": self.today,
+            "scores": [{
+                "menu": self.menu.id, "points": 1500, "first_votes": 500,
+                "second_votes": 0, "third_votes": 0,
+            }],
+        })
+        self.assertTrue(subscription.empty())
+        await self.stop(broadcaster, subscription)
+
+    async def test_slow_subscriber_keeps_a_single_merged_frame(self):
+        broadcaster = ResultsBroadcaster(tick=0.05)
+        subscription, _ = await broadcaster.subscribe()
+        increments = {
+            "menu": self.menu.id, "points": 3, "first_votes": 1,
+            "second_votes": 0, "third_votes": 0,
+        }
+        for _ in range(3):
+            broadcaster.deliver(
+                {"date": self.today, "scores": [dict(increments)]})
+
+        self.assertEqual(subscription.qsize(), 1)
+        frame = subscription.get_nowait()
+        self.assertEqual(frame["scores"][0]["points"], 9)
+        self.assertEqual(frame["scores"][0]["first_votes"], 3)
+        await self.stop(broadcaster, subscription)
+
+
+class VoteResultsStreamTest(TestCase):
+    def setUp(self):
+        self.employee = User.objects.create_user(
+            email="employee@example.com",
+            password="testpassword123",
+            user_type="employee",
+        )
+        self.restaurant = User.objects.create_user(
+            email="restaurant@example.com",
+            password="testpassword123",
+            user_type="restaurant",
+        )
+        self.menu = Menu.objects.create(
+            restaurant=self.restaurant, date=timezone.now().date())
+        DailyMenuScore.objects.create(
+            menu=self.menu, restaurant=self.restaurant, date=self.menu.date,
+            points=3, first_votes=1)
+
+    async def test_stream_sends_snapshot(self):
+        token = RefreshToken.for_user(self.employee).access_token
+        response = await self.async_client.get(
+            reverse("vote-results-stream"),
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        content = aiter(response.streaming_content)
+        event = await anext(content)
+        await content.aclose()
+
+        self.assertTrue(event.startswith(b"event: snapshot\n"))
+        snapshot = json.loads(event.split(b"data: ", 1)[1])
+        self.assertEqual(snapshot["scores"][0]["menu"], str(self.menu.id))
+        self.assertEqual(snapshot["scores"][0]["points"], 3)
+
+    async def test_stream_requires_authentication(self):
+        response = await self.async_client.get(
+            reverse("vote-results-stream"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+
+@override_settings(
+    PASSWORD_HASHERS=["django.contrib.auth.hashers.MD5PasswordHasher"])
+class EmployeeProvisioningTest(APITestCase):
+    def setUp(self):
+        self.staff = User.objects.create_user(
+            email="hr@example.com",
+            password="testpassword123",
+            user_type="employee",
+            is_staff=True,
+        )
+        self.existing = User.objects.create_user(
+            email="taken@example.com",
+            password="testpassword123",
+            user_type="employee",
+            employee_id="E-TAKEN",
+        )
+        self.url = reverse("employee-provision")
+
+    def make_csv(self, *rows):
+        lines = ["email,password,employee_id", *map(",".join, rows)]
+        return ("\n".join(lines) + "\n").encode()
+
+    def test_provision_reports_rejected_rows(self):
+        content = self.make_csv(
+            ("new1@example.com", "secret-one", "E-NEW1"),
+            ("new2@example.com", "secret-two", ""),
+            ("taken@example.com", "secret", ""),
+            ("new3@example.com", "secret", "E-TAKEN"),
+            ("not-an-email", "secret", ""),
+            ("new1@example.com", "secret", ""),
+            ("new4@example.com", "secret", "E-NEW1"),
+        )
+        with self.assertNumQueries(6):
+            # Taken emails, taken ids, generated id check, then the bulk
+            # insert wrapped in a savepoint
+            report = provision_employees(
+                BytesIO(content), batch_size=10, workers=0)
+
+        self.assertEqual(report["created"], 2)
+        self.assertEqual(
+            [(error["line"], error["email"]) for error in report["errors"]],
+            [
+                (4, "taken@example.com"),
+                (5, "new3@example.com"),
+                (6, "not-an-email"),
+                (7, "new1@example.com"),
+                (8, "new4@example.com"),
+            ],
+        )
+        new1 = User.objects.get(email="new1@example.com")
+        self.assertEqual(new1.employee_id, "E-NEW1")
+        self.assertEqual(new1.user_type, "employee")
+        self.assertTrue(new1.check_password("secret-one"))
+        new2 = User.objects.get(email="new2@example.com")
+        self.assertTrue(new2.employee_id.startswith("E-"))
+        self.assertTrue(new2.check_password("secret-two"))
+
+    def test_provision_hashes_in_worker_processes(self):
+        content = self.make_csv(
+            *[(f"pool{n}@example.com", f"secret-{n}", "") for n in range(3)])
+        report = provision_employees(
+            BytesIO(content), batch_size=2, workers=2)
+
+        self.assertEqual(report, {"created": 3, "errors": []})
+        users = User.objects.filter(email__startswith="pool")
+        self.assertEqual(len({user.employee_id for user in users}), 3)
+        for user in users:
+            self.assertTrue(
+                user.check_password(f"secret-{user.email[4]}"))
+
+    def test_provision_endpoint_requires_staff(self):
+        upload = SimpleUploadedFile(
+            "employees.csv",
+            self.make_csv(("api@example.com", "secret", "")),
+            content_type="text/csv",
+        )
+        self.client.force_authenticate(user=self.existing)
+        response = self.client.post(self.url, {"file": upload})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        upload.seek(0)
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.post(self.url, {"file": upload})
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data["data"]["created"], 1)
+        self.assertTrue(User.objects.filter(email="api@example.com").exists())
+
+    @override_settings(EMPLOYEE_PROVISIONING_MAX_ROWS=2)
+    def test_provision_endpoint_limits_uploads(self):
+        upload = SimpleUploadedFile(
+            "employees.csv",
+            self.make_csv(
+                *[(f"api{n}@example.com", "secret", "") for n in range(3)]),
+            content_type="text/csv",
+        )
+        self.client.force_authenticate(user=self.staff)
+        response = self.client.post(self.url, {"file": upload})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn("file", response.data["errors"])
+        self.assertFalse(
+            User.objects.filter(email__startswith="api").exists())
+
+
+# A second local database standing in for a read replica, declared by the
+# test settings
+REPLICA = "replica_test"
+
+
+@override_settings(DATABASE_REPLICAS=[REPLICA])
+class ReplicaRouterTest(APITestCase):
+    """
+    The replica holds the users but lags behind the primary on everything
+    else.
+    """
+
+    databases = {"default", REPLICA}
+
+    def setUp(self):
+        cache.clear()
+        self.employee = User.objects.create_user(
+            email="employee@example.com",
+            password="testpassword123",
+            user_type="employee",
+        )
+        self.restaurant = User.objects.create_user(
+            email="restaurant@example.com",
+            password="testpassword123",
+            user_type="restaurant",
+        )
+        for user in (self.employee, self.restaurant):
+            user.save(using=REPLICA)
+        self.menu = Menu.objects.create(
+            restaurant=self.restaurant,
+            date=timezone.now().date(),
+            is_published=True,
+        )
+        token = ClaimsRefreshToken.for_user(self.employee).access_token
+        self.headers = {"Authorization": f"Bearer {token}"}
+
+    def test_router_reads_from_the_alias_of_the_request(self):
+        self.assertEqual(Menu.objects.count(), 1)
+        token = set_read_alias(REPLICA)
+        try:
+            self.assertEqual(Menu.objects.count(), 0)
+            with read_from_primary():
+                self.assertEqual(Menu.objects.count(), 1)
+            # Related objects follow the database of their instance
+            self.assertEqual(self.menu.restaurant.email, self.restaurant.email)
+        finally:
+            reset_read_alias(token)
+
+    def test_safe_requests_read_from_the_replica(self):
+        response = self.client.get(
+            reverse("all-restaurants-current-day-menu"),
+            headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            response.data["message"], "No menus available for today.")
+
+    def test_voters_read_their_own_vote_from_the_primary(self):
+        response = self.client.post(
+            reverse("submit-vote"), {"menu": str(self.menu.id)},
+            format="json", headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        url = reverse(
+            "vote-status", args=[Ballot.objects.get(user=self.employee).id])
+
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data["data"]["status"], "accepted")
+
+        # Once the pin expires, reads go back to the lagging replica
+        cache.delete(PIN_KEY.format(user_id=self.employee.pk))
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_pins_are_shared_between_workers(self):
+        ballot = Ballot.objects.create(
+            user=self.employee,
+            date=timezone.now().date(),
+            first_menu=self.menu,
+        )
+        url = reverse("vote-status", args=[ballot.id])
+
+        # Pinned by the worker which served the vote, through its own cache
+        # client
+        caches.create_connection("default").set(
+            PIN_KEY.format(user_id=self.employee.pk), True)
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_caches_rebuilt_after_a_write_read_from_the_primary(self):
+        url = reverse("all-restaurants-current-day-menu")
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate_menus()
+        response = self.client.get(url, headers=self.headers)
+        self.assertEqual(len(response.data["data"]["results"]), 1)
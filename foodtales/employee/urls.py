@@ -1,11 +1,42 @@
 from django.urls import path
 
+from employee.views.export_views import VoteExportView
+from employee.views.leaderboard_views import LeaderboardView
+from employee.views.live_views import VoteResultsStreamView
+from employee.views.provisioning_views import EmployeeProvisioningView
 from employee.views.signup_views import EmployeeSignUpView
-from employee.views.voting_views import SubmitVoteView, VoteResultsView
+from employee.views.voting_views import (
+    AsyncVoteResultsView,
+    SubmitVoteView,
+    VoteResultsView,
+    VoteStatusView,
+)
 
 
 urlpatterns = [
     path("signup/", EmployeeSignUpView.as_view(), name="employee-signup"),
+    path(
+        "provision/",
+        EmployeeProvisioningView.as_view(),
+        name="employee-provision",
+    ),
     path("vote/", SubmitVoteView.as_view(), name="submit-vote"),
     path("vote/results/", VoteResultsView.as_view(), name="vote-results"),
+    path(
+        "vote/results/async/",
+        AsyncVoteResultsView.as_view(),
+        name="vote-results-async",
+    ),
+    path(
+        "vote/results/stream/",
+        VoteResultsStreamView.as_view(),
+        name="vote-results-stream",
+    ),
+    path("leaderboard/", LeaderboardView.as_view(), name="leaderboard"),
+    path("vote/export/", VoteExportView.as_view(), name="vote-export"),
+    path(
+        "vote/status/<uuid:ballot_id>/",
+        VoteStatusView.as_view(),
+        name="vote-status",
+    ),
 ]
@@ -0,0 +1,68 @@
+import logging
+from datetime import date
+
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from employee.vote_export import (
+    CONTENT_TYPES,
+    FORMATS,
+    aiter_export,
+    get_export_querysets,
+    iter_export,
+)
+from foodtales.utils import error_response
+from user.authentication import ClaimsJWTAuthentication
+
+logger = logging.getLogger("foodtales")
+
+
+class VoteExportView(APIView):
+    """
+    API view streaming the vote history as CSV or NDJSON, for staff users.
+
+    Accepts ``start`` and ``end`` dates (inclusive), a ``restaurant`` id and
+    ``file_format`` (``csv`` by default).
+    """
+
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated,
+                          permissions.IsAdminUser]
+
+    def get(self, request):
+        params = request.query_params
+        errors = {}
+        dates = {}
+        for name in ("start", "end"):
+            try:
+                dates[name] = (
+                    date.fromisoformat(params[name])
+                    if params.get(name)
+                    else None
+                )
+            except ValueError:
+                errors[name] = ["Date must be formatted as YYYY-MM-DD."]
+        file_format = params.get("file_format", "csv")
+        if file_format not in FORMATS:
+            errors["file_format"] = [f"Must be one of: {', '.join(FORMATS)}."]
+        if errors:
+            return error_response(message="Vote export failed",
+                                  errors=errors)
+
+        querysets = get_export_querysets(
+            restaurant_id=params.get("restaurant") or None, **dates)
+        logger.info(
+            "Vote export started by %s: %s", request.user.pk, file_format)
+        # A streaming response whose iterator does not match the server is
+        # buffered whole: ASGI needs an async one, WSGI a sync one
+        if isinstance(request._request, ASGIRequest):
+            chunks = aiter_export(querysets, file_format)
+        else:
+            chunks = iter_export(querysets, file_format)
+        response = StreamingHttpResponse(
+            chunks, content_type=CONTENT_TYPES[file_format])
+        response["Content-Disposition"] = (
+            f'attachment; filename="votes.{file_format}"')
+        return response
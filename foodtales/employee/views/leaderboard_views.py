@@ -0,0 +1,69 @@
+import logging
+from datetime import date
+
+from django.utils import timezone
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from employee.leaderboard import (
+    DEFAULT_LIMIT,
+    MAX_LIMIT,
+    PERIODS,
+    get_leaderboard,
+    get_period,
+)
+from foodtales.utils import error_response, success_response
+from user.authentication import ClaimsJWTAuthentication
+
+logger = logging.getLogger("foodtales")
+
+
+class LeaderboardView(APIView):
+    """
+    API view ranking restaurants by daily wins over a date range.
+
+    The range is either a rolling ``period`` (week, month or quarter)
+    ending today, or explicit ``start`` and ``end`` dates.
+    """
+
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated]
+
+    def get(self, request):
+        params = request.query_params
+        errors = {}
+        try:
+            limit = max(
+                1, min(int(params.get("limit", DEFAULT_LIMIT)), MAX_LIMIT))
+        except ValueError:
+            limit = DEFAULT_LIMIT
+
+        if "start" in params or "end" in params:
+            try:
+                start = date.fromisoformat(params.get("start", ""))
+                end = date.fromisoformat(params.get("end", ""))
+            except ValueError:
+                errors["range"] = [
+                    "start and end must both be formatted as YYYY-MM-DD."]
+            else:
+                if start > end:
+                    errors["range"] = ["start must not be after end."]
+        else:
+            period = params.get("period", "week")
+            if period in PERIODS:
+                start, end = get_period(period, timezone.now().date())
+            else:
+                errors["period"] = [f"Must be one of: {', '.join(PERIODS)}."]
+        if errors:
+            return error_response(
+                message="Unable to fetch the leaderboard", errors=errors)
+
+        leaderboard = get_leaderboard(start, end, limit)
+        logger.info(
+            "Leaderboard fetched for %s - %s: %d restaurants",
+            start, end, len(leaderboard),
+        )
+        return success_response(
+            message="Leaderboard fetched successfully",
+            data={"start": start, "end": end, "results": leaderboard},
+        )
@@ -0,0 +1,50 @@
+import asyncio
+import logging
+
+from django.http import StreamingHttpResponse
+from rest_framework import permissions
+
+from employee.live import broadcaster, format_event
+from foodtales.async_views import AsyncAPIView
+from user.permissions import IsEmployee
+
+logger = logging.getLogger("foodtales")
+
+HEARTBEAT_SECONDS = 15
+
+
+class VoteResultsStreamView(AsyncAPIView):
+    """
+    Server-Sent Events stream of today's vote results.
+
+    Sends the current scores once, then one ``scores`` event per tick with
+    the point and rank count increments of every menu voted on in that
+    tick, whichever process wrote the votes. Needs to be served over ASGI.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsEmployee]
+
+    async def get(self, request):
+        logger.info(
+            "Live results stream opened for user: %s", request.user.pk)
+        response = StreamingHttpResponse(
+            self.stream(), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self):
+        subscription, snapshot = await broadcaster.subscribe()
+        try:
+            yield format_event("snapshot", snapshot)
+            while True:
+                try:
+                    frame = await asyncio.wait_for(
+                        subscription.get(), timeout=HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                yield format_event("scores", frame)
+        finally:
+            broadcaster.unsubscribe(subscription)
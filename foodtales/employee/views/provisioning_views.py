@@ -0,0 +1,67 @@
+import logging
+from itertools import islice
+
+from django.conf import settings
+from rest_framework import permissions, status
+from rest_framework.parsers import MultiPartParser
+from rest_framework.views import APIView
+
+from employee.provisioning import EmployeeProvisioner, iter_rows
+from foodtales.utils import error_response, success_response
+
+logger = logging.getLogger("foodtales")
+
+
+class EmployeeProvisioningView(APIView):
+    """
+    API view for staff to create many employee accounts at once from an
+    uploaded CSV file with ``email``, ``password`` and optionally
+    ``employee_id`` columns.
+
+    Rows that cannot be created are reported by line number; the others
+    are created. Passwords are hashed within the request, so uploads are
+    limited to ``EMPLOYEE_PROVISIONING_MAX_ROWS`` rows; larger files are
+    provisioned with ``manage.py provision_employees``.
+    """
+
+    permission_classes = [permissions.IsAuthenticated,
+                          permissions.IsAdminUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return error_response(
+                message="Employee provisioning failed",
+                errors={"file": ["No file was submitted."]},
+            )
+
+        max_rows = settings.EMPLOYEE_PROVISIONING_MAX_ROWS
+        rows = list(islice(iter_rows(upload), max_rows + 1))
+        if len(rows) > max_rows:
+            return error_response(
+                message="Employee provisioning failed",
+                errors={
+                    "file": [
+                        f"At most {max_rows} employees can be uploaded at "
+                        "once; use manage.py provision_employees for "
+                        "larger files."
+                    ]
+                },
+            )
+
+        # Never fork a hashing pool from a web worker
+        report = EmployeeProvisioner(workers=0).run(rows)
+        logger.info(
+            "Employee provisioning by %s: %d created, %d rejected",
+            request.user.pk, report["created"], len(report["errors"]),
+        )
+        return success_response(
+            message="Employee provisioning finished",
+            data=report,
+            status_code=(
+                status.HTTP_201_CREATED
+                if report["created"]
+                else status.HTTP_200_OK
+            ),
+        )
@@ -3,10 +3,10 @@ import logging
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from employee.serializers.signup_serializers import EmployeeSignUpSerializer
 from foodtales.utils import error_response, success_response
+from user.tokens import ClaimsRefreshToken
 
 logger = logging.getLogger("foodtales")
 
@@ -22,8 +22,8 @@ class EmployeeSignUpView(APIView):
         serializer = EmployeeSignUpSerializer(data=request.data)
         if serializer.is_valid():
             user = serializer.save()
-            refresh = RefreshToken.for_user(user)
-            logger.info(f"Employee registered successfully: {user.email}")
+            refresh = ClaimsRefreshToken.for_user(user)
+            logger.info("Employee registered successfully: %s", user.pk)
             return success_response(
                 message="Employee registered successfully",
                 data={
@@ -32,7 +32,8 @@ class EmployeeSignUpView(APIView):
                 },
                 status_code=status.HTTP_201_CREATED,
             )
-        logger.error(f"Employee registration failed: {serializer.errors}")
+        logger.error(
+            "Employee registration failed: %s", list(serializer.errors))
         return error_response(
             message="Employee Registration Failed",
             errors=serializer.errors,
@@ -1,19 +1,31 @@
 import logging
+from datetime import date
 
+from asgiref.sync import sync_to_async
 from rest_framework import generics, permissions, status
 from rest_framework import serializers
+from rest_framework.views import APIView
+from django.conf import settings
 from django.utils import timezone
-from django.db.models import Sum, Case, When, IntegerField
+from django.db.models import F
 
 
 from employee.serializers.voting_serializers import (
     NewVoteSerializer,
     OldVoteSerializer,
 )
+from employee.models import Ballot, DailyResult
+from employee.results_cache import aget_results, get_results
+from employee.vote_queue import get_vote_queue
+from foodtales.async_views import AsyncAPIView
 from foodtales.utils import success_response, error_response
+from restaurant.serializers.fast_serializers import (
+    ValuesMenuWithVotesSerializer,
+)
 from restaurant.serializers.restaurant_serializers import (
     MenuWithVotesSerializer,
 )
+from user.authentication import ClaimsJWTAuthentication
 from user.permissions import IsEmployee
 from restaurant.models import Menu
 from django.core.exceptions import ObjectDoesNotExist
@@ -33,91 +45,264 @@ class SubmitVoteView(generics.CreateAPIView):
             return NewVoteSerializer
         return OldVoteSerializer
 
+    @property
+    def queued(self):
+        return settings.VOTE_INGESTION_MODE == "queue"
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        # Queued ballots are only shape-checked here; menus are validated by
+        # the worker that writes them.
+        context["defer_menu_checks"] = self.queued
+        return context
+
     def create(self, request, *args, **kwargs):
         serializer = self.get_serializer(data=request.data)
         try:
             serializer.is_valid(raise_exception=True)
-            vote = serializer.save(user=request.user)
-            logger.info(f"Vote submitted successfully: {vote}")
+            if self.queued:
+                ballot_id = get_vote_queue().enqueue(
+                    request.user.pk,
+                    serializer.get_ranked_menu_ids(),
+                    timezone.now().date(),
+                )
+                logger.info("Vote queued for processing: %s", ballot_id)
+                return success_response(
+                    message="Vote accepted for processing",
+                    data={"ballot_id": str(ballot_id)},
+                    status_code=status.HTTP_202_ACCEPTED,
+                )
+            serializer.save(user=request.user)
+            logger.info(
+                "Vote submitted by %s: %d menus", request.user.pk,
+                len(serializer.get_ranked_menu_ids()),
+            )
             return success_response(
                 message="Vote submitted successfully",
                 data=None,
                 status_code=status.HTTP_201_CREATED,
             )
         except serializers.ValidationError as e:
-            logger.error(f"Vote submission failed: {e.detail}")
+            logger.error("Vote submission failed: %s", e.detail)
             return error_response(
                 message="Vote submission failed", errors=e.detail)
         except ObjectDoesNotExist as e:
-            logger.error(f"Vote submission failed: {str(e)}")
+            logger.error("Vote submission failed: %s", e)
             return error_response(
                 message="Vote submission failed", errors=str(e))
         except Exception as e:
-            logger.error(f"Vote submission failed: {str(e)}")
+            logger.error("Vote submission failed: %s", e)
             return error_response(
                 message="Vote submission failed", errors=str(e))
 
 
+class VoteStatusView(APIView):
+    """
+    API view to check whether a submitted ballot has been recorded.
+    """
+
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated, IsEmployee]
+
+    def get(self, request, ballot_id):
+        queued = None
+        # Opening the queue creates its file: only look there in queue mode
+        if settings.VOTE_INGESTION_MODE == "queue":
+            queued = get_vote_queue().status(ballot_id, request.user.pk)
+        if queued is not None:
+            state, errors = queued
+        elif Ballot.objects.filter(
+            id=ballot_id, user_id=request.user.pk
+        ).exists():
+            state, errors = "accepted", None
+        else:
+            return error_response(
+                message="Ballot not found.",
+                status_code=status.HTTP_404_NOT_FOUND,
+            )
+        return success_response(
+            message="Ballot status fetched successfully",
+            data={
+                "ballot_id": str(ballot_id),
+                "status": state,
+                "errors": errors,
+            },
+        )
+
+
+def parse_limit(value):
+    # Default to top 3 if not specified or invalid, and keep at least one
+    try:
+        return max(1, int(value if value is not None else 3))
+    except ValueError:
+        return 3
+
+
+def parse_results_date(value, today):
+    """
+    Return ``(day, errors)`` for the ``date`` query parameter of the
+    results views.
+    """
+    try:
+        day = date.fromisoformat(value)
+    except ValueError:
+        return None, {"date": ["Must be formatted as YYYY-MM-DD."]}
+    if day > today:
+        return None, {"date": ["Cannot be in the future."]}
+    return day, None
+
+
+def get_top_menus(day, limit):
+    # Scores are maintained by the vote write path, so the top-N is a
+    # straight read of the (date, -points) index.
+    return (
+        Menu.objects.filter(
+            date=day,
+            is_published=True,
+            daily_scores__date=day,
+            daily_scores__points__gt=0,
+        )
+        .annotate(total_points=F("daily_scores__points"))
+        .order_by("-total_points")[:limit]
+    )
+
+
 class VoteResultsView(generics.ListAPIView):
     """
     API view to fetch the voting results for the current day.
+
+    Results of a past ``date`` are served in the compact form of
+    ``DailyResult``: per-menu points and rank histogram.
     """
 
     serializer_class = MenuWithVotesSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.IsAuthenticated, IsEmployee]
 
+    def get_limit(self):
+        return parse_limit(self.request.query_params.get("limit"))
+
     def get_queryset(self):
-        today = timezone.now().date()
-        logger.info(f"Fetching voting results for today: {today}")
-        limit = self.request.query_params.get(
-            "limit", 3
-        )  # Default to top 3 if not specified
-        try:
-            limit = int(limit)
-        except ValueError:
-            limit = 3  # Default to 3 if an invalid value is provided
-        return (
-            Menu.objects.filter(date=today, is_published=True)
-            .select_related("restaurant")
-            .prefetch_related("items")
-            .annotate(
-                total_points=Sum(
-                    Case(
-                        When(votes__rank=1, then=3),
-                        When(votes__rank=2, then=2),
-                        When(votes__rank=3, then=1),
-                        default=0,
-                        output_field=IntegerField(),
-                    )
-                )
-            )
-            .order_by("-total_points")
-            .filter(total_points__gt=0)[:limit]
+        return get_top_menus(timezone.now().date(), self.get_limit())
+
+    def compute_results(self):
+        return ValuesMenuWithVotesSerializer(self.get_queryset()).data
+
+    def get_historical_results(self, day):
+        result = DailyResult.objects.filter(date=day).first()
+        # Days not compacted yet are read from their live scores
+        scores = (
+            result.scores
+            if result is not None
+            else DailyResult.objects.build_scores(day)
         )
+        return scores[:self.get_limit()]
 
     def list(self, request, *args, **kwargs):
         try:
-            queryset = self.get_queryset()
-            if not queryset.exists():
+            today = timezone.now().date()
+            if "date" in request.query_params:
+                day, errors = parse_results_date(
+                    request.query_params["date"], today)
+                if errors:
+                    return error_response(
+                        message="Invalid date", errors=errors)
+                if day < today:
+                    return self.historical_response(day)
+
+            logger.info("Fetching voting results for today: %s", today)
+            data = get_results(today, self.get_limit(), self.compute_results)
+            if not data:
                 return success_response(
                     message="No voting results available for today.",
                     status_code=status.HTTP_404_NOT_FOUND,
                     data=None,
                 )
 
-            serializer = self.get_serializer(queryset, many=True)
             logger.info(
-                f"Voting results fetched successfully: {serializer.data}")
+                "Voting results fetched successfully: %d menus", len(data)
+            )
             return success_response(
                 message="Voting results fetched successfully",
-                data=serializer.data,
+                data=data,
                 status_code=status.HTTP_200_OK,
             )
         except Exception as e:
             logger.error(
-                f"An error occurred while fetching voting results: {str(e)}")
+                "An error occurred while fetching voting results: %s", e)
             return error_response(
                 message="An error occurred while fetching voting results",
                 errors=str(e),
-                status=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            )
+
+    def historical_response(self, day):
+        data = self.get_historical_results(day)
+        if not data:
+            return success_response(
+                message=f"No voting results available for {day}.",
+                status_code=status.HTTP_404_NOT_FOUND,
+                data=None,
+            )
+        return success_response(
+            message="Voting results fetched successfully", data=data)
+
+
+class AsyncVoteResultsView(AsyncAPIView):
+    """
+    Async variant of ``VoteResultsView`` for ASGI deployments, sharing its
+    results cache. Misses are computed with the async ORM.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsEmployee]
+
+    async def get(self, request):
+        try:
+            today = timezone.now().date()
+            limit = parse_limit(request.query_params.get("limit"))
+            if "date" in request.query_params:
+                day, errors = parse_results_date(
+                    request.query_params["date"], today)
+                if errors:
+                    return self.error("Invalid date", errors=errors)
+                if day < today:
+                    return await self.historical_response(day, limit)
+
+            data = await aget_results(
+                today,
+                limit,
+                ValuesMenuWithVotesSerializer(
+                    get_top_menus(today, limit)).adata,
+            )
+            if not data:
+                return self.success(
+                    message="No voting results available for today.",
+                    status_code=status.HTTP_404_NOT_FOUND,
+                )
+            return self.success(
+                data=data, message="Voting results fetched successfully")
+        except Exception as e:
+            logger.error(
+                "An error occurred while fetching voting results: %s", e)
+            return self.error(
+                "An error occurred while fetching voting results",
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                errors={"general": [str(e)]},
+            )
+
+    async def historical_response(self, day, limit):
+        result = await DailyResult.objects.filter(date=day).afirst()
+        # Days not compacted yet are read from their live scores
+        scores = (
+            result.scores
+            if result is not None
+            else await sync_to_async(DailyResult.objects.build_scores)(day)
+        )
+        data = scores[:limit]
+        if not data:
+            return self.success(
+                message=f"No voting results available for {day}.",
+                status_code=status.HTTP_404_NOT_FOUND,
             )
+        return self.success(
+            data=data, message="Voting results fetched successfully")
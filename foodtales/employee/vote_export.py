@@ -0,0 +1,190 @@
+import csv
+import io
+from itertools import chain, islice
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.db.models import Exists, OuterRef, Q, Subquery
+
+from employee.models import Ballot, Vote, VoteArchive, ballot_vote_id
+
+User = get_user_model()
+
+FORMATS = ("csv", "ndjson")
+CONTENT_TYPES = {"csv": "text/csv", "ndjson": "application/x-ndjson"}
+CHUNK_SIZE = 2000
+
+CHOICES = ["first_menu", "second_menu", "third_menu"]
+
+# Output column -> Vote lookup
+COLUMNS = {
+    "vote_id": "id",
+    "vote_date": "vote_date",
+    "created_at": "created_at",
+    "rank": "rank",
+    "user_id": "user_id",
+    "employee_id": "user__employee_id",
+    "menu_id": "menu_id",
+    "menu_date": "menu__date",
+    "restaurant_id": "menu__restaurant__restaurant_id",
+}
+
+
+def get_export_queryset(start=None, end=None, restaurant_id=None):
+    """
+    Return the legacy vote rows to export as tuples ordered like
+    ``COLUMNS``, optionally limited to ``start``-``end`` (inclusive) and one
+    restaurant.
+    """
+    votes = Vote.objects.all()
+    if start is not None:
+        votes = votes.filter(vote_date__gte=start)
+    if end is not None:
+        votes = votes.filter(vote_date__lte=end)
+    if restaurant_id is not None:
+        votes = votes.filter(menu__restaurant__restaurant_id=restaurant_id)
+    return votes.order_by("vote_date", "id").values_list(*COLUMNS.values())
+
+
+class BallotRows:
+    """
+    The ballots to export, read like a queryset but yielding one row per
+    ranked choice, ordered like ``COLUMNS``.
+
+    Ballots of users that still have legacy ``Vote`` rows that day are
+    left out: those rows are exported instead.
+    """
+
+    def __init__(self, start=None, end=None, restaurant_id=None):
+        ballots = Ballot.objects.filter(
+            ~Exists(
+                Vote.objects.filter(
+                    user_id=OuterRef("user_id"), vote_date=OuterRef("date"))
+            )
+        )
+        if start is not None:
+            ballots = ballots.filter(date__gte=start)
+        if end is not None:
+            ballots = ballots.filter(date__lte=end)
+        if restaurant_id is not None:
+            query = Q()
+            for choice in CHOICES:
+                query |= Q(
+                    **{f"{choice}__restaurant__restaurant_id": restaurant_id})
+            ballots = ballots.filter(query)
+        fields = ["id", "date", "created_at", "user_id", "user__employee_id"]
+        for choice in CHOICES:
+            fields += [
+                f"{choice}_id",
+                f"{choice}__date",
+                f"{choice}__restaurant__restaurant_id",
+            ]
+        self.restaurant_id = restaurant_id
+        self.ballots = ballots.order_by("date", "id").values_list(*fields)
+
+    def iterator(self, chunk_size):
+        for ballot_id, date, created_at, user_id, employee_id, *menus in (
+            self.ballots.iterator(chunk_size=chunk_size)
+        ):
+            for rank in range(1, 4):
+                menu_id, menu_date, restaurant = menus[3 * rank - 3:3 * rank]
+                if menu_id is None or self.restaurant_id not in (
+                    None, restaurant
+                ):
+                    continue
+                yield (
+                    ballot_vote_id(ballot_id, rank), date, created_at, rank,
+                    user_id, employee_id, menu_id, menu_date, restaurant,
+                )
+
+
+def get_archive_queryset(start=None, end=None, restaurant_id=None):
+    """
+    Same as ``get_export_queryset`` for the archived votes of finalized
+    days. Employee and restaurant ids are looked up by primary key since
+    the archive has no foreign keys.
+    """
+    votes = VoteArchive.objects.all()
+    if start is not None:
+        votes = votes.filter(vote_date__gte=start)
+    if end is not None:
+        votes = votes.filter(vote_date__lte=end)
+    if restaurant_id is not None:
+        votes = votes.filter(
+            restaurant_id__in=User.objects.filter(
+                restaurant_id=restaurant_id).values("pk"))
+    users = User.objects.filter(pk=OuterRef("user_id"))
+    restaurants = User.objects.filter(pk=OuterRef("restaurant_id"))
+    return (
+        votes.annotate(
+            employee_code=Subquery(users.values("employee_id")),
+            restaurant_code=Subquery(restaurants.values("restaurant_id")),
+        )
+        .order_by("vote_date", "id")
+        .values_list(
+            "id", "vote_date", "created_at", "rank", "user_id",
+            "employee_code", "menu_id", "vote_date", "restaurant_code",
+        )
+    )
+
+
+def get_export_querysets(start=None, end=None, restaurant_id=None):
+    """
+    Return the archived, the legacy then the ballot vote rows to export,
+    each in date order.
+    """
+    return [
+        get_archive_queryset(start, end, restaurant_id),
+        get_export_queryset(start, end, restaurant_id),
+        BallotRows(start, end, restaurant_id),
+    ]
+
+
+def iter_export(querysets, file_format, chunk_size=CHUNK_SIZE):
+    """
+    Yield the export of ``querysets`` as encoded chunks of ``chunk_size``
+    rows.
+
+    Rows are read through ``.iterator()``, i.e. a server-side cursor on
+    PostgreSQL, so memory use does not depend on the number of votes.
+    """
+    rows = chain.from_iterable(
+        queryset.iterator(chunk_size=chunk_size) for queryset in querysets)
+    encode = encode_csv if file_format == "csv" else encode_ndjson
+    if file_format == "csv":
+        yield encode([list(COLUMNS)])
+    while chunk := list(islice(rows, chunk_size)):
+        yield encode(chunk)
+
+
+async def aiter_export(querysets, file_format, chunk_size=CHUNK_SIZE):
+    """
+    Async counterpart of ``iter_export`` for responses served over ASGI,
+    which would otherwise read a sync iterator to the end before sending
+    anything. Each chunk of rows is fetched from the same server-side
+    cursor in a thread, so memory use stays constant as well.
+    """
+    rows = chain.from_iterable(
+        queryset.iterator(chunk_size=chunk_size) for queryset in querysets)
+    encode = encode_csv if file_format == "csv" else encode_ndjson
+    if file_format == "csv":
+        yield encode([list(COLUMNS)])
+    fetch = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    while chunk := await fetch():
+        yield encode(chunk)
+
+
+def encode_csv(rows):
+    buffer = io.StringIO()
+    csv.writer(buffer).writerows(
+        [value.isoformat() if hasattr(value, "isoformat") else value
+         for value in row]
+        for row in rows
+    )
+    return buffer.getvalue().encode()
+
+
+def encode_ndjson(rows):
+    return b"".join(
+        orjson.dumps(dict(zip(COLUMNS, row))) + b"\n" for row in rows)
@@ -0,0 +1,251 @@
+import json
+import sqlite3
+import threading
+import time
+import uuid
+from datetime import date
+
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from rest_framework import serializers
+
+from employee.ballots import cast_ballot, validate_ballot
+from employee.models import Ballot
+
+PENDING = "pending"
+PROCESSING = "processing"
+ACCEPTED = "accepted"
+REJECTED = "rejected"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS ballots (
+    id TEXT PRIMARY KEY,
+    user_id INTEGER NOT NULL,
+    vote_date TEXT NOT NULL,
+    votes TEXT NOT NULL,
+    status TEXT NOT NULL,
+    errors TEXT,
+    enqueued_at REAL NOT NULL,
+    claimed_at REAL,
+    processed_at REAL
+);
+CREATE INDEX IF NOT EXISTS ballots_status_idx
+    ON ballots (status, enqueued_at);
+"""
+
+
+class QueuedBallot:
+    def __init__(self, id, user_id, vote_date, votes):
+        self.id = uuid.UUID(id)
+        self.user_id = user_id
+        self.vote_date = date.fromisoformat(vote_date)
+        self.votes = [(uuid.UUID(menu_id), rank) for menu_id, rank in votes]
+
+
+class VoteQueue:
+    """
+    Durable local queue of accepted-but-not-yet-written ballots.
+
+    Backed by a SQLite database in WAL mode so every web worker on the host
+    can append concurrently while ``drain_vote_queue`` reads from it. Each
+    thread keeps its own connection.
+    """
+
+    def __init__(self, path=None, lease_seconds=60):
+        self.path = str(path or settings.VOTE_QUEUE_PATH)
+        self.lease_seconds = lease_seconds
+        self._local = threading.local()
+
+    @property
+    def connection(self):
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(
+                self.path, timeout=30, isolation_level=None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            # A 202 promises the ballot is stored: sync the WAL on every
+            # commit so an accepted ballot survives a power loss
+            connection.execute("PRAGMA synchronous=FULL")
+            connection.executescript(_SCHEMA)
+            self._local.connection = connection
+        return connection
+
+    def enqueue(self, user_id, ranked_menu_ids, vote_date):
+        """
+        Append a ballot given as ``(menu_id, rank)`` pairs and return its id.
+        """
+        ballot_id = uuid.uuid4()
+        votes = [[str(menu_id), rank] for menu_id, rank in ranked_menu_ids]
+        self.connection.execute(
+            "INSERT INTO ballots (id, user_id, vote_date, votes, status, "
+            "enqueued_at) VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                str(ballot_id),
+                user_id,
+                vote_date.isoformat(),
+                json.dumps(votes),
+                PENDING,
+                time.time(),
+            ),
+        )
+        return ballot_id
+
+    def claim(self, limit):
+        """
+        Lease up to ``limit`` of the oldest pending ballots. Ballots leased
+        by a worker that died are handed out again once the lease expires.
+        """
+        now = time.time()
+        connection = self.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute(
+                "SELECT id, user_id, vote_date, votes FROM ballots "
+                "WHERE status = ? OR (status = ? AND claimed_at < ?) "
+                "ORDER BY enqueued_at LIMIT ?",
+                (PENDING, PROCESSING, now - self.lease_seconds, limit),
+            ).fetchall()
+            connection.executemany(
+                "UPDATE ballots SET status = ?, claimed_at = ? WHERE id = ?",
+                [(PROCESSING, now, row[0]) for row in rows],
+            )
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return [
+            QueuedBallot(id, user_id, vote_date, json.loads(votes))
+            for id, user_id, vote_date, votes in rows
+        ]
+
+    def complete(self, outcomes):
+        """
+        Record the outcome of processed ballots, given as
+        ``(ballot_id, status, errors)`` triples.
+        """
+        now = time.time()
+        self.connection.executemany(
+            "UPDATE ballots SET status = ?, errors = ?, processed_at = ? "
+            "WHERE id = ?",
+            [
+                (
+                    status,
+                    json.dumps(errors) if errors is not None else None,
+                    now,
+                    str(ballot_id),
+                )
+                for ballot_id, status, errors in outcomes
+            ],
+        )
+
+    def release(self, ballot_ids):
+        """
+        Hand leased ballots back to the queue without an outcome, so the
+        next claim retries them.
+        """
+        self.connection.executemany(
+            "UPDATE ballots SET status = ?, claimed_at = NULL "
+            "WHERE id = ? AND status = ?",
+            [(PENDING, str(ballot_id), PROCESSING)
+             for ballot_id in ballot_ids],
+        )
+
+    def status(self, ballot_id, user_id):
+        """
+        Return ``(status, errors)`` of a ballot queued by ``user_id``, or
+        ``None`` if the queue does not know it.
+        """
+        row = self.connection.execute(
+            "SELECT status, errors FROM ballots WHERE id = ? AND user_id = ?",
+            (str(ballot_id), user_id),
+        ).fetchone()
+        if row is None:
+            return None
+        status, errors = row
+        if status == PROCESSING:
+            status = PENDING
+        return status, json.loads(errors) if errors else None
+
+    def purge(self, older_than_seconds):
+        """
+        Forget processed ballots older than the given age.
+        """
+        self.connection.execute(
+            "DELETE FROM ballots WHERE status IN (?, ?) AND processed_at < ?",
+            (ACCEPTED, REJECTED, time.time() - older_than_seconds),
+        )
+
+
+_queues = {}
+
+
+def get_vote_queue():
+    path = str(settings.VOTE_QUEUE_PATH)
+    if path not in _queues:
+        _queues[path] = VoteQueue(path)
+    return _queues[path]
+
+
+def drain(queue, batch_size=200):
+    """
+    Write one batch of queued ballots inside a single transaction and
+    record every outcome. Returns the batch size, ``0`` once the queue is
+    empty.
+
+    Only ballots that fail validation or an integrity constraint are
+    rejected. Any other error, such as a lost connection or a deadlock,
+    hands the batch back to the queue and is raised.
+    """
+    batch = queue.claim(batch_size)
+    if batch:
+        write_batch(queue, batch)
+    return len(batch)
+
+
+def write_batch(queue, batch):
+    outcomes = []
+    try:
+        with transaction.atomic():
+            for ballot in batch:
+                outcomes.append(write_ballot(ballot))
+    except IntegrityError as e:
+        # A deferred constraint, like foreign keys on PostgreSQL, fails on
+        # commit without telling which ballot broke it: write them one at
+        # a time to find out.
+        if len(batch) == 1:
+            queue.complete([(batch[0].id, REJECTED, [str(e)])])
+        else:
+            for ballot in batch:
+                write_batch(queue, [ballot])
+        return
+    except Exception:
+        queue.release([ballot.id for ballot in batch])
+        raise
+    queue.complete(outcomes)
+
+
+def write_ballot(ballot):
+    """
+    Write one queued ballot and return its ``(ballot_id, status, errors)``
+    outcome. Each ballot gets its own savepoint, so one rejected ballot
+    does not roll back the rest of the batch.
+    """
+    try:
+        validate_ballot(
+            [menu_id for menu_id, _ in ballot.votes],
+            date=ballot.vote_date,
+        )
+        cast_ballot(
+            ballot.user_id,
+            ballot.votes,
+            date=ballot.vote_date,
+            ballot_id=ballot.id,
+        )
+    except serializers.ValidationError as e:
+        if Ballot.objects.filter(id=ballot.id).exists():
+            # Written by an earlier run that died before completing.
+            return ballot.id, ACCEPTED, None
+        return ballot.id, REJECTED, e.detail
+    except IntegrityError as e:
+        return ballot.id, REJECTED, [str(e)]
+    return ballot.id, ACCEPTED, None
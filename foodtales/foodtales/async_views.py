@@ -0,0 +1,89 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views import View
+from rest_framework import permissions, status
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.request import Request
+
+from foodtales.renderers import ORJSONRenderer
+from user.authentication import ClaimsJWTAuthentication
+
+
+class AsyncAPIView(View):
+    """
+    Base class for read endpoints served natively under ASGI.
+
+    DRF views are synchronous, so these are plain Django views with async
+    handlers. The request is authenticated from the JWT claims in a
+    worker thread, then ``permission_classes`` are checked in the event
+    loop: they must only read attributes of ``request.user`` (as
+    ``IsAuthenticated`` and ``IsEmployee`` do), never query the database.
+
+    Handlers receive a DRF ``Request`` so paginators and query params work
+    as in the synchronous views, and answer with ``success`` or ``error``,
+    which render the same envelopes as ``success_response`` and
+    ``error_response``.
+    """
+
+    authentication = ClaimsJWTAuthentication()
+    permission_classes = [permissions.IsAuthenticated]
+    renderer = ORJSONRenderer()
+
+    async def dispatch(self, request, *args, **kwargs):
+        try:
+            authenticated = await sync_to_async(
+                self.authentication.authenticate)(request)
+        except AuthenticationFailed as e:
+            return self.error(str(e.detail), status.HTTP_401_UNAUTHORIZED)
+        request = Request(request)
+        # Also replaces the lazy user of AuthenticationMiddleware, which
+        # would hit the session tables from the event loop
+        request.user = (
+            authenticated[0] if authenticated is not None
+            else AnonymousUser()
+        )
+        for permission_class in self.permission_classes:
+            if not permission_class().has_permission(request, self):
+                if authenticated is None:
+                    return self.error(
+                        "Authentication credentials were not provided.",
+                        status.HTTP_401_UNAUTHORIZED,
+                    )
+                return self.error(
+                    "You do not have permission to perform this action.",
+                    status.HTTP_403_FORBIDDEN,
+                )
+        self.request = request
+        return await super().dispatch(request, *args, **kwargs)
+
+    def render(self, data, status_code, headers=None):
+        return HttpResponse(
+            self.renderer.render(data),
+            content_type=self.renderer.media_type,
+            status=status_code,
+            headers=headers,
+        )
+
+    def success(self, data=None, message=None,
+                status_code=status.HTTP_200_OK, headers=None):
+        return self.render(
+            {
+                "success": True,
+                "message": message or "Operation successful",
+                "data": data,
+            },
+            status_code,
+            headers,
+        )
+
+    def error(self, message, status_code=status.HTTP_400_BAD_REQUEST,
+              errors=None):
+        return self.render(
+            {
+                "success": False,
+                "message": message,
+                "errors": errors if errors is not None else {},
+            },
+            status_code,
+        )
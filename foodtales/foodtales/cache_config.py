@@ -0,0 +1,38 @@
+from urllib.parse import urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+# CACHE_URL scheme -> cache backend
+BACKENDS = {
+    "redis": "django.core.cache.backends.redis.RedisCache",
+    "rediss": "django.core.cache.backends.redis.RedisCache",
+    "memcached": "django.core.cache.backends.memcached.PyMemcacheCache",
+    "locmem": "django.core.cache.backends.locmem.LocMemCache",
+}
+
+
+def cache_config(url):
+    """
+    Build a ``CACHES`` entry from a cache URL:
+
+    - ``redis://host:6379/0`` (or ``rediss://``): Redis, the URL is passed
+      to redis-py as is.
+    - ``memcached://host:11211``: Memcached through pymemcache; several
+      servers are separated by commas.
+    - ``locmem://``: a cache private to the process, only suitable when a
+      single process serves everything (tests, ``runserver``).
+    """
+    scheme = urlsplit(url).scheme
+    if scheme not in BACKENDS:
+        raise ImproperlyConfigured(
+            f"Unsupported CACHE_URL scheme {scheme!r}: use one of "
+            f"{', '.join(sorted(BACKENDS))}."
+        )
+    config = {"BACKEND": BACKENDS[scheme]}
+    if scheme.startswith("redis"):
+        config["LOCATION"] = url
+    elif scheme == "memcached":
+        config["LOCATION"] = url.split("://", 1)[1].split(",")
+    else:
+        config["LOCATION"] = url.split("://", 1)[1] or "foodtales"
+    return config
@@ -0,0 +1,94 @@
+import dj_database_url
+from django.core.exceptions import ImproperlyConfigured
+
+# Served under ASGI, where the sync code of each request runs in a thread
+# of its own: connections kept by those threads would leak, so each request
+# opens its own unless the URL says otherwise (prefer pool on PostgreSQL)
+DEFAULT_CONN_MAX_AGE = 0
+# DATABASE_URL query params mapped to psycopg_pool.ConnectionPool options
+POOL_OPTIONS = {
+    "pool_min_size": ("min_size", int),
+    "pool_max_size": ("max_size", int),
+    "pool_timeout": ("timeout", float),
+    "pool_max_waiting": ("max_waiting", int),
+    "pool_max_idle": ("max_idle", float),
+    "pool_max_lifetime": ("max_lifetime", float),
+}
+
+
+def database_config(url):
+    """
+    Build a ``DATABASES`` entry from a database URL. Connection handling is
+    set with query params, the others being passed to the driver:
+
+    - ``conn_max_age``: seconds to keep a connection across requests
+      (default ``0``, one connection per request; ``none`` for no limit).
+      Only useful for servers reusing threads across requests (WSGI).
+    - ``conn_health_checks``: check reused connections before each request
+      (default true).
+    - ``pool``: use the psycopg 3 connection pool of the PostgreSQL
+      backend instead of persistent connections, tuned with ``pool_*``
+      params (``pool_min_size``, ``pool_max_size``, ``pool_timeout``...).
+    """
+    config = dj_database_url.parse(url)
+    options = config.setdefault("OPTIONS", {})
+    pool = options.pop("pool", False)
+    pool_options = {
+        option: cast(options.pop(param))
+        for param, (option, cast) in POOL_OPTIONS.items()
+        if param in options
+    }
+    config["CONN_HEALTH_CHECKS"] = bool(
+        options.pop("conn_health_checks", True))
+    max_age = options.pop("conn_max_age", None)
+
+    if not (pool or pool_options):
+        if max_age is None:
+            max_age = DEFAULT_CONN_MAX_AGE
+        config["CONN_MAX_AGE"] = None if max_age == "none" else int(max_age)
+        return config
+
+    if config["ENGINE"] != "django.db.backends.postgresql":
+        raise ImproperlyConfigured(
+            "Connection pooling is only supported on PostgreSQL.")
+    if max_age not in (None, 0):
+        raise ImproperlyConfigured(
+            "conn_max_age cannot be combined with pool: pooled connections "
+            "are returned to the pool after each request."
+        )
+    options["pool"] = pool_options or True
+    config["CONN_MAX_AGE"] = 0
+    return config
+
+
+def get_pool_metrics():
+    """
+    Return gauges describing the connection pools of this process: size,
+    saturation, checkouts and time spent waiting for a connection.
+    """
+    from django.db import connections
+
+    gauges = {}
+    for connection in connections.all():
+        pool = getattr(connection, "pool", None)
+        if pool is None:
+            continue
+        stats = pool.get_stats()
+        in_use = stats["pool_size"] - stats["pool_available"]
+        checkouts = stats.get("requests_num", 0)
+        wait_ms = stats.get("requests_wait_ms", 0)
+        prefix = f"db.pool.{connection.alias}"
+        gauges.update({
+            f"{prefix}.size": stats["pool_size"],
+            f"{prefix}.max_size": stats["pool_max"],
+            f"{prefix}.in_use": in_use,
+            f"{prefix}.saturation": round(in_use / stats["pool_max"], 3),
+            f"{prefix}.waiting": stats["requests_waiting"],
+            f"{prefix}.checkouts": checkouts,
+            f"{prefix}.queued_checkouts": stats.get("requests_queued", 0),
+            f"{prefix}.checkout_errors": stats.get("requests_errors", 0),
+            f"{prefix}.wait_ms": wait_ms,
+            f"{prefix}.avg_wait_ms": (
+                round(wait_ms / checkouts, 3) if checkouts else 0.0),
+        })
+    return gauges
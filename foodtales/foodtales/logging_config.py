@@ -1,4 +1,11 @@
+import copy
+import logging
 import os
+import queue
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+
+import orjson
 
 # Get the directory of the current file (logging_config.py)
 current_dir = os.path.dirname(os.path.abspath(__file__))
@@ -7,24 +14,115 @@ current_dir = os.path.dirname(os.path.abspath(__file__))
 log_directory = os.path.join(current_dir, "logs")
 os.makedirs(log_directory, exist_ok=True)
 
+# Console output: "json" (one object per line) or "text"
+LOG_FORMAT = os.environ.get("LOG_FORMAT", "json")
+
+# Attributes of every record; the others were passed with ``extra``
+RECORD_ATTRS = frozenset(vars(logging.makeLogRecord({}))) | {
+    "message",
+    "asctime",
+    "taskName",
+}
+JSON_TYPES = (str, int, float, bool, type(None))
+
+
+class JSONFormatter(logging.Formatter):
+    """
+    Formats a record as a JSON object on one line, with the ``extra``
+    fields of the logging call next to the standard ones.
+    """
+
+    def format(self, record):
+        entry = {
+            "time": datetime.fromtimestamp(
+                record.created, timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "module": record.module,
+            "message": record.getMessage(),
+        }
+        entry.update(
+            (key, value)
+            for key, value in vars(record).items()
+            if key not in RECORD_ATTRS
+        )
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry["exc_info"] = record.exc_text
+        if record.stack_info:
+            entry["stack_info"] = record.stack_info
+        return orjson.dumps(entry, default=str).decode()
+
+
+class QueueListenerHandler(QueueHandler):
+    """
+    Hands records over to a background thread writing them to ``handlers``,
+    so request threads never wait on the console or the log file.
+
+    Message arguments, tracebacks and ``extra`` objects are still rendered
+    by the caller: they may not be valid anymore once the listener gets
+    them, and model instances must not query from another thread.
+    """
+
+    def __init__(self, handlers, respect_handler_level=True):
+        super().__init__(queue.SimpleQueue())
+        # Index the list: iterating a dictConfig list skips "cfg://" lookups
+        handlers = [handlers[i] for i in range(len(handlers))]
+        self.listener = QueueListener(
+            self.queue, *handlers,
+            respect_handler_level=respect_handler_level,
+        )
+        self.listener.start()
+        # Threads do not survive fork(): gunicorn workers forked from the
+        # preloaded master need a listener of their own
+        os.register_at_fork(after_in_child=self.restart_listener)
+
+    def restart_listener(self):
+        if self.listener._thread is None:
+            return
+        self.queue = self.listener.queue = queue.SimpleQueue()
+        self.listener._thread = None
+        self.listener.start()
+
+    def close(self):
+        # Called by logging.shutdown() at exit: write what is still queued
+        if self.listener._thread is not None:
+            self.listener.stop()
+        super().close()
+
+    def prepare(self, record):
+        record = copy.copy(record)
+        record.msg = record.message = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            if not record.exc_text:
+                record.exc_text = logging.Formatter().formatException(
+                    record.exc_info)
+            record.exc_info = None
+        for key, value in list(vars(record).items()):
+            if key not in RECORD_ATTRS and not isinstance(value, JSON_TYPES):
+                setattr(record, key, str(value))
+        return record
+
+
 LOGGING = {
     "version": 1,
     "disable_existing_loggers": False,
     "formatters": {
-        "verbose": {
-            "format": "{levelname} {asctime} {module} {message}",
-            "style": "{",
-        },
         "simple": {
             "format": "{levelname} {message}",
             "style": "{",
         },
+        "json": {
+            "()": "foodtales.logging_config.JSONFormatter",
+        },
     },
     "handlers": {
         "console": {
             "level": "DEBUG",
             "class": "logging.StreamHandler",
-            "formatter": "simple",
+            "formatter": "json" if LOG_FORMAT == "json" else "simple",
         },
         "file": {
             "level": "INFO",
@@ -32,17 +130,23 @@ LOGGING = {
             "filename": os.path.join(log_directory, "foodtales.log"),
             "maxBytes": 1024 * 1024 * 5,  # 5 MB
             "backupCount": 5,
-            "formatter": "verbose",
+            "formatter": "json",
+        },
+        # Handlers are configured in name order, so the ones it writes to
+        # must sort before "queue"
+        "queue": {
+            "class": "foodtales.logging_config.QueueListenerHandler",
+            "handlers": ["cfg://handlers.console", "cfg://handlers.file"],
         },
     },
     "loggers": {
         "django": {
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "level": "INFO",
             "propagate": True,
         },
         "foodtales": {
-            "handlers": ["console", "file"],
+            "handlers": ["queue"],
             "level": "DEBUG",
         },
     },
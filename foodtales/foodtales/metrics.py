@@ -0,0 +1,62 @@
+import threading
+from collections import defaultdict
+
+from rest_framework import permissions
+from rest_framework.views import APIView
+
+from foodtales.database import get_pool_metrics
+from foodtales.utils import success_response
+from user.authentication import ClaimsJWTAuthentication
+
+
+class MetricsRegistry:
+    """
+    Process-local counters and gauges for monitoring. Cheap enough to be
+    updated from request handlers.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = defaultdict(int)
+        self._gauges = {}
+
+    def incr(self, name, value=1):
+        with self._lock:
+            self._counters[name] += value
+
+    def set_gauge(self, name, value):
+        with self._lock:
+            self._gauges[name] = value
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "counters": dict(self._counters),
+                "gauges": dict(self._gauges),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._counters.clear()
+            self._gauges.clear()
+
+
+metrics = MetricsRegistry()
+
+
+class MetricsView(APIView):
+    """
+    API view exposing the metrics of the worker process serving the request,
+    for staff users.
+    """
+
+    authentication_classes = [ClaimsJWTAuthentication]
+    permission_classes = [permissions.IsAuthenticated,
+                          permissions.IsAdminUser]
+
+    def get(self, request):
+        for name, value in get_pool_metrics().items():
+            metrics.set_gauge(name, value)
+        return success_response(
+            message="Metrics fetched successfully", data=metrics.snapshot()
+        )
@@ -1,10 +1,126 @@
+from asgiref.sync import (
+    iscoroutinefunction,
+    markcoroutinefunction,
+    sync_to_async,
+)
+from django.conf import settings
+from rest_framework.permissions import SAFE_METHODS
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.settings import api_settings as jwt_settings
+from rest_framework_simplejwt.tokens import AccessToken
+
+from foodtales.routers import (
+    choose_replica,
+    is_pinned,
+    pin_user,
+    reset_read_alias,
+    set_read_alias,
+)
+
+
 class AppVersionMiddleware:
+    # Runs in the event loop under ASGI instead of being adapted onto a
+    # worker thread for every request
+    sync_capable = True
+    async_capable = True
+
     def __init__(self, get_response):
         self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
 
     def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        self.set_app_version(request)
+        return self.get_response(request)
+
+    async def __acall__(self, request):
+        self.set_app_version(request)
+        return await self.get_response(request)
+
+    def set_app_version(self, request):
         # Extract app version from headers
         request.app_version = request.headers.get(
             "X-App-Version", "1.0"
         )  # Default to '1.0' if not provided
-        return self.get_response(request)
+
+
+def get_token_user_id(request):
+    """
+    Return the user id of the access token sent with ``request``, if any.
+    Only checks the signature: the view authenticates the request.
+    """
+    authentication = JWTAuthentication()
+    header = authentication.get_header(request)
+    raw_token = header and authentication.get_raw_token(header)
+    if not raw_token:
+        return None
+    try:
+        return AccessToken(raw_token).get(jwt_settings.USER_ID_CLAIM)
+    except TokenError:
+        return None
+
+
+def is_replica_safe(request):
+    # Session users (the admin) are not pinned after writing, so they
+    # always read from the primary
+    return (
+        request.method in SAFE_METHODS
+        and settings.SESSION_COOKIE_NAME not in request.COOKIES
+    )
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Picks the database the ORM reads from during the request: a replica for
+    safe requests, the primary for writes and for users who wrote in the
+    last ``DATABASE_REPLICA_PIN_SECONDS``, so they always read their own
+    writes. See ``foodtales.routers``.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not settings.DATABASE_REPLICAS:
+            return self.get_response(request)
+        user_id = get_token_user_id(request)
+        safe = is_replica_safe(request)
+        pinned = bool(safe and user_id) and is_pinned(user_id)
+        token = set_read_alias(
+            choose_replica() if safe and not pinned else None)
+        try:
+            response = self.get_response(request)
+        finally:
+            reset_read_alias(token)
+        if request.method not in SAFE_METHODS and user_id \
+                and response.status_code < 400:
+            pin_user(user_id)
+        return response
+
+    async def __acall__(self, request):
+        if not settings.DATABASE_REPLICAS:
+            return await self.get_response(request)
+        user_id = get_token_user_id(request)
+        safe = is_replica_safe(request)
+        pinned = bool(safe and user_id) and await sync_to_async(is_pinned)(
+            user_id)
+        token = set_read_alias(
+            choose_replica() if safe and not pinned else None)
+        try:
+            response = await self.get_response(request)
+        finally:
+            reset_read_alias(token)
+        if request.method not in SAFE_METHODS and user_id \
+                and response.status_code < 400:
+            await sync_to_async(pin_user)(user_id)
+        return response
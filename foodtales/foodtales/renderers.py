@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+import orjson
+from django.utils.encoding import force_str
+from django.utils.functional import Promise
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import BaseParser
+from rest_framework.renderers import BaseRenderer
+
+
+def _default(obj):
+    # orjson already encodes UUID, date, datetime and str/dict/list
+    # subclasses (ErrorDetail, ReturnDict...) itself; only the types it
+    # does not know end up here. Decimals match DRF's JSONEncoder;
+    # serializer fields already coerce them to strings.
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, Promise):
+        return force_str(obj)
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    if hasattr(obj, "__iter__"):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONRenderer(BaseRenderer):
+    """
+    Renderer which serializes to JSON with orjson.
+    """
+
+    media_type = "application/json"
+    format = "json"
+    charset = None
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+        option = orjson.OPT_NON_STR_KEYS
+        if accepted_media_type and "indent" in accepted_media_type:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(data, default=_default, option=option)
+
+
+class ORJSONParser(BaseParser):
+    """
+    Parses JSON-serialized data with orjson.
+    """
+
+    media_type = "application/json"
+    renderer_class = ORJSONRenderer
+
+    def parse(self, stream, media_type=None, parser_context=None):
+        try:
+            return orjson.loads(stream.read())
+        except orjson.JSONDecodeError as exc:
+            raise ParseError(f"JSON parse error - {exc}")
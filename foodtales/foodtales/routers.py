@@ -0,0 +1,85 @@
+import random
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS
+
+PIN_KEY = "replica:pin:{user_id}"
+
+# Database the ORM reads from in the current request; None is the primary
+_read_alias = ContextVar("read_alias", default=None)
+
+
+def choose_replica():
+    """
+    Return the replica serving the reads of a request, or None when no
+    replica is configured.
+    """
+    replicas = settings.DATABASE_REPLICAS
+    return random.choice(replicas) if replicas else None
+
+
+def set_read_alias(alias):
+    return _read_alias.set(alias)
+
+
+def reset_read_alias(token):
+    _read_alias.reset(token)
+
+
+@contextmanager
+def read_from_primary(when=True):
+    """
+    Send the reads of the block to the primary, ``when`` it is true.
+    """
+    if not when:
+        yield
+        return
+    token = _read_alias.set(None)
+    try:
+        yield
+    finally:
+        _read_alias.reset(token)
+
+
+def pin_user(user_id):
+    """
+    Keep the reads of ``user_id`` on the primary long enough for the
+    replicas to receive what they just wrote.
+    """
+    cache.set(
+        PIN_KEY.format(user_id=user_id),
+        True,
+        timeout=settings.DATABASE_REPLICA_PIN_SECONDS,
+    )
+
+
+def is_pinned(user_id):
+    return cache.get(PIN_KEY.format(user_id=user_id), False)
+
+
+class ReplicaRouter:
+    """
+    Sends the reads of safe requests to the replica picked for the request
+    by ``ReplicaRoutingMiddleware``. Everything else reads from the primary:
+    unsafe requests, users pinned after a write and code running outside a
+    request (commands, workers).
+    """
+
+    def db_for_read(self, model, **hints):
+        instance = hints.get("instance")
+        if instance is not None and instance._state.db:
+            return instance._state.db
+        return _read_alias.get() or DEFAULT_DB_ALIAS
+
+    def db_for_write(self, model, **hints):
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Replicas receive the schema from the primary
+        return db not in settings.DATABASE_REPLICAS
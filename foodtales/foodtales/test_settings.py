@@ -0,0 +1,23 @@
+"""
+Settings for the test suite, picked by ``manage.py test``; other runners
+set ``DJANGO_SETTINGS_MODULE=foodtales.test_settings``.
+
+Tests run in a single process, so they keep the cache in memory instead of
+needing a cache server, and get a second database for the router tests.
+"""
+
+import os
+
+os.environ.setdefault("CACHE_URL", "locmem://")
+
+from .settings import *  # noqa: E402,F401,F403
+from .settings import DATABASE_REPLICAS, DATABASES  # noqa: E402
+
+# The router tests need a replica holding different data than the primary;
+# they list it in DATABASE_REPLICAS themselves, and only the runs including
+# them create it.
+if not DATABASE_REPLICAS:
+    DATABASES["replica_test"] = {
+        "ENGINE": "django.db.backends.sqlite3",
+        "NAME": ":memory:",
+    }
@@ -0,0 +1,209 @@
+import json
+import logging
+import threading
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase, TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from foodtales import warmup
+from foodtales.cache_config import cache_config
+from foodtales.database import database_config
+from foodtales.logging_config import JSONFormatter, QueueListenerHandler
+from restaurant.models import Menu, MenuItem
+
+User = get_user_model()
+
+
+class WarmupTestCase(TransactionTestCase):
+    def setUp(self):
+        self.state = dict(warmup._state)
+        self.addCleanup(warmup._state.update, self.state)
+        warmup._state.update(app=False, ready=False)
+
+    def test_readiness_waits_for_warm_up(self):
+        response = self.client.get(reverse("health-ready"))
+        self.assertEqual(
+            response.status_code, status.HTTP_503_SERVICE_UNAVAILABLE)
+        response = self.client.get(reverse("health-live"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertFalse(response.json()["data"]["ready"])
+
+        warmup.warm_worker()
+
+        response = self.client.get(reverse("health-ready"))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        response = self.client.get(reverse("health-live"))
+        self.assertTrue(response.json()["data"]["ready"])
+
+    def test_warm_app_does_not_query_the_database(self):
+        # It runs in the gunicorn master, before workers are forked
+        with self.assertNumQueries(0):
+            warmup.warm_app()
+        self.assertTrue(warmup._state["app"])
+        self.assertFalse(warmup.is_ready())
+
+
+class DatabaseConfigTestCase(SimpleTestCase):
+    def test_connection_per_request_by_default(self):
+        config = database_config("postgres://user@db/foodtales")
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertTrue(config["CONN_HEALTH_CHECKS"])
+        self.assertEqual(config["OPTIONS"], {})
+
+    def test_connection_params_from_url(self):
+        config = database_config(
+            "postgres://user@db/foodtales?conn_max_age=60"
+            "&conn_health_checks=false&sslmode=require"
+        )
+        self.assertEqual(config["CONN_MAX_AGE"], 60)
+        self.assertFalse(config["CONN_HEALTH_CHECKS"])
+        self.assertEqual(config["OPTIONS"], {"sslmode": "require"})
+        config = database_config("sqlite:///db.sqlite3?conn_max_age=none")
+        self.assertIsNone(config["CONN_MAX_AGE"])
+
+    def test_pool_options_from_url(self):
+        config = database_config(
+            "postgres://user@db/foodtales?pool=true&pool_min_size=2"
+            "&pool_max_size=10&pool_timeout=2.5"
+        )
+        self.assertEqual(config["CONN_MAX_AGE"], 0)
+        self.assertEqual(
+            config["OPTIONS"]["pool"],
+            {"min_size": 2, "max_size": 10, "timeout": 2.5},
+        )
+        config = database_config("postgres://user@db/foodtales?pool=true")
+        self.assertIs(config["OPTIONS"]["pool"], True)
+
+    def test_pool_rejects_unsupported_configurations(self):
+        with self.assertRaises(ImproperlyConfigured):
+            database_config("sqlite:///db.sqlite3?pool=true")
+        with self.assertRaises(ImproperlyConfigured):
+            database_config(
+                "postgres://user@db/foodtales?pool=true&conn_max_age=60")
+
+
+class CacheConfigTestCase(SimpleTestCase):
+    def test_shared_caches_from_url(self):
+        self.assertEqual(
+            cache_config("redis://redis:6379/0"),
+            {
+                "BACKEND": "django.core.cache.backends.redis.RedisCache",
+                "LOCATION": "redis://redis:6379/0",
+            },
+        )
+        config = cache_config("memcached://cache-1:11211,cache-2:11211")
+        self.assertTrue(config["BACKEND"].endswith(".PyMemcacheCache"))
+        self.assertEqual(
+            config["LOCATION"], ["cache-1:11211", "cache-2:11211"])
+
+    def test_process_local_cache_is_explicit(self):
+        config = cache_config("locmem://")
+        self.assertTrue(config["BACKEND"].endswith(".LocMemCache"))
+        with self.assertRaises(ImproperlyConfigured):
+            cache_config("foodtales_cache")
+
+
+class RecordingHandler(logging.Handler):
+    def __init__(self):
+        super().__init__()
+        self.records = []
+        self.threads = set()
+
+    def emit(self, record):
+        self.records.append(record)
+        self.threads.add(threading.get_ident())
+
+
+class LoggingTestCase(TestCase):
+    def test_json_formatter_emits_one_object_per_record(self):
+        record = logging.makeLogRecord({
+            "name": "foodtales",
+            "levelno": logging.INFO,
+            "levelname": "INFO",
+            "msg": "Menu created successfully: %s (%d items)",
+            "args": ("menu-1", 2),
+            "menu_id": "menu-1",
+        })
+        entry = json.loads(JSONFormatter().format(record))
+        self.assertEqual(entry["level"], "INFO")
+        self.assertEqual(entry["logger"], "foodtales")
+        self.assertEqual(
+            entry["message"], "Menu created successfully: menu-1 (2 items)")
+        self.assertEqual(entry["menu_id"], "menu-1")
+
+    def test_records_are_written_by_a_background_thread(self):
+        target = RecordingHandler()
+        handler = QueueListenerHandler([target])
+        logger = logging.getLogger("foodtales.tests.queue")
+        logger.propagate = False
+        logger.addHandler(handler)
+        self.addCleanup(logger.removeHandler, handler)
+        try:
+            1 / 0
+        except ZeroDivisionError:
+            logger.exception("Failed for %s", "menu-1", extra={"menu": {}})
+        handler.close()
+
+        (record,) = target.records
+        self.assertNotIn(threading.get_ident(), target.threads)
+        # Rendered by the caller, before the record is queued
+        self.assertEqual(record.getMessage(), "Failed for menu-1")
+        self.assertIsNone(record.args)
+        self.assertIn("ZeroDivisionError", record.exc_text)
+        self.assertEqual(record.menu, "{}")
+
+    def test_str_of_menus_does_not_query(self):
+        restaurant = User.objects.create_user(
+            email="restaurant@example.com",
+            password="testpass123",
+            user_type="restaurant",
+            restaurant_name="Test Restaurant",
+        )
+        menu = Menu.objects.create(
+            restaurant=restaurant, date=timezone.now().date())
+        item = MenuItem.objects.create(
+            menu=menu, name="Soup", price=Decimal("4.50"),
+            category="appetizer",
+        )
+        menu = Menu.objects.get(pk=menu.pk)
+        item = MenuItem.objects.get(pk=item.pk)
+        with self.assertNumQueries(0):
+            self.assertIn(str(menu.pk), str(menu))
+            self.assertIn(str(menu.pk), str(item))
+        item = MenuItem.objects.select_related("menu__restaurant").get(
+            pk=item.pk)
+        with self.assertNumQueries(0):
+            self.assertEqual(str(item), "Soup - Test Restaurant")
+
+
+class MetricsViewTestCase(APITestCase):
+    def test_metrics_are_for_staff_only(self):
+        url = reverse("metrics")
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        employee = User.objects.create_user(
+            email="employee@example.com",
+            password="testpass123",
+            user_type="employee",
+        )
+        self.client.force_authenticate(user=employee)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+        staff = User.objects.create_user(
+            email="hr@example.com",
+            password="testpass123",
+            user_type="employee",
+            is_staff=True,
+        )
+        self.client.force_authenticate(user=staff)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn("counters", response.json()["data"])
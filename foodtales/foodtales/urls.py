@@ -23,6 +23,9 @@ from rest_framework import permissions
 from drf_yasg.views import get_schema_view
 from drf_yasg import openapi
 
+from foodtales.metrics import MetricsView
+from foodtales.warmup import LivenessView, ReadinessView
+
 schema_view = get_schema_view(
     openapi.Info(
         title="FoodTales API",
@@ -42,6 +45,9 @@ urlpatterns = [
          name="token_refresh"),
     path("v1/restaurant/", include("restaurant.urls")),
     path("v1/employee/", include("employee.urls")),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
+    path("health/live/", LivenessView.as_view(), name="health-live"),
+    path("health/ready/", ReadinessView.as_view(), name="health-ready"),
     path(
         "docs/",
         schema_view.with_ui("swagger", cache_timeout=0),
@@ -1,6 +1,14 @@
+import base64
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Q, QuerySet
+from rest_framework.exceptions import NotFound
 from rest_framework.response import Response
 from rest_framework import status
-from rest_framework.pagination import PageNumberPagination
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.utils.urls import remove_query_param, replace_query_param
 
 
 def success_response(data=None, message=None, status_code=status.HTTP_200_OK):
@@ -40,3 +48,212 @@ class CustomPageNumberPagination(PageNumberPagination):
     page_size = 10
     page_size_query_param = "page_size"
     max_page_size = 100
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a stable ``(date, id)`` order.
+
+    Pages are located by filtering on the key of the last row seen instead
+    of an ``OFFSET``, and no ``COUNT(*)`` is issued, so every page costs the
+    same. Cursors are opaque to clients. Works on querysets and on lists of
+    dicts already sorted by ``ordering``. Responses keep the envelope of
+    ``CustomPageNumberPagination`` with ``count`` set to ``None``.
+    """
+
+    page_size = 10
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    ordering = ("-date", "-id")
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.cursor, self.reverse = self.decode_cursor(request)
+
+        if isinstance(queryset, QuerySet):
+            page = self.paginate_rows(queryset)
+        else:
+            page = self.paginate_list(queryset)
+        self.page = page
+        return page
+
+    def paginate_rows(self, queryset):
+        fields = [field.lstrip("-") for field in self.ordering]
+        descending = self.ordering[0].startswith("-")
+        ordering = self.ordering
+        if self.cursor is not None:
+            # Rows after the cursor are "smaller" when sorting descending;
+            # walking backwards flips both the filter and the order.
+            lookup = "lt" if descending != self.reverse else "gt"
+            condition = Q()
+            for i, field in enumerate(fields):
+                condition |= Q(
+                    **dict(zip(fields[:i], self.cursor[:i])),
+                    **{f"{field}__{lookup}": self.cursor[i]},
+                )
+            queryset = queryset.filter(condition)
+        if self.reverse:
+            ordering = [
+                field[1:] if field.startswith("-") else f"-{field}"
+                for field in ordering
+            ]
+
+        rows = list(queryset.order_by(*ordering)[: self.page_size + 1])
+        has_more = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        if self.reverse:
+            rows.reverse()
+            self.has_previous, self.has_next = has_more, True
+        else:
+            self.has_previous = self.cursor is not None
+            self.has_next = has_more
+        return rows
+
+    def paginate_list(self, items):
+        descending = self.ordering[0].startswith("-")
+        keys = [self.get_key(item) for item in items]
+
+        def precedes(key):
+            return key > self.cursor if descending else key < self.cursor
+
+        if self.cursor is None:
+            start = 0
+            end = self.page_size
+        elif self.reverse:
+            end = sum(1 for key in keys if precedes(key))
+            start = max(0, end - self.page_size)
+        else:
+            start = sum(
+                1 for key in keys if precedes(key) or key == self.cursor)
+            end = start + self.page_size
+        self.has_previous = start > 0
+        self.has_next = end < len(items)
+        return list(items[start:end])
+
+    def get_key(self, row):
+        fields = [field.lstrip("-") for field in self.ordering]
+        if isinstance(row, dict):
+            values = [row[field] for field in fields]
+        else:
+            values = [getattr(row, field) for field in fields]
+        return tuple(
+            value.isoformat() if hasattr(value, "isoformat") else str(value)
+            for value in values
+        )
+
+    def encode_cursor(self, key, reverse):
+        payload = json.dumps({"k": key, "r": reverse}).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            padding = "=" * (-len(encoded) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(encoded + padding))
+            key = tuple(str(value) for value in payload["k"])
+            if len(key) != len(self.ordering):
+                raise ValueError
+            return key, bool(payload["r"])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_page_size(self, request):
+        return PageNumberPagination.get_page_size(self, request)
+
+    def get_link(self, key, reverse):
+        url = remove_query_param(
+            self.request.build_absolute_uri(), "page")
+        return replace_query_param(
+            url, self.cursor_query_param, self.encode_cursor(key, reverse))
+
+    def get_next_link(self):
+        if not self.has_next or not self.page:
+            return None
+        return self.get_link(self.get_key(self.page[-1]), False)
+
+    def get_previous_link(self):
+        if not self.has_previous or not self.page:
+            return None
+        return self.get_link(self.get_key(self.page[0]), True)
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "count": None,
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+
+class SelectablePaginationMixin:
+    """
+    Lets clients pick a paginator with ``?pagination=<name>``, or by
+    sending a ``cursor``, falling back to the view's ``pagination_class``.
+    """
+
+    pagination_classes = {
+        "page": CustomPageNumberPagination,
+        "cursor": KeysetPagination,
+    }
+    pagination_query_param = "pagination"
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            params = self.request.query_params
+            name = params.get(self.pagination_query_param)
+            if name is None and KeysetPagination.cursor_query_param in params:
+                name = "cursor"
+            pagination_class = self.pagination_classes.get(
+                name, self.pagination_class)
+            self._paginator = (
+                pagination_class() if pagination_class is not None else None
+            )
+        return self._paginator
+
+
+def get_cache_version(key):
+    """
+    Return the current value of the version counter stored at ``key``,
+    starting it at 1 when missing.
+    """
+    version = cache.get(key)
+    if version is None:
+        cache.add(key, 1, timeout=None)
+        version = cache.get(key, 1)
+    return version
+
+
+def bump_cache_version(key):
+    """
+    Move the version counter stored at ``key`` forward, orphaning every
+    entry cached under the previous version.
+    """
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.add(key, 1, timeout=None)
+    if settings.DATABASE_REPLICAS:
+        cache.set(
+            f"{key}:bumped",
+            True,
+            timeout=settings.DATABASE_REPLICA_PIN_SECONDS,
+        )
+
+
+def cache_version_bumped_recently(key):
+    """
+    Whether the version counter at ``key`` moved within the last
+    ``DATABASE_REPLICA_PIN_SECONDS``: entries rebuilt for the new version
+    must then be read from the primary, as replicas may not have the write
+    that caused the bump yet.
+    """
+    return bool(settings.DATABASE_REPLICAS) and cache.get(
+        f"{key}:bumped", False)
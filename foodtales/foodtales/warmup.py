@@ -0,0 +1,110 @@
+import logging
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.urls import URLResolver, get_resolver
+from rest_framework import permissions, status
+from rest_framework.views import APIView
+
+from foodtales.metrics import metrics
+from foodtales.utils import error_response, success_response
+
+logger = logging.getLogger("foodtales")
+
+_state = {"app": False, "ready": False}
+
+
+def iter_views(patterns):
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            yield from iter_views(pattern.url_patterns)
+        else:
+            yield getattr(pattern.callback, "view_class", None)
+
+
+def warm_app():
+    """
+    Pay the per-process costs that can be shared by forked workers: URL
+    resolvers and their compiled patterns, then the fields of every
+    serializer class used by a view, which loads model metadata and
+    validators. Must not touch the database, so the server can run it
+    before forking.
+    """
+    if _state["app"]:
+        return
+    started = time.perf_counter()
+    resolver = get_resolver()
+    # Populating the root resolver populates the included ones
+    resolver.reverse_dict
+    serializers = 0
+    for view_class in iter_views(resolver.url_patterns):
+        serializer_class = getattr(view_class, "serializer_class", None)
+        if serializer_class is None:
+            continue
+        serializer_class().fields
+        serializers += 1
+    _state["app"] = True
+    logger.info(
+        "App warmed in %.3fs (%d serializers)",
+        time.perf_counter() - started, serializers,
+    )
+
+
+def warm_worker():
+    """
+    Finish warming a worker process: run ``warm_app`` if the server did not
+    already, connect to the primary and its replicas, which fills their
+    pools, and reach the cache. The worker reports ready afterwards.
+    """
+    started = time.perf_counter()
+    warm_app()
+    for alias in [DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS]:
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1")
+        # Requests run in threads of their own: hand the connection back to
+        # the pool, if any, rather than keep it in this one
+        connection.close()
+    cache.get("warmup")
+    elapsed = time.perf_counter() - started
+    metrics.set_gauge("warmup.seconds", round(elapsed, 3))
+    _state["ready"] = True
+    logger.info("Worker warmed in %.3fs", elapsed)
+
+
+def is_ready():
+    return _state["ready"]
+
+
+class LivenessView(APIView):
+    """
+    API view answering as long as the worker can serve requests, with
+    whether it has finished warming up.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        return success_response(
+            message="Alive", data={"ready": is_ready()})
+
+
+class ReadinessView(APIView):
+    """
+    API view answering 503 until the worker has finished warming up, so
+    load balancers only route traffic to warm workers.
+    """
+
+    permission_classes = [permissions.AllowAny]
+    authentication_classes = []
+
+    def get(self, request):
+        if not is_ready():
+            return error_response(
+                message="Warming up",
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            )
+        return success_response(message="Ready")
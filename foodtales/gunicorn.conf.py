@@ -0,0 +1,50 @@
+"""
+Gunicorn configuration for production serving:
+
+    gunicorn
+
+Picked up automatically from the working directory. The app is imported
+and warmed once in the master, then forked into the workers, which each
+open their connections before accepting requests.
+
+Workers serve the ASGI application through uvicorn: Server-Sent Events
+and the async read views run in the event loop instead of holding a
+worker each, and sync views run in a thread per request.
+
+Nothing a request relies on is private to a worker: live result streams
+poll the results version kept in the shared cache (CACHE_URL, refused
+when process-local), whichever worker or queue worker wrote the votes,
+and the vote export streams through an async iterator instead of being
+buffered whole by the ASGI handler.
+"""
+
+import multiprocessing
+import os
+
+wsgi_app = "foodtales.asgi:application"
+worker_class = "uvicorn_worker.UvicornWorker"
+bind = f"0.0.0.0:{os.environ.get('PORT', '8000')}"
+workers = int(
+    os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+# Lets the settings refuse a per-process cache shared by several workers
+os.environ["WEB_CONCURRENCY"] = str(workers)
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", "30"))
+# Recycle workers to bound memory growth; jitter avoids restarting them
+# all at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max_requests // 10
+preload_app = True
+accesslog = "-"
+
+
+def when_ready(server):
+    # Runs in the master after the preload, before the first fork
+    from foodtales.warmup import warm_app
+
+    warm_app()
+
+
+def post_worker_init(worker):
+    from foodtales.warmup import warm_worker
+
+    warm_worker()
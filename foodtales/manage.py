@@ -6,6 +6,10 @@ import sys
 
 def main():
     """Run administrative tasks."""
+    # The test suite needs no cache server, see foodtales/test_settings.py
+    if sys.argv[1:2] == ['test']:
+        os.environ.setdefault(
+            'DJANGO_SETTINGS_MODULE', 'foodtales.test_settings')
     os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'foodtales.settings')
     try:
         from django.core.management import execute_from_command_line
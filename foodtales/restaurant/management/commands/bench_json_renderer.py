@@ -0,0 +1,73 @@
+import time
+import uuid
+from datetime import date
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from rest_framework.renderers import JSONRenderer
+
+from foodtales.renderers import ORJSONRenderer
+from foodtales.utils import success_response
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare render time and payload size of DRF's JSONRenderer with "
+        "ORJSONRenderer on a menu/today/ shaped payload."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--menus", type=int, default=100)
+        parser.add_argument("--items", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=50)
+
+    def handle(self, *args, **options):
+        data = success_response(
+            message="Today's menu fetched successfully",
+            data={
+                "count": options["menus"],
+                "next": None,
+                "previous": None,
+                "results": [
+                    self.build_menu(i, options["items"])
+                    for i in range(options["menus"])
+                ],
+            },
+        ).data
+
+        for renderer in (JSONRenderer(), ORJSONRenderer()):
+            body = renderer.render(data, "application/json")
+            started = time.perf_counter()
+            for _ in range(options["repeat"]):
+                renderer.render(data, "application/json")
+            elapsed = (time.perf_counter() - started) / options["repeat"]
+            self.stdout.write(
+                f"{type(renderer).__name__:15} {elapsed * 1000:8.2f} ms  "
+                f"{len(body):9} bytes"
+            )
+
+    def build_menu(self, index, item_count):
+        # Raw Python types, as a serializer without string coercion would
+        # hand them to the renderer.
+        return {
+            "id": uuid.uuid4(),
+            "date": date.today(),
+            "is_published": True,
+            "restaurant": {
+                "id": index,
+                "email": f"restaurant{index}@example.com",
+                "restaurant_name": f"Restaurant {index}",
+                "restaurant_id": f"R-{index:08X}",
+            },
+            "items": [
+                {
+                    "id": index * item_count + n,
+                    "name": f"Item {n}",
+                    "description": "A dish of the day",
+                    "price": Decimal("12.50"),
+                    "category": "main_course",
+                    "is_available": True,
+                }
+                for n in range(item_count)
+            ],
+        }
@@ -0,0 +1,109 @@
+import time
+import uuid
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Value
+from django.utils import timezone
+
+from restaurant.models import Menu, MenuItem
+from restaurant.serializers.fast_serializers import (
+    ValuesMenuWithRestaurantSerializer,
+    ValuesMenuWithVotesSerializer,
+)
+from restaurant.serializers.restaurant_serializers import (
+    MenuWithRestaurantSerializer,
+    MenuWithVotesSerializer,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Time the DRF menu serializers against their .values() based fast "
+        "path. Fixtures are created in a transaction that is rolled back."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurants", type=int, default=50)
+        parser.add_argument("--items", type=int, default=20)
+        parser.add_argument("--repeat", type=int, default=20)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            menu_ids = self.create_fixtures(
+                options["restaurants"], options["items"])
+            menus = Menu.objects.filter(id__in=menu_ids)
+            cases = [
+                (
+                    "MenuWithRestaurant",
+                    lambda: MenuWithRestaurantSerializer(
+                        menus.select_related("restaurant").prefetch_related(
+                            "items"),
+                        many=True,
+                    ).data,
+                    lambda: ValuesMenuWithRestaurantSerializer(menus).data,
+                ),
+                (
+                    "MenuWithVotes",
+                    lambda: MenuWithVotesSerializer(
+                        menus.select_related("restaurant")
+                        .prefetch_related("items")
+                        .annotate(total_points=Value(3)),
+                        many=True,
+                    ).data,
+                    lambda: ValuesMenuWithVotesSerializer(
+                        menus.annotate(total_points=Value(3))
+                    ).data,
+                ),
+            ]
+            for name, drf, fast in cases:
+                drf_time = self.time(drf, options["repeat"])
+                fast_time = self.time(fast, options["repeat"])
+                self.stdout.write(
+                    f"{name:20} drf {drf_time * 1000:8.2f} ms  "
+                    f"fast {fast_time * 1000:8.2f} ms  "
+                    f"x{drf_time / fast_time:.1f}"
+                )
+            transaction.set_rollback(True)
+
+    def time(self, serialize, repeat):
+        serialize()
+        started = time.perf_counter()
+        for _ in range(repeat):
+            serialize()
+        return (time.perf_counter() - started) / repeat
+
+    def create_fixtures(self, restaurant_count, item_count):
+        tag = uuid.uuid4().hex[:8]
+        restaurants = User.objects.bulk_create(
+            [
+                User(
+                    email=f"bench-{tag}-{i}@example.com",
+                    user_type="restaurant",
+                    restaurant_name=f"Restaurant {i}",
+                    restaurant_id=f"R-{tag}{i}",
+                    password="!",
+                )
+                for i in range(restaurant_count)
+            ]
+        )
+        today = timezone.now().date()
+        menus = Menu.objects.bulk_create(
+            [Menu(restaurant=r, date=today) for r in restaurants])
+        MenuItem.objects.bulk_create(
+            [
+                MenuItem(
+                    menu=menu,
+                    name=f"Item {n}",
+                    description="Benchmark item",
+                    price="9.99",
+                    category="main_course",
+                )
+                for menu in menus
+                for n in range(item_count)
+            ]
+        )
+        return [menu.id for menu in menus]
@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from restaurant.menu_import import (
+    DEFAULT_BATCH_SIZE,
+    FORMATS,
+    guess_format,
+    import_menus,
+)
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        "Import the menus of a restaurant from an NDJSON file (one menu per "
+        "line) or a CSV file (one item per row)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="File to import.")
+        parser.add_argument(
+            "--restaurant",
+            required=True,
+            help="Email of the restaurant user owning the menus.",
+        )
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="File format. Guessed from the extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            restaurant = User.objects.get(
+                email=options["restaurant"], user_type="restaurant")
+        except User.DoesNotExist:
+            raise CommandError(
+                f"No restaurant user with email {options['restaurant']}.")
+        file_format = options["format"] or guess_format(options["path"])
+        if file_format is None:
+            raise CommandError(
+                "Unable to guess the file format, pass --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        try:
+            with open(options["path"], "rb") as stream:
+                report = import_menus(
+                    restaurant, stream, file_format, options["batch_size"])
+        except OSError as e:
+            raise CommandError(str(e))
+
+        for error in report["errors"]:
+            self.stderr.write(f"Line {error['line']}: {error['errors']}")
+        self.stdout.write(
+            f"Imported {report['menus_created']} menus with "
+            f"{report['items_created']} items, "
+            f"{len(report['errors'])} rejected."
+        )
@@ -0,0 +1,174 @@
+import codecs
+import csv
+from itertools import islice
+
+import orjson
+from django.db import IntegrityError, transaction
+
+from restaurant.menu_snapshot import invalidate
+from restaurant.models import Menu, MenuItem
+from restaurant.serializers.menu_items_serializers import \
+    MenuImportSerializer
+
+FORMATS = ("ndjson", "csv")
+DEFAULT_BATCH_SIZE = 100
+
+MENU_COLUMNS = ("date", "is_published")
+ITEM_COLUMNS = ("name", "description", "price", "category", "is_available")
+
+DUPLICATE_DATE = "A menu for this date already exists for your restaurant."
+
+
+def guess_format(filename):
+    """
+    Return the import format matching the extension of ``filename``.
+    """
+    extension = filename.rsplit(".", 1)[-1].lower()
+    if extension in ("ndjson", "jsonl"):
+        return "ndjson"
+    if extension == "csv":
+        return "csv"
+    return None
+
+
+def iter_ndjson(stream):
+    """
+    Yield ``(line_number, menu)`` for every non-blank line of a binary NDJSON
+    stream, ``menu`` being an error message when the line does not parse.
+    """
+    for line_number, line in enumerate(stream, start=1):
+        if not line.strip():
+            continue
+        try:
+            yield line_number, orjson.loads(line)
+        except orjson.JSONDecodeError as e:
+            yield line_number, f"Invalid JSON: {e}"
+
+
+def iter_csv(stream):
+    """
+    Yield ``(line_number, menu)`` from a binary CSV stream holding one item
+    per row. Consecutive rows with the same date form one menu; a row with
+    no item name adds a menu without items.
+    """
+    reader = csv.DictReader(codecs.iterdecode(stream, "utf-8-sig"))
+    menu, line_number = None, None
+    for row in reader:
+        # Empty cells fall back to the serializer defaults
+        row = {key: value for key, value in row.items() if value}
+        if menu is None or row.get("date") != menu.get("date"):
+            if menu is not None:
+                yield line_number, menu
+            line_number = reader.line_num
+            menu = {key: row[key] for key in MENU_COLUMNS if key in row}
+            menu["items"] = []
+        if row.get("name"):
+            menu["items"].append(
+                {key: row[key] for key in ITEM_COLUMNS if key in row})
+    if menu is not None:
+        yield line_number, menu
+
+
+class MenuImporter:
+    """
+    Imports the menus of one restaurant from a stream of
+    ``(line_number, menu)`` pairs.
+
+    Menus are validated one by one and written in batches: per batch, one
+    query checks the dates against existing menus and one transaction
+    inserts the menus and all of their items. Invalid menus are reported
+    by line number and do not stop the import.
+    """
+
+    def __init__(self, restaurant, batch_size=DEFAULT_BATCH_SIZE):
+        self.restaurant = restaurant
+        self.batch_size = batch_size
+        self.seen_dates = set()
+        self.menus_created = 0
+        self.items_created = 0
+        self.errors = []
+
+    def run(self, rows):
+        rows = iter(rows)
+        while batch := list(islice(rows, self.batch_size)):
+            self.import_batch(batch)
+        return self.report()
+
+    def report(self):
+        return {
+            "menus_created": self.menus_created,
+            "items_created": self.items_created,
+            "errors": sorted(self.errors, key=lambda error: error["line"]),
+        }
+
+    def add_error(self, line_number, errors):
+        self.errors.append({"line": line_number, "errors": errors})
+
+    def validate(self, batch):
+        valid = []
+        for line_number, data in batch:
+            if not isinstance(data, dict):
+                self.add_error(
+                    line_number,
+                    data if isinstance(data, str) else "Expected an object.",
+                )
+                continue
+            serializer = MenuImportSerializer(data=data)
+            if not serializer.is_valid():
+                self.add_error(line_number, serializer.errors)
+                continue
+            date = serializer.validated_data["date"]
+            if date in self.seen_dates:
+                self.add_error(line_number, "Duplicate menu date in upload.")
+                continue
+            self.seen_dates.add(date)
+            valid.append((line_number, serializer.validated_data))
+        return valid
+
+    def import_batch(self, batch):
+        valid = self.validate(batch)
+        existing = set(
+            Menu.objects.filter(
+                restaurant=self.restaurant,
+                date__in=[data["date"] for _, data in valid],
+            ).values_list("date", flat=True)
+        )
+        menus, items = [], []
+        for line_number, data in valid:
+            if data["date"] in existing:
+                self.add_error(line_number, DUPLICATE_DATE)
+                continue
+            items_data = data.pop("items", [])
+            menu = Menu(restaurant=self.restaurant, **data)
+            menus.append((line_number, menu))
+            for item_data in items_data:
+                item_data.pop("id", None)
+                items.append(MenuItem(menu=menu, **item_data))
+        if not menus:
+            return
+
+        try:
+            with transaction.atomic():
+                Menu.objects.bulk_create([menu for _, menu in menus])
+                MenuItem.objects.bulk_create(items)
+                invalidate()
+        except IntegrityError:
+            # A menu for one of these dates was created concurrently
+            for line_number, _ in menus:
+                self.add_error(
+                    line_number,
+                    "Conflicts with a menu created during the import.",
+                )
+            return
+        self.menus_created += len(menus)
+        self.items_created += len(items)
+
+
+def import_menus(restaurant, stream, file_format,
+                 batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Import the menus of ``restaurant`` from the binary ``stream`` in
+    ``file_format`` and return the import report.
+    """
+    parse = iter_csv if file_format == "csv" else iter_ndjson
+    return MenuImporter(restaurant, batch_size).run(parse(stream))
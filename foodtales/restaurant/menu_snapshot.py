@@ -0,0 +1,147 @@
+import gzip
+import hashlib
+from collections import namedtuple
+from urllib.parse import urlencode
+
+import orjson
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.http import parse_etags
+
+from foodtales.routers import read_from_primary
+from foodtales.utils import (
+    bump_cache_version,
+    cache_version_bumped_recently,
+    get_cache_version,
+)
+
+VERSION_KEY = "menu-snapshot:version"
+SNAPSHOT_KEY = "menu-snapshot:{date}:v{version}"
+# The digest alone, so conditional requests never load the full snapshot
+DIGEST_KEY = "menu-snapshot:digest:{date}:v{version}"
+BODY_KEY = "menu-snapshot:body:{etag}:{base_url}"
+
+SnapshotKeys = namedtuple("SnapshotKeys", ["snapshot", "digest"])
+
+
+def invalidate():
+    """
+    Drop the menu snapshots once the current transaction commits. Any
+    change to a menu or item invalidates every day, which is cheap given
+    how rarely menus change compared to how often they are read. The
+    version lives in the shared cache, so every worker drops them.
+    """
+    transaction.on_commit(lambda: bump_cache_version(VERSION_KEY))
+
+
+def get_snapshot_keys(date):
+    """
+    Return the cache keys of the snapshot of ``date`` and of its digest,
+    under the current version.
+    """
+    version = get_cache_version(VERSION_KEY)
+    return SnapshotKeys(
+        snapshot=SNAPSHOT_KEY.format(date=date, version=version),
+        digest=DIGEST_KEY.format(date=date, version=version),
+    )
+
+
+def get_snapshot(keys, build):
+    """
+    Return the snapshot stored at ``keys``: the fully serialized menu list
+    built by ``build`` and a digest of its content.
+    """
+    snapshot = cache.get(keys.snapshot)
+    if snapshot is None:
+        with read_from_primary(cache_version_bumped_recently(VERSION_KEY)):
+            snapshot = make_snapshot(build())
+        cache.set_many(
+            {keys.snapshot: snapshot, keys.digest: snapshot["digest"]},
+            timeout=settings.MENU_SNAPSHOT_TIMEOUT,
+        )
+    return snapshot
+
+
+async def aget_snapshot(keys, build):
+    """
+    Async counterpart of ``get_snapshot``, where ``build`` is a coroutine
+    function.
+    """
+    snapshot = await cache.aget(keys.snapshot)
+    if snapshot is None:
+        bumped = await sync_to_async(cache_version_bumped_recently)(
+            VERSION_KEY)
+        with read_from_primary(bumped):
+            snapshot = make_snapshot(await build())
+        await cache.aset_many(
+            {keys.snapshot: snapshot, keys.digest: snapshot["digest"]},
+            timeout=settings.MENU_SNAPSHOT_TIMEOUT,
+        )
+    return snapshot
+
+
+def make_snapshot(results):
+    encoded = orjson.dumps(results, option=orjson.OPT_SORT_KEYS)
+    return {
+        "results": results,
+        "digest": hashlib.sha256(encoded).hexdigest()[:32],
+    }
+
+
+def get_etag(digest, query_params, gzipped=False):
+    """
+    Return a strong ETag for the page of the snapshot with ``digest``
+    selected by ``query_params`` (page number, cursor, page size...).
+
+    The gzipped body is a different representation than the plain one, so
+    it gets its own ETag.
+    """
+    variant = urlencode(sorted(query_params.lists()), doseq=True)
+    variant_digest = hashlib.sha256(variant.encode()).hexdigest()[:12]
+    suffix = "-gzip" if gzipped else ""
+    return f'"{digest}-{variant_digest}{suffix}"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Whether an ``If-None-Match`` header lists ``etag``, using the weak
+    comparison conditional GETs call for.
+    """
+    etags = parse_etags(if_none_match or "")
+    return "*" in etags or etag in [tag.removeprefix("W/") for tag in etags]
+
+
+def accepts_gzip(accept_encoding):
+    """
+    Whether an ``Accept-Encoding`` header allows gzip: listed, or covered by
+    ``*`` when not listed, with a q-value above zero.
+    """
+    qvalues = {}
+    for coding in (accept_encoding or "").split(","):
+        name, *params = coding.split(";")
+        qvalue = 1.0
+        for param in params:
+            key, _, value = param.strip().partition("=")
+            if key.lower() == "q":
+                try:
+                    qvalue = float(value)
+                except ValueError:
+                    qvalue = 0.0
+        qvalues[name.strip().lower()] = qvalue
+    return qvalues.get("gzip", qvalues.get("*", 0.0)) > 0
+
+
+def get_gzipped_body(etag, base_url, render):
+    """
+    Return the gzipped response body of the page identified by ``etag``,
+    rendering and compressing it only once per snapshot. ``base_url`` is the
+    absolute URL of the view, which pagination links are built from.
+    """
+    key = BODY_KEY.format(etag=etag.strip('"'), base_url=base_url)
+    body = cache.get(key)
+    if body is None:
+        body = gzip.compress(render())
+        cache.set(key, body, timeout=settings.MENU_SNAPSHOT_TIMEOUT)
+    return body
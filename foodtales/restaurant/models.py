@@ -20,7 +20,10 @@ class Menu(models.Model):
         ordering = ["-date"]
 
     def __str__(self):
-        return f"{self.restaurant.restaurant_name} - Menu for {self.date}"
+        # Never fetches the restaurant: menus are logged from hot paths
+        if Menu.restaurant.is_cached(self):
+            return f"{self.restaurant.restaurant_name} - Menu for {self.date}"
+        return f"Menu {self.pk} for {self.date}"
 
 
 class MenuItem(models.Model):
@@ -40,4 +43,7 @@ class MenuItem(models.Model):
     is_available = models.BooleanField(default=True)
 
     def __str__(self):
-        return f"{self.name} - {self.menu.restaurant.restaurant_name}"
+        if MenuItem.menu.is_cached(self) and Menu.restaurant.is_cached(
+                self.menu):
+            return f"{self.name} - {self.menu.restaurant.restaurant_name}"
+        return f"{self.name} - menu {self.menu_id}"
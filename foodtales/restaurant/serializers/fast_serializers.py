@@ -0,0 +1,106 @@
+from decimal import Decimal
+
+from restaurant.models import MenuItem
+
+PRICE_QUANTUM = Decimal(1).scaleb(
+    -MenuItem._meta.get_field("price").decimal_places)
+
+
+class ValuesMenuSerializer:
+    """
+    Read-only counterpart of the menu ``ModelSerializer`` classes for hot
+    GET endpoints.
+
+    Builds plain dicts from two ``.values()`` queries (menus with their
+    restaurant, then every item of those menus) instead of going through
+    DRF field objects per instance. Output matches the DRF serializer it
+    mirrors, including Decimal and UUID formatting.
+    """
+
+    restaurant_fields = ["id", "email", "restaurant_name", "restaurant_id"]
+    annotated_fields = []
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+
+    @property
+    def data(self):
+        rows = list(self.get_rows())
+        items = self.group_items(
+            self.get_item_rows([row["id"] for row in rows]))
+        return [self.to_representation(row, items) for row in rows]
+
+    async def adata(self):
+        """
+        Same as ``data``, running the two queries with the async ORM.
+        """
+        rows = [row async for row in self.get_rows()]
+        items = self.group_items(
+            [
+                row
+                async for row in self.get_item_rows(
+                    [row["id"] for row in rows])
+            ]
+        )
+        return [self.to_representation(row, items) for row in rows]
+
+    def get_rows(self):
+        return self.queryset.values(
+            "id",
+            "date",
+            "is_published",
+            *[f"restaurant__{field}" for field in self.restaurant_fields],
+            *self.annotated_fields,
+        )
+
+    def get_item_rows(self, menu_ids):
+        return (
+            MenuItem.objects.filter(menu_id__in=menu_ids)
+            .order_by("id")
+            .values(
+                "menu_id", "id", "name", "description", "price", "category",
+                "is_available",
+            )
+        )
+
+    def group_items(self, rows):
+        items = {}
+        for row in rows:
+            items.setdefault(row.pop("menu_id"), []).append(
+                dict(row, price=format_price(row["price"]))
+            )
+        return items
+
+    def to_representation(self, row, items):
+        menu = {
+            "id": str(row["id"]),
+            "date": row["date"].isoformat(),
+            "is_published": row["is_published"],
+            "restaurant": {
+                field: row[f"restaurant__{field}"]
+                for field in self.restaurant_fields
+            },
+        }
+        for field in self.annotated_fields:
+            menu[field] = row[field]
+        menu["items"] = items.get(row["id"], [])
+        return menu
+
+
+class ValuesMenuWithRestaurantSerializer(ValuesMenuSerializer):
+    """
+    Read-only fast path for ``MenuWithRestaurantSerializer``.
+    """
+
+
+class ValuesMenuWithVotesSerializer(ValuesMenuSerializer):
+    """
+    Read-only fast path for ``MenuWithVotesSerializer``; the queryset must
+    be annotated with ``total_points``.
+    """
+
+    annotated_fields = ["total_points"]
+
+
+def format_price(value):
+    return format(Decimal(value).quantize(PRICE_QUANTUM), "f")
@@ -1,10 +1,15 @@
+from django.db import transaction
 from django.utils import timezone
 from rest_framework import serializers
 
+from restaurant.menu_snapshot import invalidate
 from restaurant.models import Menu, MenuItem
 
 
 class MenuItemSerializer(serializers.ModelSerializer):
+    # Writable so menu updates can tell existing items from new ones
+    id = serializers.IntegerField(required=False)
+
     class Meta:
         model = MenuItem
         fields = ["id", "name", "description", "price", "category",
@@ -20,6 +25,7 @@ class MenuSerializer(serializers.ModelSerializer):
         fields = ["id", "date", "is_published", "items"]
         read_only_fields = ["restaurant"]
 
+    @transaction.atomic
     def create(self, validated_data):
         items_data = validated_data.pop("items", [])
         restaurant = self.context["request"].user
@@ -41,33 +47,46 @@ class MenuSerializer(serializers.ModelSerializer):
         menu = Menu.objects.create(restaurant=restaurant, **validated_data)
 
         for item_data in items_data:
-            MenuItem.objects.create(menu=menu, **item_data)
+            item_data.pop("id", None)
+        MenuItem.objects.bulk_create(
+            [MenuItem(menu=menu, **item_data) for item_data in items_data]
+        )
+        invalidate()
         return menu
 
+    @transaction.atomic
     def update(self, instance, validated_data):
         items_data = validated_data.pop("items", None)
         menu = super().update(instance, validated_data)
 
         if items_data is not None:
-            # Remove existing items not in the update data
-            menu.items.exclude(
-                id__in=[item.get("id")
-                        for item in items_data if item.get("id")]
-            ).delete()
-
+            existing = {item.id: item for item in menu.items.all()}
+            to_update, to_create = [], []
             for item_data in items_data:
-                item_id = item_data.get("id")
-                if item_id:
-                    MenuItem.objects.filter(id=item_id, menu=menu).update(
-                        **item_data)
-                else:
-                    MenuItem.objects.create(menu=menu, **item_data)
+                item = existing.get(item_data.pop("id", None))
+                if item is None:
+                    to_create.append(MenuItem(menu=menu, **item_data))
+                    continue
+                for field, value in item_data.items():
+                    setattr(item, field, value)
+                to_update.append(item)
+
+            # Remove existing items not in the update data
+            menu.items.exclude(id__in=[item.id for item in to_update]).delete()
+            MenuItem.objects.bulk_update(
+                to_update,
+                ["name", "description", "price", "category", "is_available"],
+            )
+            MenuItem.objects.bulk_create(to_create)
+            invalidate()
 
         return menu
 
-    def to_representation(self, instance):
-        representation = super().to_representation(instance)
-        representation["items"] = MenuItemSerializer(
-            instance.items.all(), many=True
-        ).data
-        return representation
+
+class MenuImportSerializer(MenuSerializer):
+    """
+    Validates one menu of a bulk import. Only used for validation: the
+    importer writes validated menus in batches itself.
+    """
+
+    date = serializers.DateField()
@@ -0,0 +1,11 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from restaurant.menu_snapshot import invalidate
+from restaurant.models import Menu, MenuItem
+
+
+@receiver([post_save, post_delete], sender=Menu)
+@receiver([post_save, post_delete], sender=MenuItem)
+def invalidate_menu_snapshot(sender, **kwargs):
+    invalidate()
@@ -1,10 +1,39 @@
+import gzip
+import io
+import json
+import uuid
+from decimal import Decimal
+
+from asgiref.sync import async_to_sync
+from django.core.cache import cache, caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.db import connection
+from django.db.models import Value
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from django.contrib.auth import get_user_model
 from django.utils import timezone
 from rest_framework import status
-from rest_framework.test import APIClient
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+
+from foodtales.renderers import ORJSONParser, ORJSONRenderer
+from foodtales.utils import KeysetPagination
+from restaurant.menu_import import import_menus
+from restaurant.menu_snapshot import VERSION_KEY, get_snapshot_keys
 from restaurant.models import Menu, MenuItem
+from restaurant.serializers.menu_items_serializers import MenuSerializer
+from restaurant.serializers.fast_serializers import (
+    ValuesMenuWithRestaurantSerializer,
+    ValuesMenuWithVotesSerializer,
+)
+from restaurant.serializers.restaurant_serializers import (
+    MenuWithRestaurantSerializer,
+    MenuWithVotesSerializer,
+)
+from user.tokens import ClaimsRefreshToken
 
 User = get_user_model()
 
@@ -82,9 +111,156 @@ class MenuCreateViewTestCase(TestCase):
         self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
         self.assertEqual(Menu.objects.count(), 0)
 
+    def build_items(self, count, start=0):
+        return [
+            {
+                "name": f"Item {n}",
+                "description": "A test item",
+                "price": "9.99",
+                "category": "main_course",
+            }
+            for n in range(start, start + count)
+        ]
+
+    def count_create_queries(self, date, item_count):
+        data = {"date": date, "items": self.build_items(item_count)}
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(self.url, data, format="json")
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        return len(queries)
+
+    def test_create_menu_query_count_is_constant(self):
+        self.assertEqual(
+            self.count_create_queries("2023-05-01", 2),
+            self.count_create_queries("2023-05-02", 150),
+        )
+        self.assertEqual(MenuItem.objects.count(), 152)
+
+    def test_update_menu_items_by_diff(self):
+        def update(menu, keep, change, new):
+            items = list(menu.items.order_by("id"))
+            data = [
+                {
+                    "id": item.id,
+                    "name": f"Renamed {item.id}" if i < change else item.name,
+                    "price": item.price,
+                    "category": item.category,
+                }
+                for i, item in enumerate(items[:keep])
+            ] + self.build_items(new, start=1000)
+            serializer = MenuSerializer(
+                menu, data={"items": data}, partial=True)
+            serializer.is_valid(raise_exception=True)
+            with CaptureQueriesContext(connection) as queries:
+                serializer.save()
+            return len(queries)
+
+        small = Menu.objects.create(restaurant=self.user, date="2023-05-01")
+        large = Menu.objects.create(restaurant=self.user, date="2023-05-02")
+        for menu, count in [(small, 4), (large, 150)]:
+            MenuItem.objects.bulk_create(
+                MenuItem(menu=menu, **item)
+                for item in self.build_items(count)
+            )
+
+        self.assertEqual(
+            update(small, keep=3, change=2, new=1),
+            update(large, keep=100, change=60, new=40),
+        )
+        self.assertEqual(large.items.count(), 140)
+        self.assertEqual(
+            large.items.filter(name__startswith="Renamed").count(), 60)
+        self.assertEqual(
+            large.items.filter(name__startswith="Item 10").count(), 40)
+
+
+class MenuImportViewTestCase(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.user = User.objects.create_user(
+            email="testrestaurant@example.com",
+            password="testpass123",
+            user_type="restaurant",
+            restaurant_name="Test Restaurant",
+        )
+        self.client.force_authenticate(user=self.user)
+        self.url = reverse("menu-import")
+        Menu.objects.create(restaurant=self.user, date="2023-05-03")
+
+    def upload(self, name, content):
+        return self.client.post(
+            self.url,
+            {"file": SimpleUploadedFile(name, content.encode())},
+            format="multipart",
+        )
+
+    def test_import_ndjson_reports_rejected_lines(self):
+        item = {"name": "Soup", "price": "4.50", "category": "appetizer"}
+        lines = [
+            {"date": "2023-05-01", "items": [item, dict(item, name="Tea")]},
+            {"date": "2023-05-02", "is_published": False},
+            {"date": "2023-05-03", "items": [item]},
+            {"date": "2023-05-01"},
+            {"date": "not-a-date"},
+        ]
+        content = "\n".join(json.dumps(line) for line in lines)
+        response = self.upload("menus.ndjson", content + "\n{oops\n")
+
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        report = response.data["data"]
+        self.assertEqual(report["menus_created"], 2)
+        self.assertEqual(report["items_created"], 2)
+        self.assertEqual(
+            [error["line"] for error in report["errors"]], [3, 4, 5, 6])
+        self.assertEqual(
+            Menu.objects.get(date="2023-05-01").items.count(), 2)
+        self.assertFalse(Menu.objects.get(date="2023-05-02").is_published)
+
+    def test_import_csv_groups_items_by_date(self):
+        content = (
+            "date,name,price,category\n"
+            "2023-05-01,Soup,4.50,appetizer\n"
+            "2023-05-01,Cake,3.00,dessert\n"
+            "2023-05-02,Tea,1.00,beverage\n"
+            "2023-05-04,Pie,abc,dessert\n"
+        )
+        response = self.upload("menus.csv", content)
+
+        report = response.data["data"]
+        self.assertEqual(report["menus_created"], 2)
+        self.assertEqual(report["items_created"], 3)
+        self.assertEqual([error["line"] for error in report["errors"]], [5])
+        self.assertFalse(Menu.objects.filter(date="2023-05-04").exists())
+
+    def test_import_query_count_is_per_batch(self):
+        def count_queries(days, first_day):
+            content = "\n".join(
+                json.dumps({
+                    "date": f"2024-{first_day + day // 28:02d}-"
+                            f"{day % 28 + 1:02d}",
+                    "items": [
+                        {"name": "Soup", "price": "4.50",
+                         "category": "appetizer"}
+                    ],
+                })
+                for day in range(days)
+            )
+            with CaptureQueriesContext(connection) as queries:
+                report = import_menus(
+                    self.user, io.BytesIO(content.encode()), "ndjson")
+            self.assertEqual(report["menus_created"], days)
+            return len(queries)
+
+        self.assertEqual(count_queries(7, 1), count_queries(90, 4))
+
+    def test_import_unknown_format(self):
+        response = self.upload("menus.txt", "")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
 
 class AllRestaurantsCurrentDayMenuViewTestCase(TestCase):
     def setUp(self):
+        cache.clear()
         self.client = APIClient()
         self.url = reverse("all-restaurants-current-day-menu")
         self.restaurant1 = User.objects.create_user(
@@ -131,3 +307,307 @@ class AllRestaurantsCurrentDayMenuViewTestCase(TestCase):
     def test_list_todays_menus_unauthorized(self):
         response = self.client.get(self.url)
         self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_list_todays_menus_not_modified(self):
+        Menu.objects.create(
+            restaurant=self.restaurant1, date=self.today, is_published=True
+        )
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.get(self.url)
+        etag = response["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # Answered from the digest, without the snapshot
+        cache.delete(get_snapshot_keys(self.today).snapshot)
+        with self.assertNumQueries(0):
+            response = self.client.get(
+                self.url, HTTP_IF_NONE_MATCH=f'"other", W/{etag}')
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+
+        # A new menu invalidates the snapshot once it commits
+        with self.captureOnCommitCallbacks(execute=True):
+            Menu.objects.create(
+                restaurant=self.restaurant2, date=self.today,
+                is_published=True
+            )
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data["data"]["results"]), 2)
+
+    def test_menus_changed_through_another_process_are_not_cached(self):
+        Menu.objects.create(
+            restaurant=self.restaurant1, date=self.today, is_published=True
+        )
+        self.client.force_authenticate(user=self.employee)
+        etag = self.client.get(self.url)["ETag"]
+
+        # Saved by another web worker, which bumps the version through its
+        # own cache client
+        Menu.objects.create(
+            restaurant=self.restaurant2, date=self.today, is_published=True
+        )
+        caches.create_connection("default").incr(VERSION_KEY)
+
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data["data"]["results"]), 2)
+
+    def test_async_variant_matches_sync_view(self):
+        menu = Menu.objects.create(
+            restaurant=self.restaurant1, date=self.today, is_published=True
+        )
+        MenuItem.objects.create(
+            menu=menu, name="Soup", price="4.50", category="appetizer")
+        Menu.objects.create(
+            restaurant=self.restaurant2, date=self.today, is_published=True
+        )
+        token = ClaimsRefreshToken.for_user(self.employee).access_token
+        headers = {"Authorization": f"Bearer {token}"}
+        async_url = reverse("all-restaurants-current-day-menu-async")
+        expected = self.client.get(
+            self.url, {"page_size": 1}, headers=headers)
+        cache.clear()
+
+        response = async_to_sync(self.async_client.get)(
+            async_url, {"page_size": 1}, headers=headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response["ETag"], expected["ETag"])
+        data, expected_data = response.json()["data"], expected.json()["data"]
+        self.assertEqual(data["results"], expected_data["results"])
+        self.assertEqual(data["count"], 2)
+        self.assertIn("/menu/today/async/?page=2", data["next"])
+
+        with self.assertNumQueries(0):
+            response = async_to_sync(self.async_client.get)(
+                async_url, {"page_size": 1},
+                headers={**headers, "If-None-Match": expected["ETag"]},
+            )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_async_variant_checks_permissions(self):
+        url = reverse("all-restaurants-current-day-menu-async")
+        response = async_to_sync(self.async_client.get)(url)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        token = ClaimsRefreshToken.for_user(self.restaurant1).access_token
+        response = async_to_sync(self.async_client.get)(
+            url, headers={"Authorization": f"Bearer {token}"})
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+        self.assertFalse(response.json()["success"])
+
+    def test_list_todays_menus_gzipped(self):
+        Menu.objects.create(
+            restaurant=self.restaurant1, date=self.today, is_published=True
+        )
+        self.client.force_authenticate(user=self.employee)
+        plain = self.client.get(self.url)
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING="br, gzip;q=0.5")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["ETag"], plain["ETag"][:-1] + '-gzip"')
+        self.assertIn("Accept-Encoding", plain["Vary"])
+        self.assertIn("Accept-Encoding", response["Vary"])
+        body = json.loads(gzip.decompress(response.content))
+        self.assertEqual(
+            body["data"]["results"], json.loads(plain.content)["data"][
+                "results"]
+        )
+
+        # The plain ETag does not validate a gzipped copy, nor the reverse
+        response = self.client.get(
+            self.url, HTTP_ACCEPT_ENCODING="gzip",
+            HTTP_IF_NONE_MATCH=plain["ETag"])
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        for header in ("gzip;q=0", "*;q=0", "identity", "*, gzip;q=0.0"):
+            response = self.client.get(self.url, HTTP_ACCEPT_ENCODING=header)
+            self.assertFalse(response.has_header("Content-Encoding"), header)
+            self.assertEqual(response["ETag"], plain["ETag"])
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING="*")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+
+    def test_list_todays_menus_query_count_is_constant(self):
+        def count_queries(restaurant_count):
+            cache.clear()
+            for i in range(restaurant_count):
+                restaurant = User.objects.create_user(
+                    email=f"extra{restaurant_count}-{i}@example.com",
+                    password="testpass123",
+                    user_type="restaurant",
+                )
+                menu = Menu.objects.create(
+                    restaurant=restaurant, date=self.today)
+                MenuItem.objects.bulk_create(
+                    MenuItem(menu=menu, name=f"Item {n}", price="1.00",
+                             category="main_course")
+                    for n in range(3)
+                )
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(self.url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            return len(queries)
+
+        self.client.force_authenticate(user=self.employee)
+        self.assertEqual(count_queries(2), count_queries(5))
+
+    def test_list_todays_menus_cursor_pagination(self):
+        for i in range(3):
+            restaurant = User.objects.create_user(
+                email=f"cursor{i}@example.com",
+                password="testpass123",
+                user_type="restaurant",
+            )
+            Menu.objects.create(restaurant=restaurant, date=self.today)
+        expected = [
+            str(menu_id) for menu_id in Menu.objects.order_by(
+                "-date", "-id").values_list("id", flat=True)
+        ]
+        self.client.force_authenticate(user=self.employee)
+
+        response = self.client.get(
+            self.url, {"pagination": "cursor", "page_size": 2})
+        first = response.data["data"]
+        self.assertIsNone(first["count"])
+        self.assertIsNone(first["previous"])
+        self.assertEqual([m["id"] for m in first["results"]], expected[:2])
+
+        second = self.client.get(first["next"]).data["data"]
+        self.assertEqual([m["id"] for m in second["results"]], expected[2:])
+        self.assertIsNone(second["next"])
+
+        back = self.client.get(second["previous"]).data["data"]
+        self.assertEqual([m["id"] for m in back["results"]], expected[:2])
+
+    def test_list_todays_menus_invalid_cursor(self):
+        Menu.objects.create(restaurant=self.restaurant1, date=self.today)
+        self.client.force_authenticate(user=self.employee)
+        response = self.client.get(self.url, {"cursor": "garbage"})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(response.data["message"], "Invalid cursor")
+
+        # Also when the page is rendered for a gzipped body
+        response = self.client.get(
+            self.url, {"cursor": "garbage"}, HTTP_ACCEPT_ENCODING="gzip")
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+        token = ClaimsRefreshToken.for_user(self.employee).access_token
+        response = async_to_sync(self.async_client.get)(
+            reverse("all-restaurants-current-day-menu-async"),
+            {"cursor": "garbage"},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class KeysetPaginationTestCase(TestCase):
+    def test_paginate_queryset(self):
+        restaurant = User.objects.create_user(
+            email="restaurant@example.com",
+            password="testpass123",
+            user_type="restaurant",
+        )
+        today = timezone.now().date()
+        for days in range(5):
+            Menu.objects.create(
+                restaurant=restaurant,
+                date=today - timezone.timedelta(days=days),
+            )
+        expected = list(
+            Menu.objects.order_by("-date", "-id").values_list(
+                "id", flat=True)
+        )
+
+        factory = APIRequestFactory()
+        pages, url = [], "/menus/?page_size=2"
+        while url:
+            paginator = KeysetPagination()
+            page = paginator.paginate_queryset(
+                Menu.objects.all(), Request(factory.get(url)))
+            pages.append([menu.id for menu in page])
+            url = paginator.get_next_link()
+        self.assertEqual(pages, [expected[:2], expected[2:4], expected[4:]])
+
+
+class ValuesMenuSerializerTestCase(TestCase):
+    def setUp(self):
+        restaurant = User.objects.create_user(
+            email="restaurant@example.com",
+            password="testpass123",
+            user_type="restaurant",
+            restaurant_name="Restaurant",
+        )
+        empty = User.objects.create_user(
+            email="empty@example.com",
+            password="testpass123",
+            user_type="restaurant",
+        )
+        today = timezone.now().date()
+        menu = Menu.objects.create(restaurant=restaurant, date=today)
+        Menu.objects.create(restaurant=empty, date=today, is_published=False)
+        for name, price in [("Soup", "4.5"), ("Steak", "21"),
+                            ("Tea", "1.99")]:
+            MenuItem.objects.create(
+                menu=menu, name=name, price=price, category="main_course")
+
+    def assertSameOutput(self, drf_serializer, fast_serializer, queryset):
+        expected = json.loads(
+            json.dumps(drf_serializer(queryset, many=True).data))
+        actual = fast_serializer(queryset).data
+        self.assertEqual(actual, expected)
+        self.assertEqual(
+            [list(menu) for menu in actual],
+            [list(menu) for menu in expected],
+        )
+
+    def test_menu_with_restaurant_parity(self):
+        self.assertSameOutput(
+            MenuWithRestaurantSerializer,
+            ValuesMenuWithRestaurantSerializer,
+            Menu.objects.order_by("id"),
+        )
+
+    def test_menu_with_votes_parity(self):
+        self.assertSameOutput(
+            MenuWithVotesSerializer,
+            ValuesMenuWithVotesSerializer,
+            Menu.objects.annotate(total_points=Value(6)).order_by("id"),
+        )
+
+
+class ORJSONRendererTestCase(TestCase):
+    def test_matches_default_renderer(self):
+        data = {
+            "id": uuid.uuid4(),
+            "date": timezone.now().date(),
+            "created_at": timezone.now(),
+            "price": Decimal("9.99"),
+            "items": [{"name": "Crème brûlée", "price": "4.50"}],
+        }
+        rendered = ORJSONRenderer().render(data)
+        expected = json.loads(JSONRenderer().render(data))
+        # orjson keeps microseconds DRF truncates to milliseconds
+        expected.pop("created_at")
+        actual = json.loads(rendered)
+        actual.pop("created_at")
+        self.assertEqual(actual, expected)
+        self.assertEqual(
+            ORJSONParser().parse(io.BytesIO(rendered))["price"], 9.99)
+
+    def test_invalid_json_is_rejected(self):
+        user = User.objects.create_user(
+            email="restaurant@example.com",
+            password="testpass123",
+            user_type="restaurant",
+        )
+        client = APIClient()
+        client.force_authenticate(user=user)
+        response = client.post(
+            reverse("menu-create"), "{not json",
+            content_type="application/json")
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
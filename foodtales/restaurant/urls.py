@@ -1,8 +1,9 @@
 from django.urls import path
 
-from restaurant.views.menu_views import MenuCreateView
+from restaurant.views.menu_views import MenuCreateView, MenuImportView
 from restaurant.views.menu_views import (
     AllRestaurantsCurrentDayMenuView,
+    AsyncCurrentDayMenuView,
 )
 from restaurant.views.signup_views import RestaurantSignUpView
 
@@ -10,9 +11,15 @@ from restaurant.views.signup_views import RestaurantSignUpView
 urlpatterns = [
     path("signup/", RestaurantSignUpView.as_view(), name="restaurant-signup"),
     path("menu/", MenuCreateView.as_view(), name="menu-create"),
+    path("menu/import/", MenuImportView.as_view(), name="menu-import"),
     path(
         "menu/today/",
         AllRestaurantsCurrentDayMenuView.as_view(),
         name="all-restaurants-current-day-menu",
     ),
+    path(
+        "menu/today/async/",
+        AsyncCurrentDayMenuView.as_view(),
+        name="all-restaurants-current-day-menu-async",
+    ),
 ]
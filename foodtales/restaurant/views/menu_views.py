@@ -1,15 +1,29 @@
 import logging
 
+from asgiref.sync import sync_to_async
 from rest_framework import generics, permissions, status, serializers
+from rest_framework.exceptions import NotFound
+from rest_framework.parsers import MultiPartParser
+from rest_framework.response import Response
+from django.core.cache import cache
+from django.http import HttpResponse
 from django.utils import timezone
 from django.core.exceptions import ObjectDoesNotExist
 
 from restaurant.serializers.menu_items_serializers import MenuSerializer
+from ..menu_import import FORMATS, guess_format, import_menus
+from ..menu_snapshot import accepts_gzip, aget_snapshot, etag_matches, \
+    get_etag, get_gzipped_body, get_snapshot, get_snapshot_keys
 from ..models import Menu
+from ..serializers.fast_serializers import \
+    ValuesMenuWithRestaurantSerializer
 from ..serializers.restaurant_serializers import MenuWithRestaurantSerializer
+from user.authentication import ClaimsJWTAuthentication
+from foodtales.async_views import AsyncAPIView
 from user.permissions import IsEmployee, IsRestaurantUser
-from foodtales.utils import CustomPageNumberPagination, success_response, \
-    error_response
+from foodtales.renderers import ORJSONRenderer
+from foodtales.utils import CustomPageNumberPagination, \
+    SelectablePaginationMixin, success_response, error_response
 
 logger = logging.getLogger("foodtales")
 
@@ -25,19 +39,22 @@ class MenuCreateView(generics.CreateAPIView):
     def create(self, request, *args, **kwargs):
         try:
             response = super().create(request, *args, **kwargs)
-            logger.info(f"Menu created successfully: {response.data}")
+            logger.info(
+                "Menu created successfully: %s (%d items)",
+                response.data["id"], len(response.data["items"]),
+            )
             return success_response(
                 message="Menu Created Successfully",
                 data=response.data,
                 status_code=status.HTTP_201_CREATED,
             )
         except serializers.ValidationError as e:
-            logger.error(f"Menu creation failed: {e.detail}")
+            logger.error("Menu creation failed: %s", e.detail)
             return error_response(message="Menu creation failed",
                                   errors=e.detail)
 
         except Exception as e:
-            logger.error(f"Menu creation failed: {str(e)}")
+            logger.error("Menu creation failed: %s", e)
             return error_response(
                 message="Menu Creation Failed",
                 errors=str(e),
@@ -48,6 +65,51 @@ class MenuCreateView(generics.CreateAPIView):
         serializer.save(restaurant=self.request.user)
 
 
+class MenuImportView(generics.GenericAPIView):
+    """
+    API view to create many menus of the restaurant at once from an uploaded
+    NDJSON (one menu per line) or CSV (one item per row) file.
+
+    Invalid menus are reported by line number; the others are imported.
+    """
+
+    permission_classes = [permissions.IsAuthenticated, IsRestaurantUser]
+    parser_classes = [MultiPartParser]
+
+    def post(self, request, *args, **kwargs):
+        upload = request.FILES.get("file")
+        if upload is None:
+            return error_response(
+                message="Menu import failed",
+                errors={"file": ["No file was submitted."]},
+            )
+        file_format = request.data.get("file_format") or guess_format(
+            upload.name)
+        if file_format not in FORMATS:
+            return error_response(
+                message="Menu import failed",
+                errors={
+                    "file_format": [
+                        f"Must be one of: {', '.join(FORMATS)}."]
+                },
+            )
+
+        report = import_menus(request.user, upload, file_format)
+        logger.info(
+            "Menu import by %s: %d menus created, %d rejected",
+            request.user.pk, report["menus_created"], len(report["errors"]),
+        )
+        return success_response(
+            message="Menu import finished",
+            data=report,
+            status_code=(
+                status.HTTP_201_CREATED
+                if report["menus_created"]
+                else status.HTTP_200_OK
+            ),
+        )
+
+
 # Not Used
 class MenuRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
     queryset = Menu.objects.all()
@@ -87,54 +149,181 @@ class MenuRetrieveUpdateDestroyView(generics.RetrieveUpdateDestroyAPIView):
             )
 
 
-class AllRestaurantsCurrentDayMenuView(generics.ListAPIView):
+def get_published_menus(day):
+    # Serialized from .values() rows: one query for menus with their
+    # restaurant, one for all of their items.
+    return Menu.objects.filter(date=day, is_published=True).order_by(
+        # Stable (date, id) order shared with KeysetPagination
+        "-date", "-id"
+    )
+
+
+class AllRestaurantsCurrentDayMenuView(SelectablePaginationMixin,
+                                       generics.ListAPIView):
     """
     API view to fetch the current day's menu for all restaurants.
+    Paginated by page number, or by cursor with ``?pagination=cursor``.
     """
 
     serializer_class = MenuWithRestaurantSerializer
+    authentication_classes = [ClaimsJWTAuthentication]
     permission_classes = [permissions.AllowAny, IsEmployee]
     pagination_class = CustomPageNumberPagination
 
     def get_queryset(self):
-        today = timezone.now().date()
-        return Menu.objects.filter(
-            date=today, is_published=True).select_related(
-            "restaurant"
-        )
+        return get_published_menus(timezone.now().date())
+
+    def build_snapshot(self):
+        return ValuesMenuWithRestaurantSerializer(self.get_queryset()).data
 
     def list(self, request, *args, **kwargs):
         try:
-            queryset = self.get_queryset()
-            if not queryset.exists():
+            keys = get_snapshot_keys(timezone.now().date())
+            gzipped = accepts_gzip(request.headers.get("Accept-Encoding"))
+            # A conditional request is answered from the digest alone
+            snapshot = None
+            digest = cache.get(keys.digest)
+            if digest is None:
+                snapshot = get_snapshot(keys, self.build_snapshot)
+                digest = snapshot["digest"]
+            etag = get_etag(digest, request.query_params, gzipped)
+            if etag_matches(request.headers.get("If-None-Match"), etag):
+                return Response(
+                    status=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": etag, "Vary": "Accept-Encoding"},
+                )
+            if snapshot is None:
+                snapshot = get_snapshot(keys, self.build_snapshot)
+            if not snapshot["results"]:
                 return success_response(
                     message="No menus available for today.")
 
-            page = self.paginate_queryset(queryset)
-            if page is not None:
-                serializer = self.get_serializer(page, many=True)
-                result = self.get_paginated_response(serializer.data)
-                data = {
-                    "count": result.data["count"],
-                    "next": result.data["next"],
-                    "previous": result.data["previous"],
-                    "results": result.data["results"],
-                }
-            else:
-                serializer = self.get_serializer(queryset, many=True)
-                data = serializer.data
+            if gzipped:
+                body = get_gzipped_body(
+                    etag,
+                    request.build_absolute_uri(request.path),
+                    lambda: ORJSONRenderer().render(
+                        self.get_page_response(snapshot).data),
+                )
+                return HttpResponse(
+                    body,
+                    content_type="application/json",
+                    headers={
+                        "Content-Encoding": "gzip",
+                        "ETag": etag,
+                        "Vary": "Accept-Encoding",
+                    },
+                )
 
-            logger.info(
-                f"Today's menu fetched successfully. Total menus: \
-                {len(data['results'] if page else data)}"
-            )
-            return success_response(
-                message="Today's menu fetched successfully", data=data
-            )
+            response = self.get_page_response(snapshot)
+            response["ETag"] = etag
+            response["Vary"] = "Accept-Encoding"
+            return response
+        except NotFound as e:
+            return error_response(
+                message=str(e.detail), status_code=status.HTTP_404_NOT_FOUND)
         except Exception as e:
-            logger.error(f"Unable to fetch today's menu: {str(e)}")
+            logger.error("Unable to fetch today's menu: %s", e)
             return error_response(
                 message="Unable to fetch today's menu",
                 errors=str(e),
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             )
+
+    def get_page_response(self, snapshot):
+        page = self.paginate_queryset(snapshot["results"])
+        if page is not None:
+            result = self.get_paginated_response(page)
+            data = {
+                "count": result.data["count"],
+                "next": result.data["next"],
+                "previous": result.data["previous"],
+                "results": result.data["results"],
+            }
+        else:
+            data = snapshot["results"]
+
+        logger.info(
+            "Today's menu fetched successfully. Total menus: %d",
+            len(data["results"] if page else data),
+        )
+        return success_response(
+            message="Today's menu fetched successfully", data=data
+        )
+
+
+class AsyncCurrentDayMenuView(SelectablePaginationMixin, AsyncAPIView):
+    """
+    Async variant of ``AllRestaurantsCurrentDayMenuView`` for ASGI
+    deployments, with the same snapshot cache, ETags, gzip bodies and
+    pagination. Misses are built with the async ORM.
+    """
+
+    permission_classes = [permissions.AllowAny, IsEmployee]
+    pagination_class = CustomPageNumberPagination
+
+    async def get(self, request):
+        try:
+            today = timezone.now().date()
+            keys = await sync_to_async(get_snapshot_keys)(today)
+            build = ValuesMenuWithRestaurantSerializer(
+                get_published_menus(today)).adata
+            gzipped = accepts_gzip(request.headers.get("Accept-Encoding"))
+            snapshot = None
+            digest = await cache.aget(keys.digest)
+            if digest is None:
+                snapshot = await aget_snapshot(keys, build)
+                digest = snapshot["digest"]
+            etag = get_etag(digest, request.query_params, gzipped)
+            if etag_matches(request.headers.get("If-None-Match"), etag):
+                return HttpResponse(
+                    status=status.HTTP_304_NOT_MODIFIED,
+                    headers={"ETag": etag, "Vary": "Accept-Encoding"},
+                )
+            if snapshot is None:
+                snapshot = await aget_snapshot(keys, build)
+            if not snapshot["results"]:
+                return self.success(message="No menus available for today.")
+
+            page = self.get_page(snapshot)
+            if gzipped:
+                body = await sync_to_async(get_gzipped_body)(
+                    etag,
+                    request.build_absolute_uri(request.path),
+                    lambda: self.renderer.render(self.get_envelope(page)),
+                )
+                return HttpResponse(
+                    body,
+                    content_type=self.renderer.media_type,
+                    headers={
+                        "Content-Encoding": "gzip",
+                        "ETag": etag,
+                        "Vary": "Accept-Encoding",
+                    },
+                )
+            return self.render(
+                self.get_envelope(page),
+                status.HTTP_200_OK,
+                headers={"ETag": etag, "Vary": "Accept-Encoding"},
+            )
+        except NotFound as e:
+            return self.error(str(e.detail), status.HTTP_404_NOT_FOUND)
+        except Exception as e:
+            logger.error("Unable to fetch today's menu: %s", e)
+            return self.error(
+                "Unable to fetch today's menu",
+                status.HTTP_500_INTERNAL_SERVER_ERROR,
+                errors={"general": [str(e)]},
+            )
+
+    def get_page(self, snapshot):
+        page = self.paginator.paginate_queryset(
+            snapshot["results"], self.request, view=self)
+        return self.paginator.get_paginated_response(page).data
+
+    def get_envelope(self, page):
+        return {
+            "success": True,
+            "message": "Today's menu fetched successfully",
+            "data": page,
+        }
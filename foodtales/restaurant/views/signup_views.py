@@ -1,11 +1,11 @@
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.permissions import AllowAny
-from rest_framework_simplejwt.tokens import RefreshToken
 
 from foodtales.utils import success_response, error_response
 from restaurant.serializers.signup_serializers import \
     RestaurantSignUpSerializer
+from user.tokens import ClaimsRefreshToken
 
 
 class RestaurantSignUpView(APIView):
@@ -16,7 +16,7 @@ class RestaurantSignUpView(APIView):
             serializer = RestaurantSignUpSerializer(data=request.data)
             if serializer.is_valid():
                 user = serializer.save()
-                refresh = RefreshToken.for_user(user)
+                refresh = ClaimsRefreshToken.for_user(user)
                 return success_response(
                     message="Restaurant Created Successfully",
                     data={
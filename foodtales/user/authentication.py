@@ -0,0 +1,89 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.models import TokenUser
+
+STATUS_KEY = "auth:status:{user_id}"
+# Flags of the user that override the claims of its tokens
+STATUS_FIELDS = ["is_active", "is_staff"]
+
+
+class ClaimsUser(TokenUser):
+    """
+    Stateless user built from the claims of a ``ClaimsRefreshToken``.
+    Exposes what the permission classes read without loading the user.
+    """
+
+    @cached_property
+    def user_type(self):
+        return self.token.get("user_type")
+
+    @cached_property
+    def employee_id(self):
+        return self.token.get("employee_id")
+
+    @cached_property
+    def restaurant_id(self):
+        return self.token.get("restaurant_id")
+
+
+def get_user_status(user_id):
+    """
+    The current ``is_active`` and ``is_staff`` flags of ``user_id``, read
+    from the cache and refreshed at most every ``JWT_ACTIVE_CACHE_TIMEOUT``
+    seconds. ``None`` when the timeout is 0: the token claims are then
+    trusted until the token expires.
+    """
+    timeout = settings.JWT_ACTIVE_CACHE_TIMEOUT
+    if not timeout:
+        return None
+    key = STATUS_KEY.format(user_id=user_id)
+    status = cache.get(key)
+    if status is None:
+        status = get_user_model().objects.filter(pk=user_id).values(
+            *STATUS_FIELDS).first() or dict.fromkeys(STATUS_FIELDS, False)
+        cache.set(key, status, timeout=timeout)
+    return status
+
+
+def set_user_status(user_id, status):
+    """
+    Publish a change of the flags of ``user_id`` to the cache, so that
+    deactivated users are rejected and demoted staff lose access without
+    waiting for the entry to expire.
+    """
+    cache.set(
+        STATUS_KEY.format(user_id=user_id),
+        status,
+        timeout=settings.JWT_ACTIVE_CACHE_TIMEOUT or None,
+    )
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication that trusts the claims of the token instead of
+    fetching the user, for read endpoints that only need the user type and
+    ids. ``request.user`` is a ``ClaimsUser``, not a model instance.
+
+    The active and staff flags are not taken from the token, as they gate
+    access and may change before it expires: they come from the cached
+    ``get_user_status``. That costs one cache read per request, and a
+    query only when the entry expired.
+
+    Tokens issued before the claims existed fall back to the database.
+    """
+
+    def get_user(self, validated_token):
+        if "user_type" not in validated_token:
+            return super().get_user(validated_token)
+        user = ClaimsUser(validated_token)
+        status = get_user_status(user.id)
+        if status is not None:
+            if not status["is_active"]:
+                raise AuthenticationFailed(
+                    "User is inactive", code="user_inactive")
+            user.is_staff = status["is_staff"]
+        return user
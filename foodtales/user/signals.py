@@ -0,0 +1,23 @@
+from django.contrib.auth import get_user_model
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from user.authentication import STATUS_FIELDS, set_user_status
+
+User = get_user_model()
+
+
+@receiver(post_save, sender=User)
+def publish_user_status(sender, instance, **kwargs):
+    user_id = instance.pk
+    status = {field: getattr(instance, field) for field in STATUS_FIELDS}
+    transaction.on_commit(lambda: set_user_status(user_id, status))
+
+
+@receiver(post_delete, sender=User)
+def revoke_deleted_user(sender, instance, **kwargs):
+    user_id = instance.pk
+    transaction.on_commit(
+        lambda: set_user_status(
+            user_id, dict.fromkeys(STATUS_FIELDS, False)))
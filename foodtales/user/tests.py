@@ -1,6 +1,13 @@
-from django.test import TestCase
+from django.core.cache import cache
+from django.test import TestCase, override_settings
 from django.contrib.auth import get_user_model
 from django.db.utils import IntegrityError
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APIClient
+from rest_framework_simplejwt.tokens import AccessToken, RefreshToken
+
+from user.tokens import ClaimsRefreshToken
 
 
 class CustomUserModelTest(TestCase):
@@ -70,3 +77,77 @@ class CustomUserModelTest(TestCase):
             user_type="restaurant"
         )
         self.assertNotEqual(rest1.restaurant_id, rest2.restaurant_id)
+
+
+@override_settings(JWT_ACTIVE_CACHE_TIMEOUT=60)
+class ClaimsJWTAuthenticationTest(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.User = get_user_model()
+        self.employee = self.User.objects.create_user(
+            email="employee@example.com", password="testpass123",
+            user_type="employee"
+        )
+        self.client = APIClient()
+        response = self.client.post(
+            reverse("token_obtain_pair"),
+            {"email": "employee@example.com", "password": "testpass123"},
+            format="json",
+        )
+        self.token = response.data["access"]
+
+    def get_menus(self, token=None):
+        return self.client.get(
+            reverse("all-restaurants-current-day-menu"),
+            HTTP_AUTHORIZATION=f"Bearer {token or self.token}",
+        )
+
+    def test_obtained_tokens_carry_user_claims(self):
+        token = AccessToken(self.token)
+        self.assertEqual(token["user_type"], "employee")
+        self.assertEqual(token["employee_id"], self.employee.employee_id)
+        self.assertIsNone(token["restaurant_id"])
+        self.assertFalse(token["is_staff"])
+
+    def test_reads_authenticate_without_queries(self):
+        self.assertEqual(self.get_menus().status_code, status.HTTP_200_OK)
+        with self.assertNumQueries(0):
+            response = self.get_menus()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_deactivated_user_is_rejected(self):
+        self.get_menus()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.is_active = False
+            self.employee.save()
+        response = self.get_menus()
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_demoted_staff_loses_access_before_the_token_expires(self):
+        self.employee.is_staff = True
+        self.employee.save()
+        token = str(ClaimsRefreshToken.for_user(self.employee).access_token)
+        headers = {"HTTP_AUTHORIZATION": f"Bearer {token}"}
+        response = self.client.get(reverse("metrics"), **headers)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.employee.is_staff = False
+            self.employee.save()
+        response = self.client.get(reverse("metrics"), **headers)
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_claims_are_checked_by_permissions(self):
+        restaurant = self.User.objects.create_user(
+            email="restaurant@example.com", password="testpass123",
+            user_type="restaurant"
+        )
+        token = ClaimsRefreshToken.for_user(restaurant).access_token
+        response = self.get_menus(str(token))
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    def test_tokens_without_claims_fall_back_to_the_database(self):
+        token = RefreshToken.for_user(self.employee).access_token
+        self.get_menus()
+        with self.assertNumQueries(1):
+            self.get_menus(str(token))
@@ -0,0 +1,23 @@
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.tokens import RefreshToken
+
+# User fields copied into every token, read back by ClaimsUser
+CLAIM_FIELDS = ["user_type", "employee_id", "restaurant_id", "is_staff"]
+
+
+class ClaimsRefreshToken(RefreshToken):
+    """
+    Refresh token carrying the user fields permissions depend on. Access
+    tokens derived from it inherit the claims.
+    """
+
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for field in CLAIM_FIELDS:
+            token[field] = getattr(user, field)
+        return token
+
+
+class ClaimsTokenObtainPairSerializer(TokenObtainPairSerializer):
+    token_class = ClaimsRefreshToken